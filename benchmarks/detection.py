@@ -0,0 +1,402 @@
+"""
+Banc d'essai des moteurs de détection sur un jeu d'images de référence.
+
+Chaque moteur s'utilise comme le modèle Roboflow (méthode predict(chemin, confidence,
+overlap)) et passe par ImageProcessor, exactement comme run_detection. Les réponses du
+service distant peuvent être enregistrées puis rejouées hors ligne.
+
+Exemples :
+    python -m benchmarks.detection --make-synthetic 40            # jeu synthétique et réponses simulées
+    python -m benchmarks.detection --backends roboflow sliced:roboflow --record   # enregistre images et tuiles
+    python -m benchmarks.detection --backends replay sliced:replay
+    python -m benchmarks.detection --backends replay yolo:best.pt --compare ancien.json
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+import cv2
+import numpy as np
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_FIXTURES = os.path.join(BENCH_DIR, "fixtures", "detection")
+DEFAULT_RESULTS = os.path.join(BENCH_DIR, "detection_results.json")
+RESPONSES_FILE = "responses.json"
+IOU_THRESHOLD = 0.5
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='Compare les moteurs de détection (latence, débit, mémoire, accord)')
+    parser.add_argument('--fixtures', default=DEFAULT_FIXTURES,
+                        help='Dossier du jeu de référence (images/, labels/, responses.json)')
+    parser.add_argument('--backends', nargs='+', default=['replay'],
+                        help='Moteurs : replay, roboflow, service:URL, yolo:POIDS.pt, sliced:MOTEUR')
+    parser.add_argument('--concurrency', nargs='+', type=int, default=[1, 2, 4, 8],
+                        help='Niveaux de parallélisme pour la mesure du débit')
+    parser.add_argument('--confidence', type=float, default=0.4, help='Seuil de confiance des détections')
+    parser.add_argument('--replay-speed', type=float, default=1.0,
+                        help='Facteur appliqué aux latences enregistrées (0 : sans attente)')
+    parser.add_argument('--record', action='store_true',
+                        help='Enregistre les réponses des moteurs distants dans le jeu de référence')
+    parser.add_argument('--make-synthetic', type=int, metavar='N', default=0,
+                        help='Crée un jeu synthétique de N images avec des réponses simulées, puis quitte')
+    parser.add_argument('--output', default=DEFAULT_RESULTS, help='Fichier JSON des résultats')
+    parser.add_argument('--compare', default=None, help='Résultats précédents (JSON) à comparer')
+    return parser.parse_args()
+
+
+def image_key(image_path: str) -> str:
+    from src.core.inference_service import image_digest
+    return image_digest(image_path)
+
+
+def load_responses(fixtures_dir: str) -> dict:
+    try:
+        with open(os.path.join(fixtures_dir, RESPONSES_FILE), 'r') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def save_responses(fixtures_dir: str, responses: dict):
+    path = os.path.join(fixtures_dir, RESPONSES_FILE)
+    with open(path + ".tmp", 'w') as f:
+        json.dump(responses, f)
+    os.replace(path + ".tmp", path)
+
+
+class ReplayModel:
+    """Rejoue les réponses enregistrées (par empreinte d'image), avec leur latence d'origine."""
+
+    def __init__(self, fixtures_dir: str, speed: float = 1.0):
+        self.responses = load_responses(fixtures_dir)
+        self.speed = speed
+
+    def predict(self, image_path, confidence=40, overlap=30):
+        recorded = self.responses.get(image_key(image_path))
+        if recorded is None:
+            raise KeyError(f"Aucune réponse enregistrée pour {image_path}")
+        if self.speed > 0:
+            time.sleep(recorded["latency_ms"] / 1000.0 * self.speed)
+        return recorded["response"]
+
+
+class RecordingModel:
+    """Transmet les appels au modèle réel et conserve réponses et latences pour le rejeu."""
+
+    def __init__(self, model, responses: dict):
+        self.model = model
+        self.responses = responses
+        self._lock = threading.Lock()
+
+    def predict(self, image_path, confidence=40, overlap=30):
+        start = time.perf_counter()
+        result = self.model.predict(image_path, confidence=confidence, overlap=overlap)
+        latency_ms = (time.perf_counter() - start) * 1000.0
+        response = result if isinstance(result, dict) else result.json()
+        with self._lock:
+            self.responses[image_key(image_path)] = {"response": response, "latency_ms": latency_ms}
+        return response
+
+
+class UltralyticsModel:
+    """Modèle local Ultralytics (YOLO), présenté avec le format de réponse Roboflow."""
+
+    def __init__(self, weights: str):
+        from ultralytics import YOLO
+        self.model = YOLO(weights)
+        self._lock = threading.Lock()
+
+    def predict(self, image_path, confidence=40, overlap=30):
+        with self._lock:
+            result = self.model.predict(image_path, conf=confidence / 100.0, iou=overlap / 100.0, verbose=False)[0]
+        predictions = []
+        for (x1, y1, x2, y2), score, class_id in zip(result.boxes.xyxy.tolist(), result.boxes.conf.tolist(),
+                                                   result.boxes.cls.tolist()):
+            predictions.append({
+                "x": (x1 + x2) / 2, "y": (y1 + y2) / 2, "width": x2 - x1, "height": y2 - y1,
+                "confidence": score, "class": result.names[int(class_id)], "class_id": int(class_id),
+            })
+        return {"predictions": predictions}
+
+
+class SlicedModel:
+    """Découpe l'image en tuiles qui se recouvrent, interroge le modèle sur chacune et fusionne (NMS)."""
+
+    def __init__(self, model, tile: int = 1280, overlap_ratio: float = 0.2):
+        self.model = model
+        self.tile = tile
+        self.overlap_ratio = overlap_ratio
+        self.tile_dir = tempfile.mkdtemp(prefix="detection_tiles_")
+
+    def _origins(self, length: int):
+        if length <= self.tile:
+            return [0]
+        step = int(self.tile * (1 - self.overlap_ratio))
+        origins = list(range(0, length - self.tile, step))
+        return origins + [length - self.tile]
+
+    def predict(self, image_path, confidence=40, overlap=30):
+        image = cv2.imread(image_path)
+        height, width = image.shape[:2]
+        predictions = []
+        for y0 in self._origins(height):
+            for x0 in self._origins(width):
+                # Nom déterministe : les tuiles d'une même image ont la même empreinte d'un passage à l'autre
+                tile_path = os.path.join(self.tile_dir, f"{os.path.basename(image_path)}_{x0}_{y0}.png")
+                cv2.imwrite(tile_path, image[y0:y0 + self.tile, x0:x0 + self.tile])
+                response = self.model.predict(tile_path, confidence=confidence, overlap=overlap)
+                for prediction in response["predictions"]:
+                    predictions.append(dict(prediction, x=prediction["x"] + x0, y=prediction["y"] + y0))
+        return {"predictions": self._merge(predictions, overlap / 100.0)}
+
+    @staticmethod
+    def _merge(predictions, iou_threshold):
+        """Supprime les doublons des zones de recouvrement entre tuiles."""
+        if not predictions:
+            return []
+        boxes = [[p["x"] - p["width"] / 2, p["y"] - p["height"] / 2, p["width"], p["height"]] for p in predictions]
+        keep = cv2.dnn.NMSBoxes(boxes, [float(p["confidence"]) for p in predictions], 0.0, iou_threshold)
+        return [predictions[i] for i in np.array(keep).flatten()]
+
+
+def create_backend(spec: str, fixtures_dir: str, args, responses: dict):
+    """Construit le moteur décrit par spec ; les moteurs distants sont enregistrés si --record."""
+    if spec.startswith("sliced:"):
+        return SlicedModel(create_backend(spec[len("sliced:"):], fixtures_dir, args, responses))
+    if spec == "replay":
+        return ReplayModel(fixtures_dir, speed=args.replay_speed)
+    if spec.startswith("yolo:"):
+        return UltralyticsModel(spec[len("yolo:"):])
+    if spec.startswith("service:"):
+        from src.core.inference_service import InferenceClient
+        model = InferenceClient(spec[len("service:"):])
+    elif spec == "roboflow":
+        from src.core.image_processor import ImageProcessor
+        model = ImageProcessor().load_model()
+    else:
+        raise ValueError(f"Moteur inconnu : {spec}")
+    return RecordingModel(model, responses) if args.record else model
+
+
+def list_fixtures(fixtures_dir: str):
+    """Images du jeu de référence et leurs annotations (boîtes englobantes en pixels)."""
+    from src.core.image_header import read_image_size
+    from src.core.yolo_labels import read_label_file
+    images_dir = os.path.join(fixtures_dir, "images")
+    fixtures = []
+    for name in sorted(os.listdir(images_dir)):
+        image_path = os.path.join(images_dir, name)
+        label_path = os.path.join(fixtures_dir, "labels", os.path.splitext(name)[0] + ".txt")
+        size = read_image_size(image_path)
+        if size is None:
+            continue
+        boxes = []
+        if os.path.exists(label_path):
+            for _, points in read_label_file(label_path):
+                pixels = points * size
+                boxes.append([*pixels.min(axis=0), *pixels.max(axis=0)])
+        fixtures.append((image_path, size, np.array(boxes, dtype=np.float64).reshape(-1, 4)))
+    return fixtures
+
+
+def box_iou(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    """Matrice des IoU entre deux ensembles de boîtes xyxy."""
+    top_left = np.maximum(a[:, None, :2], b[None, :, :2])
+    bottom_right = np.minimum(a[:, None, 2:], b[None, :, 2:])
+    inter = np.prod(np.clip(bottom_right - top_left, 0, None), axis=2)
+    area_a = np.prod(a[:, 2:] - a[:, :2], axis=1)
+    area_b = np.prod(b[:, 2:] - b[:, :2], axis=1)
+    return inter / np.maximum(area_a[:, None] + area_b[None, :] - inter, 1e-9)
+
+
+def match_boxes(predicted: np.ndarray, reference: np.ndarray):
+    """Appariement glouton par IoU décroissante ; retourne les IoU des paires au-dessus du seuil."""
+    if len(predicted) == 0 or len(reference) == 0:
+        return []
+    iou = box_iou(predicted, reference)
+    matched = []
+    used_predicted, used_reference = set(), set()
+    for flat in np.argsort(iou, axis=None)[::-1]:
+        i, j = np.unravel_index(flat, iou.shape)
+        if iou[i, j] < IOU_THRESHOLD:
+            break
+        if i in used_predicted or j in used_reference:
+            continue
+        used_predicted.add(i)
+        used_reference.add(j)
+        matched.append(float(iou[i, j]))
+    return matched
+
+
+def percentile(values, q):
+    return float(np.percentile(values, q)) if values else None
+
+
+def peak_rss_mb():
+    if resource is None:
+        return None
+    # ru_maxrss est en kilo-octets sous Linux, en octets sous macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def benchmark_backend(spec: str, fixtures_dir: str, args) -> dict:
+    """Mesure un moteur (exécuté dans son propre processus pour isoler le pic mémoire)."""
+    from src.core.image_processor import ImageProcessor
+    responses = load_responses(fixtures_dir)
+    backend = create_backend(spec, fixtures_dir, args, responses)
+    processor = ImageProcessor(model=backend)
+    processor.set_confidence_threshold(args.confidence)
+    processor.enable_ai_assist()
+    fixtures = list_fixtures(fixtures_dir)
+
+    def detect(fixture):
+        # Même chemin que run_detection : prédiction brute puis conversion filtrée
+        image_path, size, _ = fixture
+        start = time.perf_counter()
+        detections, _ = processor.predictions_to_detections(processor.predict(image_path), size)
+        return (time.perf_counter() - start) * 1000.0, detections
+
+    # Latence : passage séquentiel (le premier appel sert de préchauffage)
+    detect(fixtures[0])
+    latencies, matched, predicted_count, reference_count = [], [], 0, 0
+    for fixture in fixtures:
+        latency_ms, detections = detect(fixture)
+        latencies.append(latency_ms)
+        predicted = detections.xyxy.astype(np.float64) if detections is not None else np.zeros((0, 4))
+        matched.extend(match_boxes(predicted, fixture[2]))
+        predicted_count += len(predicted)
+        reference_count += len(fixture[2])
+
+    throughput = {}
+    for workers in args.concurrency:
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            start = time.perf_counter()
+            list(pool.map(detect, fixtures))
+            throughput[str(workers)] = len(fixtures) / (time.perf_counter() - start)
+
+    if args.record:
+        save_responses(fixtures_dir, responses)
+
+    precision = len(matched) / predicted_count if predicted_count else 0.0
+    recall = len(matched) / reference_count if reference_count else 0.0
+    return {
+        "images": len(fixtures),
+        "latency_ms": {"p50": percentile(latencies, 50), "p95": percentile(latencies, 95),
+                       "mean": statistics.fmean(latencies)},
+        "images_per_second": throughput,
+        "peak_rss_mb": peak_rss_mb(),
+        "agreement": {
+            "iou_threshold": IOU_THRESHOLD,
+            "precision": precision,
+            "recall": recall,
+            "f1": 2 * precision * recall / (precision + recall) if precision + recall else 0.0,
+            "mean_iou": statistics.fmean(matched) if matched else None,
+            "predicted": predicted_count,
+            "reference": reference_count,
+        },
+    }
+
+
+def make_synthetic_fixtures(fixtures_dir: str, count: int, seed: int = 0):
+    """Jeu synthétique : images de prises, annotations de référence et réponses simulées bruitées."""
+    rng = np.random.default_rng(seed)
+    os.makedirs(os.path.join(fixtures_dir, "images"), exist_ok=True)
+    os.makedirs(os.path.join(fixtures_dir, "labels"), exist_ok=True)
+    responses = load_responses(fixtures_dir)
+    for index in range(count):
+        width, height = 2000, 1500
+        image = np.full((height, width, 3), rng.integers(90, 160), dtype=np.uint8)
+        lines, predictions = [], []
+        for _ in range(rng.integers(5, 30)):
+            cx, cy = rng.uniform(80, width - 80), rng.uniform(80, height - 80)
+            radius = rng.uniform(15, 70)
+            angles = np.sort(rng.uniform(0, 2 * np.pi, 10))
+            points = np.stack([cx + radius * np.cos(angles), cy + radius * np.sin(angles)], axis=1)
+            cv2.fillPoly(image, [points.astype(np.int32)], [int(v) for v in rng.integers(0, 255, 3)])
+            lines.append("0 " + " ".join(f"{x / width:.6f} {y / height:.6f}" for x, y in points))
+            # Réponse simulée : boîte légèrement décalée, quelques oublis
+            if rng.random() < 0.9:
+                x0, y0 = points.min(axis=0)
+                x1, y1 = points.max(axis=0)
+                jitter = rng.normal(0, 0.05 * radius, 4)
+                predictions.append({
+                    "x": float((x0 + x1) / 2 + jitter[0]), "y": float((y0 + y1) / 2 + jitter[1]),
+                    "width": float(x1 - x0 + jitter[2]), "height": float(y1 - y0 + jitter[3]),
+                    "confidence": float(rng.uniform(0.3, 0.99)), "class": "hold", "class_id": 0,
+                })
+        name = f"fixture_{index:04d}"
+        image_path = os.path.join(fixtures_dir, "images", name + ".jpg")
+        cv2.imwrite(image_path, image)
+        with open(os.path.join(fixtures_dir, "labels", name + ".txt"), 'w') as f:
+            f.write("\n".join(lines) + "\n")
+        responses[image_key(image_path)] = {"response": {"predictions": predictions},
+                                            "latency_ms": float(rng.uniform(150, 450))}
+    save_responses(fixtures_dir, responses)
+
+
+def compare(results: dict, previous: dict):
+    """Affiche l'évolution des indicateurs principaux par rapport à un résultat précédent."""
+    print(f"\n{'moteur':<28} {'indicateur':<16} {'précédent':>12} {'actuel':>12}")
+    for spec, current in sorted(results.items()):
+        before = previous.get(spec)
+        if before is None:
+            print(f"{spec:<28} {'-':<16} {'-':>12} {'nouveau':>12}")
+            continue
+        rows = [("p50 (ms)", before["latency_ms"]["p50"], current["latency_ms"]["p50"]),
+                ("p95 (ms)", before["latency_ms"]["p95"], current["latency_ms"]["p95"]),
+                ("F1", before["agreement"]["f1"], current["agreement"]["f1"])]
+        for level, value in current["images_per_second"].items():
+            rows.append((f"img/s x{level}", before["images_per_second"].get(level), value))
+        for label, old, new in rows:
+            old_text = f"{old:.2f}" if old is not None else "-"
+            print(f"{spec:<28} {label:<16} {old_text:>12} {new:>12.2f}")
+
+
+def main():
+    args = parse_args()
+    if args.make_synthetic:
+        make_synthetic_fixtures(args.fixtures, args.make_synthetic)
+        print(f"{args.make_synthetic} images synthétiques écrites dans {args.fixtures}")
+        return 0
+
+    from .run import environment
+    results = {}
+    # Un processus par moteur : le pic de mémoire (RSS) mesuré est celui du moteur seul
+    context = multiprocessing.get_context("spawn")
+    for spec in args.backends:
+        with ProcessPoolExecutor(max_workers=1, mp_context=context) as pool:
+            results[spec] = pool.submit(benchmark_backend, spec, args.fixtures, args).result()
+        latency = results[spec]["latency_ms"]
+        agreement = results[spec]["agreement"]
+        print(f"{spec:<28} p50 {latency['p50']:>8.1f} ms  p95 {latency['p95']:>8.1f} ms  "
+              f"F1 {agreement['f1']:.3f}  RSS {results[spec]['peak_rss_mb'] or 0:.0f} Mo  "
+              + "  ".join(f"x{level}: {rate:.1f} img/s" for level, rate in results[spec]["images_per_second"].items()))
+
+    report = {"environment": environment(), "fixtures": os.path.abspath(args.fixtures),
+              "confidence": args.confidence, "results": results}
+    with open(args.output, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f"\nRésultats écrits dans {args.output}")
+
+    if args.compare:
+        with open(args.compare, 'r') as f:
+            compare(results, json.load(f)["results"])
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
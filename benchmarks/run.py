@@ -0,0 +1,240 @@
+"""
+Micro-benchmarks hors ligne du rendu, de la géométrie et des entrées/sorties.
+
+Exemples :
+    python -m benchmarks.run                       # matrice complète, comparée à la référence
+    python -m benchmarks.run --sizes 12MP --polygons 10 100
+    python -m benchmarks.run --save-baseline       # enregistre les résultats comme référence
+"""
+import os
+
+# Plateforme Qt sans affichage : doit être définie avant tout import de PyQt6
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+import argparse
+import json
+import platform
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+
+import cv2
+import numpy as np
+
+from .scenes import RESOLUTIONS, POLYGON_COUNTS, make_image, make_polygons
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_RESULTS = os.path.join(BENCH_DIR, "results.json")
+DEFAULT_BASELINE = os.path.join(BENCH_DIR, "baseline.json")
+BENCHMARKS = ("polygon_draw", "update_image_display", "create_preview_image",
+              "hit_test", "save_annotations", "load_annotations")
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='Micro-benchmarks de l\'outil d\'annotation')
+    parser.add_argument('--sizes', nargs='+', default=list(RESOLUTIONS), choices=list(RESOLUTIONS),
+                        help='Résolutions à mesurer')
+    parser.add_argument('--polygons', nargs='+', type=int, default=list(POLYGON_COUNTS),
+                        help='Nombres de polygones par scène')
+    parser.add_argument('--only', nargs='+', choices=BENCHMARKS, help='Benchmarks à exécuter')
+    parser.add_argument('--repeat', type=int, default=5, help='Nombre de mesures par cas')
+    parser.add_argument('--output', default=DEFAULT_RESULTS, help='Fichier JSON des résultats')
+    parser.add_argument('--baseline', default=DEFAULT_BASELINE, help='Fichier JSON de référence')
+    parser.add_argument('--tolerance', type=float, default=0.15,
+                        help='Ralentissement relatif toléré avant de signaler une régression')
+    parser.add_argument('--save-baseline', action='store_true',
+                        help='Enregistre les résultats comme nouvelle référence')
+    return parser.parse_args()
+
+
+def measure(fn, repeat: int) -> dict:
+    """Exécute fn une fois à vide puis repeat fois, et retourne les durées en ms."""
+    fn()
+    durations = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        durations.append((time.perf_counter() - start) * 1000.0)
+    return {
+        "median_ms": statistics.median(durations),
+        "min_ms": min(durations),
+        "max_ms": max(durations),
+        "runs": repeat,
+    }
+
+
+class BenchmarkSession:
+    """Prépare un espace de travail temporaire et une fenêtre principale hors écran."""
+
+    def __init__(self):
+        self.workdir = tempfile.mkdtemp(prefix="annotator_bench_")
+        self.previous_cwd = os.getcwd()
+        images_dir = os.path.join(self.workdir, "data", "to_annotate")
+        os.makedirs(images_dir)
+        # Une image minimale évite la boîte de dialogue « aucune image » au démarrage
+        cv2.imwrite(os.path.join(images_dir, "startup.png"), np.zeros((8, 8, 3), np.uint8))
+        os.chdir(self.workdir)
+
+        from PyQt6.QtWidgets import QApplication
+        from src.gui.main_window import MainWindow
+        self.app = QApplication.instance() or QApplication(sys.argv)
+        self.window = MainWindow()
+        self.window.resize(1600, 1000)
+        self.images = {}
+
+    def image_path(self, size_name: str) -> str:
+        """Écrit (une seule fois) l'image synthétique de la résolution demandée."""
+        if size_name not in self.images:
+            width, height = RESOLUTIONS[size_name]
+            path = os.path.join(self.workdir, f"scene_{size_name}.jpg")
+            cv2.imwrite(path, make_image(width, height))
+            self.images[size_name] = path
+        return self.images[size_name]
+
+    def load_scene(self, size_name: str, count: int):
+        """Installe une scène dans la fenêtre principale."""
+        path = self.image_path(size_name)
+        width, height = RESOLUTIONS[size_name]
+        window = self.window
+        window.current_image_path = path
+        window.original_image = make_image(width, height)
+        window.display_scale = 1.0
+        window.image_size = (width, height)
+        window.current_annotations = make_polygons(count, width, height)
+        window.image_item = None
+        window.scene.clear()
+        return window.current_annotations
+
+    def close(self):
+        self.window.close()
+        os.chdir(self.previous_cwd)
+        shutil.rmtree(self.workdir, ignore_errors=True)
+
+
+def run_case(session: BenchmarkSession, name: str, size_name: str, count: int, repeat: int) -> dict:
+    """Mesure un benchmark sur une scène donnée."""
+    from PyQt6.QtCore import QPointF
+    window = session.window
+    polygons = session.load_scene(size_name, count)
+
+    if name == "polygon_draw":
+        frame = window.original_image.copy()
+
+        def run():
+            np.copyto(frame, window.original_image)
+            for polygon in polygons:
+                polygon.draw(frame, line_thickness=2, point_radius=5, opacity=0.2)
+        return measure(run, repeat)
+
+    if name == "update_image_display":
+        polygons[-1].is_selected = True
+        return measure(window.update_image_display, repeat)
+
+    if name == "create_preview_image":
+        return measure(lambda: window.create_preview_image(polygons[-1]), repeat)
+
+    if name == "hit_test":
+        # Le pire cas : le clic tombe dans le dernier polygone, loin de ses sommets.
+        # Le rendu déclenché par la sélection est mesuré à part (update_image_display).
+        target = polygons[-1].get_points_array().mean(axis=0)
+        window.image_viewer.resetTransform()
+        window.image_viewer.centerOn(QPointF(*target))
+        pos = window.image_viewer.mapFromScene(QPointF(*target))
+        window.update_image_display = lambda: None
+        try:
+            return measure(lambda: window.handle_mouse_click(pos), repeat)
+        finally:
+            del window.update_image_display
+
+    annotation_manager = window.annotation_manager
+    annotation_manager.annotations_dir = os.path.join(session.workdir, "labels")
+    os.makedirs(annotation_manager.annotations_dir, exist_ok=True)
+    path = window.current_image_path
+
+    if name == "save_annotations":
+        return measure(lambda: annotation_manager.save_annotations(path, polygons, window.labels), repeat)
+
+    if name == "load_annotations":
+        annotation_manager.save_annotations(path, polygons, window.labels)
+        return measure(lambda: annotation_manager.load_annotations(path), repeat)
+
+    raise ValueError(f"Benchmark inconnu : {name}")
+
+
+def environment() -> dict:
+    """Décrit la machine et les versions des dépendances."""
+    from PyQt6.QtCore import QT_VERSION_STR
+    return {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "processor": platform.processor(),
+        "cpu_count": os.cpu_count(),
+        "numpy": np.__version__,
+        "opencv": cv2.__version__,
+        "qt": QT_VERSION_STR,
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+    }
+
+
+def compare(results: dict, baseline: dict, tolerance: float) -> list:
+    """Compare les médianes à la référence et retourne la liste des régressions."""
+    regressions = []
+    print(f"\n{'cas':<48} {'référence':>12} {'actuel':>12} {'ratio':>8}")
+    for case, current in sorted(results.items()):
+        reference = baseline.get(case)
+        if reference is None:
+            print(f"{case:<48} {'-':>12} {current['median_ms']:>10.2f}ms {'nouveau':>8}")
+            continue
+        ratio = current["median_ms"] / max(reference["median_ms"], 1e-9)
+        flag = ""
+        if ratio > 1.0 + tolerance:
+            regressions.append(case)
+            flag = "  RÉGRESSION"
+        print(f"{case:<48} {reference['median_ms']:>10.2f}ms {current['median_ms']:>10.2f}ms "
+              f"{ratio:>7.2f}x{flag}")
+    return regressions
+
+
+def main():
+    args = parse_args()
+    benchmarks = args.only or BENCHMARKS
+    session = BenchmarkSession()
+    results = {}
+    try:
+        for size_name in args.sizes:
+            for count in args.polygons:
+                for name in benchmarks:
+                    case = f"{name}/{size_name}/{count}"
+                    results[case] = run_case(session, name, size_name, count, args.repeat)
+                    print(f"{case:<48} médiane {results[case]['median_ms']:>10.2f} ms")
+    finally:
+        session.close()
+
+    report = {"environment": environment(), "results": results}
+    with open(args.output, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f"\nRésultats écrits dans {args.output}")
+
+    if args.save_baseline:
+        with open(args.baseline, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"Référence enregistrée dans {args.baseline}")
+        return 0
+
+    if not os.path.exists(args.baseline):
+        print("Aucune référence trouvée : utilisez --save-baseline pour en créer une")
+        return 0
+
+    with open(args.baseline, 'r') as f:
+        baseline = json.load(f)["results"]
+    regressions = compare(results, baseline, args.tolerance)
+    if regressions:
+        print(f"\n{len(regressions)} régression(s) au-delà de {args.tolerance:.0%}")
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
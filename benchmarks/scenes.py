@@ -0,0 +1,42 @@
+import numpy as np
+from src.core.polygon import Polygon
+
+# Résolutions synthétiques (largeur, hauteur) : 12, 24 et 50 MP
+RESOLUTIONS = {
+    "12MP": (4000, 3000),
+    "24MP": (6000, 4000),
+    "50MP": (8192, 6144),
+}
+POLYGON_COUNTS = (10, 100, 1000)
+
+
+def make_image(width: int, height: int, seed: int = 0) -> np.ndarray:
+    """Génère une image BGR synthétique (dégradé bruité, proche d'une photo de mur)."""
+    rng = np.random.default_rng(seed)
+    gradient = np.linspace(40, 200, width, dtype=np.float32)
+    image = np.empty((height, width, 3), dtype=np.uint8)
+    noise = rng.integers(0, 40, size=(height, width), dtype=np.uint8)
+    for channel, offset in enumerate((0, 15, 30)):
+        image[:, :, channel] = np.clip(gradient + offset, 0, 215).astype(np.uint8)
+        image[:, :, channel] += noise
+    return image
+
+
+def make_polygons(count: int, width: int, height: int, seed: int = 0) -> list:
+    """Génère des polygones de prises répartis sur l'image (8 à 12 sommets chacun)."""
+    rng = np.random.default_rng(seed)
+    # Taille moyenne d'une prise : l'ensemble couvre environ un tiers de l'image
+    radius = np.sqrt(width * height / (3.0 * count * np.pi))
+    polygons = []
+    for i in range(count):
+        cx = rng.uniform(radius, width - radius)
+        cy = rng.uniform(radius, height - radius)
+        n_points = int(rng.integers(8, 13))
+        angles = np.sort(rng.uniform(0, 2 * np.pi, n_points))
+        radii = radius * rng.uniform(0.6, 1.0, n_points)
+        class_type = "hold" if i % 4 else "volume"
+        polygon = Polygon(f"{class_type}_{i + 1}", class_type)
+        for angle, r in zip(angles, radii):
+            polygon.add_point(cx + r * np.cos(angle), cy + r * np.sin(angle))
+        polygons.append(polygon)
+    return polygons
@@ -0,0 +1,235 @@
+"""
+Rejeu hors écran d'une session d'annotation enregistrée (run.py --record-session).
+
+Les événements souris, molette et raccourcis sont renvoyés à la fenêtre principale avec
+leur rythme d'origine, sur une copie de travail du jeu d'images : les fichiers d'origine
+ne sont jamais modifiés.
+
+Exemples :
+    python run.py --record-session session.jsonl                    # enregistrement
+    python -m benchmarks.session session.jsonl --save-baseline     # rejeu, mesure de référence
+    python -m benchmarks.session session.jsonl                     # rejeu, comparé à la référence
+    python -m benchmarks.session session.jsonl --speed 0           # sans attente entre événements
+"""
+import os
+
+# Plateforme Qt sans affichage : doit être définie avant tout import de PyQt6
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+import argparse
+import json
+import shutil
+import sys
+import tempfile
+import time
+
+from .run import environment
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_RESULTS = os.path.join(BENCH_DIR, "session_results.json")
+DEFAULT_BASELINE = os.path.join(BENCH_DIR, "session_baseline.json")
+# Temps laissé aux tâches de fond (décodage, vignettes) avant et après le rejeu, en secondes
+SETTLE_SECONDS = 1.0
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='Rejoue une session enregistrée et mesure les temps de trame')
+    parser.add_argument('session', help='Fichier JSONL enregistré avec run.py --record-session')
+    parser.add_argument('--images', default='data/to_annotate', help='Dossier des images de la session')
+    parser.add_argument('--labels', default='data/annotations/labels', help='Dossier des annotations')
+    parser.add_argument('--speed', type=float, default=1.0,
+                        help='Facteur de vitesse du rejeu (2 : deux fois plus vite, 0 : sans attente)')
+    parser.add_argument('--budget', type=float, default=1000.0 / 60,
+                        help='Durée d\'une trame en ms ; au-delà, les trames manquées sont comptées')
+    parser.add_argument('--output', default=DEFAULT_RESULTS, help='Fichier JSON des résultats')
+    parser.add_argument('--baseline', default=DEFAULT_BASELINE, help='Fichier JSON de référence')
+    parser.add_argument('--tolerance', type=float, default=0.15,
+                        help='Ralentissement relatif toléré avant de signaler une régression')
+    parser.add_argument('--save-baseline', action='store_true',
+                        help='Enregistre les résultats comme nouvelle référence')
+    return parser.parse_args()
+
+
+def percentiles(values) -> dict:
+    if not values:
+        return {"p50": None, "p95": None, "p99": None, "max": None, "count": 0}
+    values = sorted(values)
+
+    def at(q):
+        return values[min(len(values) - 1, int(round(q / 100.0 * (len(values) - 1))))]
+    return {"p50": at(50), "p95": at(95), "p99": at(99), "max": values[-1], "count": len(values)}
+
+
+class ReplaySession:
+    """Copie de travail du jeu d'images et fenêtre principale hors écran, pilotée par l'enregistrement."""
+
+    def __init__(self, images_dir: str, labels_dir: str, header: dict):
+        self.workdir = tempfile.mkdtemp(prefix="annotator_replay_")
+        self.previous_cwd = os.getcwd()
+        # Liens symboliques vers les images (copie si impossible), copie des annotations
+        shutil.copytree(os.path.abspath(images_dir), os.path.join(self.workdir, "data", "to_annotate"),
+                        copy_function=self._link)
+        target_labels = os.path.join(self.workdir, "data", "annotations", "labels")
+        if os.path.isdir(labels_dir):
+            shutil.copytree(labels_dir, target_labels)
+        os.chdir(self.workdir)
+
+        from PyQt6.QtWidgets import QApplication, QMessageBox
+        from src.gui.main_window import MainWindow
+        # Les boîtes de dialogue modales bloqueraient le rejeu : réponse immédiate
+        for name in ("information", "warning", "critical", "question"):
+            setattr(QMessageBox, name, staticmethod(lambda *args, **kwargs: QMessageBox.StandardButton.Ok))
+        self.app = QApplication.instance() or QApplication(sys.argv)
+        self.window = MainWindow()
+        self.window.resize(*header["window"])
+        self.window.show()
+        names = [os.path.basename(path) for path in self.window.image_files]
+        if header.get("image") in names:
+            self.window.jump_to_image(names.index(header["image"]))
+        self.idle(SETTLE_SECONDS)
+
+    @staticmethod
+    def _link(src, dst):
+        try:
+            os.symlink(src, dst)
+        except OSError:
+            shutil.copy2(src, dst)
+
+    def pump(self) -> float:
+        """Traite les événements en attente ; retourne la durée de ce passage en ms."""
+        start = time.perf_counter()
+        self.app.processEvents()
+        return (time.perf_counter() - start) * 1000.0
+
+    def idle(self, seconds: float, busy=None):
+        """Fait tourner la boucle d'événements pendant la durée donnée (minuteries, tâches de fond)."""
+        deadline = time.perf_counter() + seconds
+        while time.perf_counter() < deadline:
+            duration = self.pump()
+            if busy is not None and duration >= 1.0:
+                busy.append(duration)
+            if duration < 1.0:
+                time.sleep(0.001)
+
+    def dispatch(self, record: dict):
+        """Envoie un événement enregistré à la fenêtre."""
+        from src.gui.session_recorder import build_event
+        if record["type"] == "shortcut":
+            self.window.shortcuts[record["key"]].activated.emit()
+        elif record["type"] == "resize":
+            self.window.resize(record["w"], record["h"])
+        else:
+            self.app.sendEvent(self.window.image_viewer.viewport(), build_event(record))
+
+    def close(self):
+        self.window.close()
+        self.window.deleteLater()
+        self.app.processEvents()
+        os.chdir(self.previous_cwd)
+        shutil.rmtree(self.workdir, ignore_errors=True)
+
+
+def replay(session: ReplaySession, events: list, speed: float, budget_ms: float) -> dict:
+    """Rejoue les événements ; mesure la latence de chaque événement et les temps de trame."""
+    from src.utils.perf import recorder
+    input_latency = []
+    busy = []  # Passages de la boucle d'événements hors entrées (minuteries, résultats de tâches de fond)
+    first_frame = recorder.frame
+    cpu_start = time.process_time()
+    wall_start = time.perf_counter()
+    for record in events:
+        if speed > 0:
+            wait = wall_start + record["t"] / speed - time.perf_counter()
+            if wait > 0:
+                session.idle(wait, busy)
+        start = time.perf_counter()
+        session.dispatch(record)
+        session.app.processEvents()  # Redessin de la zone d'image inclus
+        input_latency.append((time.perf_counter() - start) * 1000.0)
+    session.idle(SETTLE_SECONDS, busy)
+    wall = time.perf_counter() - wall_start
+    cpu = time.process_time() - cpu_start
+
+    frames = input_latency + busy
+    return {
+        "events": len(events),
+        "input_latency_ms": percentiles(input_latency),
+        "frame_time_ms": percentiles(frames),
+        "render_ms": {f"p{q}": recorder.percentile("render", q) for q in (50, 95, 99)},
+        "renders": recorder.frame - first_frame,
+        "dropped_frames": sum(int(duration // budget_ms) for duration in frames),
+        "frame_budget_ms": budget_ms,
+        "cpu_seconds": cpu,
+        "wall_seconds": wall,
+    }
+
+
+def compare(result: dict, baseline: dict, tolerance: float) -> list:
+    """Compare les indicateurs principaux à la référence et retourne la liste des régressions."""
+    rows = [
+        ("latence p50 (ms)", baseline["input_latency_ms"]["p50"], result["input_latency_ms"]["p50"]),
+        ("latence p95 (ms)", baseline["input_latency_ms"]["p95"], result["input_latency_ms"]["p95"]),
+        ("trame p95 (ms)", baseline["frame_time_ms"]["p95"], result["frame_time_ms"]["p95"]),
+        ("trames manquées", baseline["dropped_frames"], result["dropped_frames"]),
+        ("CPU (s)", baseline["cpu_seconds"], result["cpu_seconds"]),
+    ]
+    regressions = []
+    print(f"\n{'indicateur':<20} {'référence':>12} {'actuel':>12} {'ratio':>8}")
+    for name, before, current in rows:
+        if before is None or current is None:
+            continue
+        ratio = current / max(before, 1e-9) if before else (1.0 if not current else float("inf"))
+        flag = ""
+        if ratio > 1.0 + tolerance:
+            regressions.append(name)
+            flag = "  RÉGRESSION"
+        print(f"{name:<20} {before:>12.2f} {current:>12.2f} {ratio:>7.2f}x{flag}")
+    return regressions
+
+
+def main():
+    args = parse_args()
+    from src.gui.session_recorder import load_session
+    header, events = load_session(args.session)
+    session = ReplaySession(args.images, args.labels, header)
+    try:
+        result = replay(session, events, args.speed, args.budget)
+    finally:
+        session.close()
+
+    latency, frames = result["input_latency_ms"], result["frame_time_ms"]
+    print(f"{result['events']} événements rejoués en {result['wall_seconds']:.1f} s")
+    print(f"latence des entrées  p50 {latency['p50']:.2f} ms  p95 {latency['p95']:.2f} ms  "
+          f"p99 {latency['p99']:.2f} ms  max {latency['max']:.2f} ms")
+    print(f"temps de trame       p95 {frames['p95']:.2f} ms  trames manquées {result['dropped_frames']}  "
+          f"CPU {result['cpu_seconds']:.2f} s")
+
+    report = {"environment": environment(), "session": os.path.abspath(args.session), "speed": args.speed,
+              "result": result}
+    with open(args.output, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f"\nRésultats écrits dans {args.output}")
+
+    if args.save_baseline:
+        with open(args.baseline, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"Référence enregistrée dans {args.baseline}")
+        return 0
+
+    if not os.path.exists(args.baseline):
+        print("Aucune référence trouvée : utilisez --save-baseline pour en créer une")
+        return 0
+
+    with open(args.baseline, 'r') as f:
+        baseline = json.load(f)
+    if baseline.get("speed") != args.speed:
+        print(f"Attention : référence rejouée à la vitesse {baseline.get('speed')}, comparaison peu fiable")
+    regressions = compare(result, baseline["result"], args.tolerance)
+    if regressions:
+        print(f"\n{len(regressions)} régression(s) au-delà de {args.tolerance:.0%}")
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -3,4 +3,23 @@ Example configuration file.
 Copy this file to config.py and replace the API key with your own.
 """
 
-ROBOFLOW_API_KEY = "your_api_key_here" 
\ No newline at end of file
+ROBOFLOW_API_KEY = "your_api_key_here" 
+
+# Optionnel : URL d'un service d'inférence local partagé entre plusieurs postes
+# (lancé avec `python -m tools.inference_server`). Laisser à None pour que chaque
+# instance charge son propre modèle.
+INFERENCE_SERVICE_URL = None  # ex. "http://127.0.0.1:8765"
+
+# Optionnel : base SQLite de la file partagée, à placer dans le dossier commun lorsque
+# plusieurs annotateurs travaillent sur les mêmes images. Laisser à None pour un seul poste.
+WORK_QUEUE_DB = None  # ex. "data/to_annotate/.work_queue.sqlite"
+
+# Optionnel : images lues depuis un bucket compatible S3 (AWS, MinIO...) au lieu de
+# data/to_annotate. Nécessite boto3 ; les identifiants sont ceux de l'environnement AWS.
+IMAGE_SOURCE_URL = None  # ex. "s3://murs/photos/"
+S3_ENDPOINT_URL = None  # ex. "http://127.0.0.1:9000" pour MinIO
+IMAGE_CACHE_MAX_GB = 20  # Taille maximale du cache local des images
+
+# Optionnel : nombre de processus qui décodent les grandes images en mémoire partagée
+# (None : un par cœur, 0 : décodage dans l'application).
+DECODE_WORKERS = None
@@ -7,6 +7,9 @@ def parse_args():
     parser.add_argument('--debug', action='store_true', help='Active le mode debug')
     parser.add_argument('--test-dir', type=str, help='Chemin du répertoire de test')
     parser.add_argument('--no-ai', action='store_true', help='Désactive l\'assistance IA')
+    parser.add_argument('--perf-log', type=str, help='Fichier JSONL où exporter les durées de chaque étape')
+    parser.add_argument('--record-session', type=str,
+                        help='Fichier JSONL où enregistrer les interactions (rejouables avec benchmarks.session)')
     return parser.parse_args()
 
 if __name__ == '__main__':
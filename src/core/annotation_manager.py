@@ -3,14 +3,37 @@ from typing import List, Dict, Tuple
 import supervision as sv
 from config import ANNOTATIONS_DIR
 import json
-import cv2
+import logging
+import numpy as np
+from .dataset_scanner import sample_name
+from .image_header import read_image_size
+from .yolo_labels import PackedLabels, decode_labels, write_labels
+from ..utils.perf import recorder
+
+logger = logging.getLogger(__name__)
 
 class AnnotationManager:
     def __init__(self):
         self.annotations: Dict[str, List[Tuple[int, float, float, float, float]]] = {}
         self.annotations_dir = "data/annotations/labels"
+        # Source d'images distante éventuelle, à qui renvoyer chaque fichier sauvegardé
+        self.label_store = None
+        # Dossier scanné : les noms d'annotations dérivent du chemin relatif à ce dossier
+        self.images_root = None
         os.makedirs(self.annotations_dir, exist_ok=True)
     
+    def get_sample_name(self, image_path: str) -> str:
+        """Nom unique de l'image dans le jeu (relatif au dossier scanné, nom de fichier sinon)."""
+        if self.images_root is not None:
+            rel_path = os.path.relpath(os.path.abspath(image_path), self.images_root)
+            if not rel_path.startswith(os.pardir + os.sep):
+                return sample_name(rel_path)
+        return sample_name(os.path.basename(image_path))
+    
+    def get_annotation_path(self, image_path: str) -> str:
+        """Retourne le chemin du fichier d'annotations associé à une image."""
+        return os.path.join(self.annotations_dir, f"{self.get_sample_name(image_path)}.txt")
+    
     def normalize_coordinates(self, points, image_width, image_height):
         """Normalise les coordonnées des points entre 0 et 1."""
         normalized_points = []
@@ -22,73 +45,59 @@ class AnnotationManager:
     
     def save_annotations(self, image_path, annotations, labels):
         """Sauvegarde les annotations dans un fichier TXT au format YOLO."""
-        # Créer le nom du fichier d'annotations
-        base_name = os.path.splitext(os.path.basename(image_path))[0]
-        annotation_file = os.path.join(self.annotations_dir, f"{base_name}.txt")
+        annotation_file = self.get_annotation_path(image_path)
         
-        # Obtenir les dimensions de l'image
-        image = cv2.imread(image_path)
-        if image is None:
-            print(f"Erreur : Impossible de lire l'image {image_path}")
+        with recorder.stage("save", image_path):
+            self._write_annotations(image_path, annotation_file, annotations)
+        if self.label_store is not None and os.path.exists(annotation_file):
+            self.label_store.upload_label(image_path, annotation_file)
+    
+    def _write_annotations(self, image_path, annotation_file, annotations):
+        """Écrit les annotations normalisées dans le fichier TXT."""
+        # Obtenir les dimensions de l'image (en-tête seulement)
+        size = read_image_size(image_path)
+        if size is None:
+            logger.error("Impossible de lire l'image %s", image_path)
             return
-        height, width = image.shape[:2]
+        width, height = size
+        
+        # Déterminer la classe (0 pour hold, 1 pour volume) et normaliser tous les sommets d'un coup
+        class_ids = [0 if annotation.class_type == "hold" else 1 for annotation in annotations]
+        coordinates = [(point.x, point.y) for annotation in annotations for point in annotation.points]
+        points = np.array(coordinates, dtype=np.float64).reshape(-1, 2) / np.array([width, height], dtype=np.float64)
+        labels = PackedLabels.from_counts(class_ids, [len(annotation.points) for annotation in annotations], points)
         
         # Sauvegarder les annotations
-        with open(annotation_file, 'w') as f:
-            for annotation in annotations:
-                # Déterminer la classe (0 pour hold, 1 pour volume)
-                class_id = 0 if annotation.class_type == "hold" else 1
-                
-                # Normaliser les coordonnées des points
-                normalized_points = self.normalize_coordinates(annotation.points, width, height)
-                
-                # Créer la ligne d'annotation
-                line = f"{class_id}"
-                for x, y in normalized_points:
-                    line += f" {x:.6f} {y:.6f}"
-                
-                # Écrire la ligne dans le fichier
-                f.write(line + "\n")
+        write_labels(annotation_file, labels)
         
-        print(f"Annotations sauvegardées dans {annotation_file}")
+        logger.info("Annotations sauvegardées dans %s", annotation_file)
     
     def load_annotations(self, image_path: str) -> List[Tuple[int, float, float]]:
         """Charge les annotations depuis le fichier TXT."""
-        base_name = os.path.splitext(os.path.basename(image_path))[0]
-        annotation_file = os.path.join(self.annotations_dir, f"{base_name}.txt")
+        annotation_file = self.get_annotation_path(image_path)
         
         if not os.path.exists(annotation_file):
-            print(f"Aucune annotation trouvée pour {image_path}")
+            logger.debug("Aucune annotation trouvée pour %s", image_path)
             return []
         
-        # Obtenir les dimensions de l'image
-        image = cv2.imread(image_path)
-        if image is None:
-            print(f"Erreur : Impossible de lire l'image {image_path}")
+        # Obtenir les dimensions de l'image (en-tête seulement)
+        size = read_image_size(image_path)
+        if size is None:
+            logger.error("Impossible de lire l'image %s", image_path)
             return []
-        height, width = image.shape[:2]
-        
-        annotations = []
+        width, height = size
         
         with open(annotation_file, 'r') as f:
-            for line in f:
-                # Séparer la classe et les coordonnées
-                values = line.strip().split()
-                class_id = int(values[0])
-                class_type = "hold" if class_id == 0 else "volume"
-                
-                # Extraire les coordonnées
-                points = []
-                for i in range(1, len(values), 2):
-                    x = float(values[i])
-                    y = float(values[i + 1])
-                    # Dénormaliser les coordonnées
-                    x = x * width
-                    y = y * height
-                    points.append((x, y))
-                
-                if points:
-                    annotations.append((class_type, points))
+            labels = decode_labels(f.read(), min_points=1, source=annotation_file)
+        
+        # Dénormaliser tous les sommets d'un coup, puis découper par polygone
+        points = labels.points * (width, height)
+        points = list(zip(points[:, 0].tolist(), points[:, 1].tolist()))
+        offsets = labels.offsets.tolist()
+        annotations = [
+            ("hold" if class_id == 0 else "volume", points[offsets[i]:offsets[i + 1]])
+            for i, class_id in enumerate(labels.class_ids.tolist())
+        ]
         
-        print(f"Annotations chargées pour {image_path}: {len(annotations)} polygones")
+        logger.debug("Annotations chargées pour %s : %d polygones", image_path, len(annotations))
         return annotations 
\ No newline at end of file
@@ -0,0 +1,284 @@
+import hashlib
+import json
+import logging
+import os
+import shutil
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+import cv2
+import numpy as np
+
+from .dataset_scanner import IMAGE_EXTENSIONS, sample_name
+from .image_header import read_image_size
+from .yolo_labels import CLASS_NAMES, read_labels, write_labels
+
+logger = logging.getLogger(__name__)
+
+FORMATS = ("coco", "yolo", "masks")
+SPLITS = ("train", "val", "test")
+STATE_FILE = "export_state.json"
+
+
+def assign_split(stem: str, ratios: Sequence[float]) -> str:
+    """Répartition déterministe d'une image (même nom, même split d'un export à l'autre)."""
+    value = int.from_bytes(hashlib.sha1(stem.encode('utf-8')).digest()[:8], 'big') / 2.0 ** 64
+    total = sum(ratios)
+    threshold = 0.0
+    for split, ratio in zip(SPLITS, ratios):
+        threshold += ratio / total
+        if value < threshold:
+            return split
+    return SPLITS[-1]
+
+
+def find_samples(labels_dir: str, images_dirs: Iterable[str]) -> List[Tuple[str, str, str]]:
+    """Associe chaque fichier d'annotations à son image : liste triée de (nom, image, label)."""
+    images = {}
+    for images_dir in images_dirs:
+        for root, _, files in os.walk(images_dir):
+            for name in files:
+                if name.lower().endswith(IMAGE_EXTENSIONS):
+                    path = os.path.join(root, name)
+                    # Même nom à plat que les annotations ; le premier dossier indiqué l'emporte en cas de doublon
+                    images.setdefault(sample_name(os.path.relpath(path, images_dir)), path)
+
+    samples = []
+    with os.scandir(labels_dir) as entries:
+        for entry in entries:
+            stem, extension = os.path.splitext(entry.name)
+            if extension == ".txt" and stem in images:
+                samples.append((stem, images[stem], entry.path))
+    return sorted(samples)
+
+
+def _link_or_copy(source: str, destination: str):
+    """Lien physique si possible (même système de fichiers), copie sinon."""
+    if os.path.exists(destination):
+        os.remove(destination)
+    try:
+        os.link(source, destination)
+    except OSError:
+        shutil.copy2(source, destination)
+
+
+def _export_sample(task: dict) -> dict:
+    """Exporte une image (exécuté dans un processus du pool) et retourne son fragment COCO."""
+    cv2.setNumThreads(1)
+    size = task["size"] or read_image_size(task["image"])
+    if size is None:
+        return {"stem": task["stem"], "error": f"image illisible : {task['image']}"}
+    width, height = size
+    # Lu et filtré une seule fois : les trois formats exportent les mêmes polygones
+    polygons = read_labels(task["label"])
+    scale = np.array([width, height], dtype=np.float64)
+    output_dir, stem, split = task["output_dir"], task["stem"], task["split"]
+
+    if task["changed"] and "yolo" in task["formats"]:
+        image_name = stem + os.path.splitext(task["image"])[1]
+        _link_or_copy(task["image"], os.path.join(output_dir, "yolo", "images", split, image_name))
+        write_labels(os.path.join(output_dir, "yolo", "labels", split, stem + ".txt"), polygons)
+
+    if task["changed"] and "masks" in task["formats"]:
+        # Une instance par polygone (0 = fond) ; 16 bits pour dépasser 255 prises par image
+        mask = np.zeros((height, width), dtype=np.uint16)
+        for instance_id, (_, points) in enumerate(polygons, start=1):
+            cv2.fillPoly(mask, [np.round(points * scale).astype(np.int32)], instance_id)
+        cv2.imwrite(os.path.join(output_dir, "masks", stem + ".png"), mask)
+
+    annotations = []
+    if "coco" in task["formats"]:
+        for class_id, points in polygons:
+            pixels = points * scale
+            x, y = pixels.min(axis=0)
+            w, h = pixels.max(axis=0) - (x, y)
+            annotations.append({
+                "category_id": class_id + 1,
+                "segmentation": [np.round(pixels, 2).flatten().tolist()],
+                "bbox": [round(float(x), 2), round(float(y), 2), round(float(w), 2), round(float(h), 2)],
+                "area": round(float(cv2.contourArea(pixels.astype(np.float32))), 2),
+                "iscrowd": 0,
+            })
+    return {"stem": stem, "width": width, "height": height, "annotations": annotations}
+
+
+class _CocoWriter:
+    """Écrit un fichier COCO au fil de l'eau : les annotations dans le fichier, les images dans un
+    fichier temporaire recopié à la fin, pour ne jamais garder le jeu de données en mémoire."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.image_id = 0
+        self.annotation_id = 0
+        self._file = open(path + ".tmp", 'w')
+        self._images = open(path + ".images.tmp", 'w+')
+        categories = [{"id": i + 1, "name": name, "supercategory": "climbing"}
+                      for i, name in enumerate(CLASS_NAMES)]
+        self._file.write('{"info":{"description":"climbing holds and volumes"},')
+        self._file.write('"categories":' + json.dumps(categories) + ',"annotations":[')
+
+    def add(self, file_name: str, fragment: dict):
+        self.image_id += 1
+        image = {"id": self.image_id, "file_name": file_name,
+                 "width": fragment["width"], "height": fragment["height"]}
+        self._images.write(("," if self.image_id > 1 else "") + json.dumps(image))
+        for annotation in fragment["annotations"]:
+            self.annotation_id += 1
+            annotation = dict(annotation, id=self.annotation_id, image_id=self.image_id)
+            self._file.write(("," if self.annotation_id > 1 else "") + json.dumps(annotation))
+
+    def close(self):
+        self._file.write('],"images":[')
+        self._images.seek(0)
+        shutil.copyfileobj(self._images, self._file)
+        self._file.write(']}')
+        self._file.close()
+        self._images.close()
+        os.remove(self.path + ".images.tmp")
+        os.replace(self.path + ".tmp", self.path)
+
+    def abort(self):
+        """Abandonne l'écriture en laissant intact le fichier COCO précédent."""
+        self._file.close()
+        self._images.close()
+        os.remove(self.path + ".tmp")
+        os.remove(self.path + ".images.tmp")
+
+
+class DatasetExporter:
+    """Exporte les images annotées en COCO, YOLO-seg (avec splits et data.yaml) et masques PNG.
+
+    L'état du dernier export (mtime des annotations, dimensions, split) est conservé dans
+    le dossier de sortie : seules les images dont les annotations ont changé sont
+    réécrites, et les fichiers COCO ne sont régénérés que si quelque chose a changé.
+    """
+
+    def __init__(self, output_dir: str, formats: Sequence[str] = FORMATS,
+                 ratios: Sequence[float] = (0.8, 0.1, 0.1), workers: Optional[int] = None):
+        self.output_dir = output_dir
+        self.formats = tuple(formats)
+        self.ratios = tuple(ratios)
+        self.workers = workers
+        self.state_path = os.path.join(output_dir, STATE_FILE)
+
+    def _load_state(self) -> Tuple[Dict[str, dict], bool]:
+        """Retourne l'état du dernier export et s'il a été fait avec les mêmes paramètres."""
+        try:
+            with open(self.state_path, 'r') as f:
+                state = json.load(f)
+        except (OSError, ValueError):
+            return {}, False
+        compatible = state.get("formats") == list(self.formats) and state.get("ratios") == list(self.ratios)
+        return state.get("samples", {}), compatible
+
+    def _save_state(self, samples: Dict[str, dict]):
+        tmp_path = self.state_path + ".tmp"
+        with open(tmp_path, 'w') as f:
+            f.write(json.dumps({"formats": list(self.formats), "ratios": list(self.ratios),
+                                "samples": samples}, separators=(',', ':')))
+        os.replace(tmp_path, self.state_path)
+
+    def _prepare_dirs(self):
+        if "yolo" in self.formats:
+            for split in SPLITS:
+                os.makedirs(os.path.join(self.output_dir, "yolo", "images", split), exist_ok=True)
+                os.makedirs(os.path.join(self.output_dir, "yolo", "labels", split), exist_ok=True)
+        if "masks" in self.formats:
+            os.makedirs(os.path.join(self.output_dir, "masks"), exist_ok=True)
+        if "coco" in self.formats:
+            os.makedirs(os.path.join(self.output_dir, "coco"), exist_ok=True)
+
+    def _remove_outputs(self, stem: str, entry: dict):
+        """Supprime les fichiers exportés d'une image retirée ou changée de split."""
+        split = entry["split"]
+        paths = [
+            os.path.join(self.output_dir, "yolo", "images", split, stem + entry["extension"]),
+            os.path.join(self.output_dir, "yolo", "labels", split, stem + ".txt"),
+            os.path.join(self.output_dir, "masks", stem + ".png"),
+        ]
+        for path in paths:
+            if os.path.exists(path):
+                os.remove(path)
+
+    def _write_data_yaml(self):
+        path = os.path.join(self.output_dir, "yolo", "data.yaml")
+        with open(path, 'w') as f:
+            f.write(f"path: {os.path.abspath(os.path.join(self.output_dir, 'yolo'))}\n")
+            for split in SPLITS:
+                f.write(f"{split}: images/{split}\n")
+            f.write("names:\n")
+            for class_id, name in enumerate(CLASS_NAMES):
+                f.write(f"  {class_id}: {name}\n")
+
+    def export(self, samples: List[Tuple[str, str, str]]) -> dict:
+        """Exporte les échantillons (nom, image, label) et retourne les statistiques de l'export."""
+        os.makedirs(self.output_dir, exist_ok=True)
+        self._prepare_dirs()
+        previous, compatible = self._load_state()
+
+        tasks = []
+        changed = 0
+        for stem, image_path, label_path in samples:
+            split = assign_split(stem, self.ratios)
+            label_mtime = os.stat(label_path).st_mtime_ns
+            entry = previous.get(stem)
+            # Un changement de formats ou de répartition réexporte toutes les images
+            is_changed = (not compatible or entry is None or entry["label_mtime_ns"] != label_mtime
+                          or entry["image"] != image_path or entry["split"] != split)
+            if is_changed:
+                changed += 1
+                if entry is not None:
+                    self._remove_outputs(stem, entry)
+            tasks.append({
+                "stem": stem, "image": image_path, "label": label_path, "split": split,
+                "label_mtime_ns": label_mtime, "changed": is_changed,
+                "size": None if is_changed else (entry["width"], entry["height"]),
+                "output_dir": self.output_dir, "formats": self.formats,
+            })
+
+        current = {task["stem"] for task in tasks}
+        removed = [stem for stem in previous if stem not in current]
+        for stem in removed:
+            self._remove_outputs(stem, previous[stem])
+
+        coco_paths = [os.path.join(self.output_dir, "coco", f"{split}.json") for split in SPLITS]
+        write_coco = "coco" in self.formats and (
+            changed or removed or not all(os.path.exists(path) for path in coco_paths)
+        )
+        # Sans COCO à régénérer, seules les images modifiées passent par le pool
+        work = tasks if write_coco else [task for task in tasks if task["changed"]]
+        logger.info("%d images à exporter (%d modifiées, %d retirées)", len(tasks), changed, len(removed))
+
+        writers = {split: _CocoWriter(path) for split, path in zip(SPLITS, coco_paths)} if write_coco else {}
+        tasks_by_stem = {task["stem"]: task for task in work}
+        state = {stem: entry for stem, entry in previous.items() if stem in current}
+        errors = 0
+        completed = False
+        try:
+            with ProcessPoolExecutor(max_workers=self.workers) as pool:
+                chunksize = max(1, len(work) // (8 * (self.workers or os.cpu_count() or 1)))
+                for fragment in pool.map(_export_sample, work, chunksize=chunksize):
+                    task = tasks_by_stem[fragment["stem"]]
+                    if "error" in fragment:
+                        logger.error(fragment["error"])
+                        errors += 1
+                        state.pop(task["stem"], None)
+                        continue
+                    extension = os.path.splitext(task["image"])[1]
+                    state[task["stem"]] = {
+                        "image": task["image"], "label_mtime_ns": task["label_mtime_ns"],
+                        "split": task["split"], "extension": extension,
+                        "width": fragment["width"], "height": fragment["height"],
+                    }
+                    if write_coco:
+                        writers[task["split"]].add(task["stem"] + extension, fragment)
+            completed = True
+        finally:
+            for writer in writers.values():
+                writer.close() if completed else writer.abort()
+
+        if "yolo" in self.formats:
+            self._write_data_yaml()
+        self._save_state(state)
+        return {"images": len(tasks), "changed": changed, "removed": len(removed),
+                "errors": errors, "coco_written": bool(write_coco)}
@@ -0,0 +1,251 @@
+import os
+import re
+import json
+from typing import Callable, Dict, List, Optional
+
+IMAGE_EXTENSIONS = ('.png', '.jpg', '.jpeg')
+MANIFEST_SUFFIX = "_manifest.json"
+MANIFEST_VERSION = 2
+JOURNAL_SUFFIX = ".journal"
+
+STATUS_UNTOUCHED = "untouched"
+STATUS_IN_PROGRESS = "in_progress"
+STATUS_DONE = "done"
+
+_DIGITS = re.compile(r'(\d+)')
+# Sépare les dossiers dans le nom à plat d'une image rangée dans un sous-dossier
+SUBDIR_SEPARATOR = "__"
+
+
+def sample_name(rel_path: str) -> str:
+    """Nom à plat d'une image : chemin relatif sans extension, dossiers joints par « __ ».
+
+    Deux photos homonymes de dossiers différents (IMG_0001.jpg du téléphone) gardent ainsi
+    des annotations distinctes ; une image à la racine garde simplement son nom.
+    """
+    stem = os.path.splitext(os.path.normpath(rel_path))[0]
+    return stem.replace(os.sep, SUBDIR_SEPARATOR).replace('/', SUBDIR_SEPARATOR)
+
+
+def natural_sort_key(path: str):
+    """Clé de tri naturel : 'img2' avant 'img10'."""
+    return [int(part) if part.isdigit() else part.lower() for part in _DIGITS.split(path)]
+
+
+class DatasetScanner:
+    """Indexe récursivement un dossier d'images et mémorise l'état d'annotation de chacune.
+
+    Le manifeste (un instantané JSON et un journal en ajout seul) conserve, pour chaque
+    dossier, son mtime et son contenu : un dossier inchangé n'est pas relu au lancement
+    suivant. Les changements de statut sont ajoutés au journal, sans réécrire l'instantané.
+    """
+
+    def __init__(self, root: str, label_path_fn: Callable[[str], str],
+                 manifest_path: Optional[str] = None, extensions=IMAGE_EXTENSIONS):
+        self.root = os.path.abspath(root)
+        self.label_path_fn = label_path_fn
+        # Par défaut, le manifeste est placé à côté du dossier : l'écrire dedans
+        # modifierait son mtime et invaliderait le cache à chaque lancement
+        self.manifest_path = manifest_path or os.path.join(
+            os.path.dirname(self.root), f".{os.path.basename(self.root)}{MANIFEST_SUFFIX}"
+        )
+        self.journal_path = self.manifest_path + JOURNAL_SUFFIX
+        self.extensions = tuple(ext.lower() for ext in extensions)
+        self.dirs: Dict[str, dict] = {}
+        self.images: Dict[str, dict] = {}
+        self.order: List[str] = []
+        self._journal_dirty = False
+        self._load_manifest()
+
+    def _load_manifest(self):
+        """Charge l'instantané puis rejoue le journal."""
+        try:
+            with open(self.manifest_path, 'r') as f:
+                data = json.load(f)
+            if data.get("root") == self.root:
+                self.dirs = data.get("dirs", {})
+                self.images = data.get("images", {})
+                self.order = data.get("order", [])
+                if data.get("version") != MANIFEST_VERSION:
+                    # Chemins d'annotations d'une ancienne convention de nommage : recalculés
+                    for record in self.images.values():
+                        record.pop("label", None)
+        except (OSError, ValueError):
+            pass
+
+        try:
+            with open(self.journal_path, 'r') as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                    except ValueError:
+                        continue  # Ligne tronquée par un arrêt brutal
+                    record = self.images.get(entry.get("path"))
+                    self._journal_dirty = True
+                    if record is not None:
+                        record["status"] = entry["status"]
+                        record["label_mtime"] = entry.get("label_mtime")
+        except OSError:
+            pass
+
+    def save(self):
+        """Écrit l'instantané de manière atomique et vide le journal."""
+        data = {
+            "version": MANIFEST_VERSION,
+            "root": self.root,
+            "dirs": self.dirs,
+            "images": self.images,
+            "order": self.order,
+        }
+        tmp_path = self.manifest_path + ".tmp"
+        # json.dumps passe par l'encodeur C, bien plus rapide que json.dump sur un fichier
+        payload = json.dumps(data, separators=(',', ':'))
+        with open(tmp_path, 'w') as f:
+            f.write(payload)
+        os.replace(tmp_path, self.manifest_path)
+        try:
+            os.remove(self.journal_path)
+        except FileNotFoundError:
+            pass
+        self._journal_dirty = False
+
+    def _append_journal(self, rel_path: str, record: dict):
+        with open(self.journal_path, 'a') as f:
+            f.write(json.dumps({
+                "path": rel_path,
+                "status": record["status"],
+                "label_mtime": record["label_mtime"],
+            }) + "\n")
+
+    def _scan_dir(self, abs_dir: str, mtime_ns: int) -> dict:
+        """Liste un dossier avec os.scandir (images et sous-dossiers)."""
+        files, subdirs = [], []
+        with os.scandir(abs_dir) as entries:
+            for entry in entries:
+                if entry.name.startswith('.'):
+                    continue
+                if entry.is_dir(follow_symlinks=False):
+                    subdirs.append(entry.name)
+                elif entry.name.lower().endswith(self.extensions):
+                    files.append(entry.name)
+        return {"mtime_ns": mtime_ns, "files": files, "subdirs": subdirs}
+
+    def scan(self) -> List[str]:
+        """Met à jour l'index et retourne les chemins des images triés naturellement."""
+        seen_dirs = {}
+        changed = False
+        stack = [""]
+        while stack:
+            rel_dir = stack.pop()
+            abs_dir = os.path.join(self.root, rel_dir) if rel_dir else self.root
+            try:
+                mtime_ns = os.stat(abs_dir).st_mtime_ns
+            except OSError:
+                changed = True
+                continue
+            cached = self.dirs.get(rel_dir)
+            if cached is None or cached.get("mtime_ns") != mtime_ns:
+                try:
+                    cached = self._scan_dir(abs_dir, mtime_ns)
+                except OSError:
+                    changed = True
+                    continue
+                changed = True
+            seen_dirs[rel_dir] = cached
+            for name in cached["subdirs"]:
+                stack.append(os.path.join(rel_dir, name) if rel_dir else name)
+
+        if len(seen_dirs) != len(self.dirs):
+            changed = True
+        self.dirs = seen_dirs
+
+        if changed or not self.order:
+            order = []
+            for rel_dir, listing in seen_dirs.items():
+                for name in listing["files"]:
+                    order.append(os.path.join(rel_dir, name) if rel_dir else name)
+            order.sort(key=natural_sort_key)
+            self.order = order
+
+        if self._refresh_statuses() or changed or self._journal_dirty:
+            self.save()
+        prefix = self.root + os.sep
+        return [prefix + rel_path for rel_path in self.order]
+
+    def scan_listing(self, rel_paths: List[str]) -> List[str]:
+        """Comme scan, mais à partir d'une liste de chemins relatifs fournie (source distante)."""
+        order = sorted((os.path.normpath(rel_path) for rel_path in rel_paths), key=natural_sort_key)
+        changed = order != self.order
+        self.order = order
+        if self._refresh_statuses() or changed or self._journal_dirty:
+            self.save()
+        prefix = self.root + os.sep
+        return [prefix + rel_path for rel_path in self.order]
+
+    def _refresh_statuses(self) -> bool:
+        """Rapproche les statuts du manifeste des fichiers d'annotations présents."""
+        images = {}
+        for rel_path in self.order:
+            record = self.images.get(rel_path)
+            if record is None or "label" not in record:
+                label = os.path.abspath(self.label_path_fn(os.path.join(self.root, rel_path)))
+                record = {"status": STATUS_UNTOUCHED, "label_mtime": None, "label": label}
+            images[rel_path] = record
+
+        changed = len(images) != len(self.images)
+        label_mtimes = self._label_mtimes({r["label"].rpartition(os.sep)[0] for r in images.values()})
+        for rel_path, record in images.items():
+            label_mtime = label_mtimes.get(record["label"])
+            if label_mtime == record["label_mtime"]:
+                continue
+            changed = True
+            if label_mtime is None:
+                # Annotations supprimées depuis le dernier passage
+                record["status"] = STATUS_UNTOUCHED
+            elif record["status"] == STATUS_UNTOUCHED:
+                record["status"] = STATUS_IN_PROGRESS
+            record["label_mtime"] = label_mtime
+        self.images = images
+        return changed
+
+    @staticmethod
+    def _label_mtimes(label_dirs) -> Dict[str, float]:
+        """Lit en une passe par dossier les mtimes des fichiers d'annotations existants."""
+        mtimes = {}
+        for label_dir in label_dirs:
+            try:
+                with os.scandir(label_dir) as entries:
+                    for entry in entries:
+                        if entry.name.endswith('.txt'):
+                            mtimes[os.path.join(label_dir, entry.name)] = entry.stat().st_mtime
+            except OSError:
+                continue
+        return mtimes
+
+    def _rel(self, image_path: str) -> str:
+        return os.path.relpath(os.path.abspath(image_path), self.root)
+
+    def get_status(self, image_path: str) -> str:
+        """Retourne le statut d'une image (untouched, in_progress ou done)."""
+        record = self.images.get(self._rel(image_path))
+        return record["status"] if record else STATUS_UNTOUCHED
+
+    def set_status(self, image_path: str, status: str):
+        """Enregistre le statut d'une image dans le journal du manifeste."""
+        rel_path = self._rel(image_path)
+        record = self.images.get(rel_path)
+        if record is None:
+            return
+        record["status"] = status
+        try:
+            record["label_mtime"] = os.stat(record["label"]).st_mtime
+        except OSError:
+            record["label_mtime"] = None
+        self._append_journal(rel_path, record)
+
+    def first_unfinished_index(self) -> int:
+        """Retourne l'index de la première image non terminée (0 si toutes le sont)."""
+        for index, rel_path in enumerate(self.order):
+            if self.images.get(rel_path, {}).get("status") != STATUS_DONE:
+                return index
+        return 0
@@ -0,0 +1,137 @@
+import logging
+import multiprocessing
+import os
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor
+from multiprocessing import shared_memory
+from typing import Dict, Iterable, Optional, Tuple
+
+import cv2
+import numpy as np
+
+from .image_header import read_image_size
+
+logger = logging.getLogger(__name__)
+
+# En dessous de cette taille, l'aller-retour vers un processus coûte plus que le décodage
+SHARED_DECODE_MIN_PIXELS = 4_000_000
+
+
+def to_bgr(image: np.ndarray) -> np.ndarray:
+    """Convertit une image en BGR 8 bits à 3 canaux contigus (sans copie si c'est déjà le cas)."""
+    if image.dtype != np.uint8:
+        image = cv2.convertScaleAbs(image, alpha=255.0 / max(float(image.max()), 1.0))
+    if image.ndim == 2:
+        image = cv2.cvtColor(image, cv2.COLOR_GRAY2BGR)
+    elif image.shape[2] == 4:
+        image = cv2.cvtColor(image, cv2.COLOR_BGRA2BGR)
+    return np.ascontiguousarray(image)
+
+
+def _decode_into_segment(image_path: str) -> Optional[Tuple[str, Tuple[int, ...], str]]:
+    """Décode une image dans un segment de mémoire partagée (processus du pool).
+
+    Retourne (nom du segment, forme, type) ; le segment reste en place jusqu'à ce que le
+    processus principal s'y attache.
+    """
+    cv2.setNumThreads(1)
+    image = cv2.imread(image_path)
+    if image is None:
+        return None
+    image = to_bgr(image)
+    segment = shared_memory.SharedMemory(create=True, size=max(image.nbytes, 1))
+    np.ndarray(image.shape, dtype=image.dtype, buffer=segment.buf)[...] = image
+    segment.close()
+    return segment.name, image.shape, image.dtype.str
+
+
+class _SegmentArray(np.ndarray):
+    """Tableau posé sur un segment partagé ; le segment est fermé avec le dernier tableau qui s'en sert.
+
+    Toute vue de ce tableau le garde comme base : le segment ne peut pas être démappé tant
+    qu'une vue existe.
+    """
+
+
+def _attach(result) -> Optional[np.ndarray]:
+    """Enveloppe sans copie le segment produit par un processus du pool, puis supprime son nom."""
+    if result is None:
+        return None
+    name, shape, dtype = result
+    segment = shared_memory.SharedMemory(name=name)
+    # Le nom n'est plus nécessaire une fois attaché : la mémoire est libérée avec la projection
+    segment.unlink()
+    array = _SegmentArray(shape, dtype=np.dtype(dtype), buffer=segment.buf)
+    array.segment = segment
+    return array.view(np.ndarray)
+
+
+def _discard(future: Future):
+    """Libère le segment d'un décodage dont le résultat ne sera pas utilisé."""
+    if future.cancelled() or future.exception() is not None:
+        return
+    _attach(future.result())
+
+
+class DecodePool:
+    """Décode les grandes images dans des processus, sans sérialiser les pixels.
+
+    Chaque processus décode dans un segment de mémoire partagée ; le processus principal
+    n'en reçoit que le nom et enveloppe le segment dans un tableau numpy, sans copie. Les
+    images suivantes peuvent être décodées à l'avance : le décodage en cours ou terminé est
+    repris lors du chargement.
+    """
+
+    def __init__(self, workers: Optional[int] = None, min_pixels: int = SHARED_DECODE_MIN_PIXELS):
+        self.min_pixels = min_pixels
+        # spawn : ne pas dupliquer par fork un processus qui a déjà des threads (Qt)
+        self.executor = ProcessPoolExecutor(max_workers=workers or os.cpu_count() or 1,
+                                            mp_context=multiprocessing.get_context("spawn"))
+        self._lock = threading.Lock()
+        self._pending: Dict[str, Future] = {}
+
+    def accepts(self, image_path: str) -> bool:
+        """Vrai si l'image est assez grande pour être décodée dans un processus."""
+        size = read_image_size(image_path)
+        return size is not None and size[0] * size[1] >= self.min_pixels
+
+    def is_ready(self, image_path: str) -> bool:
+        """Vrai si l'image a déjà été décodée à l'avance."""
+        with self._lock:
+            future = self._pending.get(os.path.abspath(image_path))
+        return future is not None and future.done() and not future.cancelled() and future.exception() is None
+
+    def prefetch(self, image_paths: Iterable[str]):
+        """Décode à l'avance les images données ; les décodages d'avance précédents sont abandonnés."""
+        wanted = [os.path.abspath(path) for path in image_paths]
+        wanted = [path for path in wanted if os.path.exists(path) and self.accepts(path)]
+        with self._lock:
+            for path in list(self._pending):
+                if path not in wanted:
+                    future = self._pending.pop(path)
+                    if not future.cancel():
+                        future.add_done_callback(_discard)
+            for path in wanted:
+                if path not in self._pending:
+                    self._pending[path] = self.executor.submit(_decode_into_segment, path)
+
+    def load(self, image_path: str) -> Optional[np.ndarray]:
+        """Image BGR décodée par un processus du pool (décodage d'avance repris s'il existe)."""
+        path = os.path.abspath(image_path)
+        with self._lock:
+            future = self._pending.pop(path, None)
+        if future is None or future.cancelled():
+            future = self.executor.submit(_decode_into_segment, path)
+        image = _attach(future.result())
+        if image is None:
+            logger.warning("Décodage impossible dans le pool : %s", image_path)
+        return image
+
+    def shutdown(self):
+        """Arrête les processus et libère les segments des décodages d'avance non utilisés."""
+        with self._lock:
+            pending, self._pending = list(self._pending.values()), {}
+        for future in pending:
+            if not future.cancel():
+                future.add_done_callback(_discard)
+        self.executor.shutdown(wait=True, cancel_futures=True)
@@ -0,0 +1,147 @@
+import hashlib
+import logging
+import os
+import threading
+import zipfile
+from collections import OrderedDict
+from typing import Optional, Tuple
+
+import cv2
+import numpy as np
+
+from .image_header import read_image_size
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CACHE_DIR = "data/edge_cache"
+
+
+def _read_reduced_gray(image_path: str, max_side: int) -> Tuple[Optional[np.ndarray], float]:
+    """Décode l'image en niveaux de gris à résolution réduite ; retourne (image, échelle réduite/pleine)."""
+    size = read_image_size(image_path)
+    if size is None:
+        return None, 1.0
+    flags = cv2.IMREAD_GRAYSCALE
+    for factor, reduced in ((8, cv2.IMREAD_REDUCED_GRAYSCALE_8), (4, cv2.IMREAD_REDUCED_GRAYSCALE_4),
+                            (2, cv2.IMREAD_REDUCED_GRAYSCALE_2)):
+        if max(size) / factor >= max_side:
+            flags = reduced
+            break
+    image = cv2.imread(image_path, flags)
+    if image is None:
+        return None, 1.0
+    scale = image.shape[1] / size[0]
+    if max(image.shape) > max_side:
+        resize = max_side / max(image.shape)
+        image = cv2.resize(image, None, fx=resize, fy=resize, interpolation=cv2.INTER_AREA)
+        scale = image.shape[1] / size[0]
+    return image, scale
+
+
+def detect_edges(gray: np.ndarray) -> np.ndarray:
+    """Contours de Canny avec des seuils adaptés à la médiane de l'image."""
+    blurred = cv2.GaussianBlur(gray, (5, 5), 0)
+    median = float(np.median(blurred))
+    low = int(max(0, 0.66 * median))
+    high = int(min(255, 1.33 * median)) or 255
+    return cv2.Canny(blurred, low, max(high, low + 1))
+
+
+class EdgeMap:
+    """Pour chaque pixel, coordonnées du pixel de contour le plus proche (transformée de distance).
+
+    La carte est calculée une fois par image, à résolution réduite : aimanter un sommet
+    pendant un déplacement se résume à une lecture de tableau.
+    """
+
+    def __init__(self, edges: np.ndarray, scale: float):
+        self.scale = scale
+        self.edges = edges
+        if not edges.any():
+            self.nearest = None
+            return
+        # Les pixels de contour valent 0 : chacun reçoit une étiquette propre, et tout autre
+        # pixel l'étiquette du pixel de contour le plus proche
+        source = np.where(edges > 0, 0, 255).astype(np.uint8)
+        _, labels = cv2.distanceTransformWithLabels(source, cv2.DIST_L2, 5,
+                                                    labelType=cv2.DIST_LABEL_PIXEL)
+        ys, xs = np.nonzero(source == 0)
+        label_x = np.zeros(labels.max() + 1, dtype=np.int16)
+        label_y = np.zeros(labels.max() + 1, dtype=np.int16)
+        label_x[labels[ys, xs]] = xs
+        label_y[labels[ys, xs]] = ys
+        self.nearest = np.stack([label_x[labels], label_y[labels]], axis=-1)
+
+    @classmethod
+    def compute(cls, image_path: str, max_side: int = 2048) -> Optional["EdgeMap"]:
+        gray, scale = _read_reduced_gray(image_path, max_side)
+        if gray is None:
+            return None
+        return cls(detect_edges(gray), scale)
+
+    def snap(self, x: float, y: float, radius: float) -> Optional[Tuple[float, float]]:
+        """Point de contour le plus proche de (x, y) en pleine résolution, s'il est à moins de radius."""
+        if self.nearest is None:
+            return None
+        height, width = self.nearest.shape[:2]
+        column = min(max(int(x * self.scale), 0), width - 1)
+        row = min(max(int(y * self.scale), 0), height - 1)
+        edge_x, edge_y = self.nearest[row, column]
+        snapped_x = (float(edge_x) + 0.5) / self.scale
+        snapped_y = (float(edge_y) + 0.5) / self.scale
+        if (snapped_x - x) ** 2 + (snapped_y - y) ** 2 > radius ** 2:
+            return None
+        return snapped_x, snapped_y
+
+
+class EdgeMapCache:
+    """Cartes de contours en mémoire (LRU) et sur disque (contours compressés, par chemin et mtime)."""
+
+    def __init__(self, cache_dir: str = DEFAULT_CACHE_DIR, capacity: int = 4):
+        self.cache_dir = cache_dir
+        self.capacity = capacity
+        self._maps: "OrderedDict[str, EdgeMap]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _disk_path(self, image_path: str, mtime_ns: int) -> str:
+        key = hashlib.sha1(f"{os.path.abspath(image_path)}:{mtime_ns}".encode('utf-8')).hexdigest()
+        return os.path.join(self.cache_dir, key + ".npz")
+
+    def get(self, image_path: str) -> Optional[EdgeMap]:
+        """Carte déjà calculée pour cette image, sans calcul."""
+        with self._lock:
+            return self._maps.get(image_path)
+
+    def get_or_compute(self, image_path: str) -> Optional[EdgeMap]:
+        """Retourne la carte de l'image, lue sur disque ou calculée (à appeler hors du thread de l'interface)."""
+        edge_map = self.get(image_path)
+        if edge_map is not None:
+            return edge_map
+        try:
+            disk_path = self._disk_path(image_path, os.stat(image_path).st_mtime_ns)
+        except OSError:
+            return None
+
+        edge_map = None
+        try:
+            with np.load(disk_path) as data:
+                shape = tuple(data["shape"])
+                edges = np.unpackbits(data["edges"])[:shape[0] * shape[1]].reshape(shape) * 255
+                edge_map = EdgeMap(edges, float(data["scale"]))
+        except (OSError, KeyError, ValueError, zipfile.BadZipFile):
+            edge_map = EdgeMap.compute(image_path)
+            if edge_map is not None:
+                os.makedirs(self.cache_dir, exist_ok=True)
+                # Seuls les contours (1 bit par pixel) sont conservés : la transformée se recalcule vite
+                np.savez(disk_path, edges=np.packbits(edge_map.edges > 0),
+                         shape=np.array(edge_map.edges.shape), scale=edge_map.scale)
+        if edge_map is None:
+            logger.warning("Impossible de calculer les contours de %s", image_path)
+            return None
+
+        with self._lock:
+            self._maps[image_path] = edge_map
+            self._maps.move_to_end(image_path)
+            if len(self._maps) > self.capacity:
+                self._maps.popitem(last=False)
+        return edge_map
@@ -0,0 +1,77 @@
+import logging
+import struct
+from typing import Optional, Tuple
+
+import cv2
+
+logger = logging.getLogger(__name__)
+
+# Marqueurs SOF (début de trame) portant les dimensions d'un JPEG
+_JPEG_SOF_MARKERS = {0xC0, 0xC1, 0xC2, 0xC3, 0xC5, 0xC6, 0xC7, 0xC9, 0xCA, 0xCB, 0xCD, 0xCE, 0xCF}
+
+
+def _exif_orientation(segment: bytes) -> int:
+    """Lit l'orientation EXIF (balise 0x0112 de l'IFD0) d'un segment APP1, 1 par défaut."""
+    if not segment.startswith(b"Exif\x00\x00") or len(segment) < 14:
+        return 1
+    tiff = segment[6:]
+    endian = "<" if tiff[:2] == b"II" else ">"
+    try:
+        ifd_offset = struct.unpack(endian + "I", tiff[4:8])[0]
+        count = struct.unpack(endian + "H", tiff[ifd_offset:ifd_offset + 2])[0]
+        for i in range(count):
+            entry = ifd_offset + 2 + 12 * i
+            tag, _, _ = struct.unpack(endian + "HHI", tiff[entry:entry + 8])
+            if tag == 0x0112:
+                return struct.unpack(endian + "H", tiff[entry + 8:entry + 10])[0]
+    except struct.error:
+        pass
+    return 1
+
+
+def _jpeg_size(f) -> Optional[Tuple[int, int]]:
+    orientation = 1
+    f.seek(2)
+    while True:
+        marker = f.read(2)
+        if len(marker) < 2 or marker[0] != 0xFF:
+            return None
+        code = marker[1]
+        if code in (0xD8, 0x01) or 0xD0 <= code <= 0xD7:
+            continue  # Marqueurs sans longueur
+        length = struct.unpack(">H", f.read(2))[0]
+        if code == 0xE1 and orientation == 1:
+            orientation = _exif_orientation(f.read(length - 2))
+        elif code in _JPEG_SOF_MARKERS:
+            height, width = struct.unpack(">xHH", f.read(5))
+            # OpenCV applique la rotation EXIF au décodage : les orientations 5 à 8 échangent les axes
+            return (height, width) if orientation >= 5 else (width, height)
+        else:
+            f.seek(length - 2, 1)
+
+
+def read_image_size(image_path: str) -> Optional[Tuple[int, int]]:
+    """Retourne (largeur, hauteur) telles que décodées par OpenCV, en lisant seulement l'en-tête.
+
+    Les formats JPEG, PNG et BMP sont lus directement ; les autres formats sont décodés.
+    """
+    try:
+        with open(image_path, 'rb') as f:
+            head = f.read(26)
+            if head[:2] == b"\xff\xd8":
+                size = _jpeg_size(f)
+                if size is not None:
+                    return size
+            elif head[:8] == b"\x89PNG\r\n\x1a\n":
+                return struct.unpack(">II", head[16:24])
+            elif head[:2] == b"BM":
+                width, height = struct.unpack("<ii", head[18:26])
+                return width, abs(height)
+    except (OSError, struct.error):
+        logger.debug("En-tête illisible pour %s", image_path, exc_info=True)
+
+    image = cv2.imread(image_path, cv2.IMREAD_UNCHANGED)
+    if image is None:
+        return None
+    height, width = image.shape[:2]
+    return width, height
@@ -6,6 +6,9 @@ from roboflow import Roboflow
 import supervision as sv
 import sys
 import os
+import json
+import logging
+import threading
 
 # Ajouter le répertoire racine au PYTHONPATH pour pouvoir importer config
 sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(__file__))))
@@ -13,58 +16,181 @@ from config import (
     ROBOFLOW_API_KEY, ROBOFLOW_WORKSPACE, ROBOFLOW_PROJECT,
     ROBOFLOW_VERSION
 )
+try:
+    from config import INFERENCE_SERVICE_URL
+except ImportError:
+    INFERENCE_SERVICE_URL = None
+from ..utils.perf import recorder
+from .decode_pool import to_bgr
+from .image_header import read_image_size
+from .inference_service import InferenceClient
+
+logger = logging.getLogger(__name__)
+
+MODEL_CACHE_PATH = "data/model_cache.json"
 
 class ImageProcessor:
-    def __init__(self):
+    def __init__(self, model=None, decode_pool=None):
         self.model = None
         self.label_annotator = sv.LabelAnnotator()
         self.bounding_box_annotator = sv.BoxAnnotator()
         self.ai_assist_enabled = False
         self.confidence_threshold = 0.4  # Seuil de confiance par défaut à 40%
+        self.last_predictions = None  # Prédictions brutes de la dernière détection
+        # Conservé entre les activations de l'assistance IA ; un modèle fourni (méthode
+        # predict(chemin, confidence, overlap)) remplace celui de la configuration
+        self._loaded_model = model
+        self._model_lock = threading.Lock()
+        # Pool de décodage en mémoire partagée (optionnel) pour les grandes images
+        self.decode_pool = decode_pool
     
     def set_confidence_threshold(self, threshold: float):
         """Définit le seuil de confiance pour filtrer les prédictions."""
         self.confidence_threshold = threshold
     
-    def enable_ai_assist(self):
-        """Active l'assistance IA et initialise le modèle Roboflow."""
-        if not self.ai_assist_enabled:
+    @staticmethod
+    def is_ai_configured() -> bool:
+        """Vrai si un service d'inférence ou une clé Roboflow est configuré."""
+        return bool(INFERENCE_SERVICE_URL or ROBOFLOW_API_KEY)
+    
+    def load_model(self):
+        """Initialise le modèle une seule fois (thread-safe) et le conserve ensuite."""
+        with self._model_lock:
+            if self._loaded_model is None:
+                self._loaded_model = self._create_model()
+            return self._loaded_model
+    
+    def warm_up(self):
+        """Prépare le modèle dans un thread démon ; un échec sera signalé à l'activation."""
+        def load():
             try:
-                print("Initialisation du modèle Roboflow...")
-                print(f"API Key : {ROBOFLOW_API_KEY[:5]}...")
-                print(f"Workspace : {ROBOFLOW_WORKSPACE}")
-                print(f"Project : {ROBOFLOW_PROJECT}")
-                print(f"Version : {ROBOFLOW_VERSION}")
-                
-                rf = Roboflow(api_key=ROBOFLOW_API_KEY)
-                print("Roboflow initialisé")
-                
-                workspace = rf.workspace(ROBOFLOW_WORKSPACE)
-                print("Workspace chargé")
-                
-                project = workspace.project(ROBOFLOW_PROJECT)
-                print("Projet chargé")
-                
-                self.model = project.version(ROBOFLOW_VERSION).model
-                print("Modèle chargé")
-                
-                self.ai_assist_enabled = True
-                print("Modèle Roboflow initialisé avec succès")
+                self.load_model()
             except Exception as e:
-                print(f"Erreur lors de l'initialisation du modèle : {str(e)}")
-                print(f"Type de l'erreur : {type(e)}")
-                import traceback
-                print(f"Traceback complet :\n{traceback.format_exc()}")
-                raise
+                logger.warning("Préchargement du modèle impossible : %s", e)
+        # Thread démon : un appel réseau bloqué ne doit pas retarder la fermeture de l'application
+        threading.Thread(target=load, name="model-warm-up", daemon=True).start()
+    
+    def _create_model(self):
+        if INFERENCE_SERVICE_URL:
+            # Le modèle est chargé une seule fois par le service partagé
+            logger.info("Utilisation du service d'inférence %s", INFERENCE_SERVICE_URL)
+            return InferenceClient(INFERENCE_SERVICE_URL)
+        return self._create_roboflow_model()
+    
+    def _create_roboflow_model(self):
+        """Modèle Roboflow de la configuration, jamais le client du service d'inférence."""
+        model = self._model_from_cache()
+        if model is not None:
+            return model
+        
+        try:
+            logger.info("Initialisation du modèle Roboflow...")
+            logger.debug("API Key : %s...", ROBOFLOW_API_KEY[:5])
+            logger.debug("Workspace : %s / Project : %s / Version : %s",
+                         ROBOFLOW_WORKSPACE, ROBOFLOW_PROJECT, ROBOFLOW_VERSION)
+            
+            rf = Roboflow(api_key=ROBOFLOW_API_KEY)
+            workspace = rf.workspace(ROBOFLOW_WORKSPACE)
+            project = workspace.project(ROBOFLOW_PROJECT)
+            model = project.version(ROBOFLOW_VERSION).model
+            
+            logger.info("Modèle Roboflow initialisé avec succès")
+        except Exception:
+            logger.exception("Erreur lors de l'initialisation du modèle")
+            raise
+        self._save_model_metadata(model)
+        return model
+    
+    @staticmethod
+    def _model_key() -> str:
+        return f"{ROBOFLOW_WORKSPACE}/{ROBOFLOW_PROJECT}/{ROBOFLOW_VERSION}"
+    
+    def _model_from_cache(self):
+        """Recrée le modèle depuis les métadonnées en cache, sans appel réseau."""
+        try:
+            with open(MODEL_CACHE_PATH, 'r') as f:
+                metadata = json.load(f).get(self._model_key())
+            from roboflow.models.object_detection import ObjectDetectionModel
+        except (OSError, ValueError, ImportError):
+            return None
+        if not metadata:
+            return None
+        logger.info("Modèle Roboflow recréé depuis le cache %s", MODEL_CACHE_PATH)
+        return ObjectDetectionModel(ROBOFLOW_API_KEY, metadata["id"], name=metadata["name"],
+                                    version=metadata["version"], colors=metadata["colors"],
+                                    preprocessing=metadata["preprocessing"])
+    
+    def _save_model_metadata(self, model):
+        """Mémorise les métadonnées du modèle de détection pour les lancements suivants."""
+        if type(model).__name__ != "ObjectDetectionModel":
+            return
+        try:
+            with open(MODEL_CACHE_PATH, 'r') as f:
+                cache = json.load(f)
+        except (OSError, ValueError):
+            cache = {}
+        cache[self._model_key()] = {
+            "id": model.id,
+            "name": model.name,
+            "version": model.version,
+            "colors": model.colors,
+            "preprocessing": model.preprocessing,
+        }
+        try:
+            os.makedirs(os.path.dirname(MODEL_CACHE_PATH), exist_ok=True)
+            tmp_path = MODEL_CACHE_PATH + ".tmp"
+            with open(tmp_path, 'w') as f:
+                json.dump(cache, f, indent=2)
+            os.replace(tmp_path, MODEL_CACHE_PATH)
+        except OSError:
+            logger.warning("Impossible d'écrire le cache du modèle %s", MODEL_CACHE_PATH, exc_info=True)
+    
+    def enable_ai_assist(self):
+        """Active l'assistance IA ; le modèle n'est initialisé qu'à la première activation."""
+        if not self.ai_assist_enabled:
+            self.model = self.load_model()
+            self.ai_assist_enabled = True
     
     def disable_ai_assist(self):
-        """Désactive l'assistance IA."""
+        """Désactive l'assistance IA (le modèle reste chargé pour la prochaine activation)."""
         self.ai_assist_enabled = False
-        self.model = None
     
     def load_image(self, image_path: str) -> np.ndarray:
         """Charge une image depuis un chemin."""
-        return cv2.imread(image_path)
+        with recorder.stage("decode", image_path):
+            if self.decode_pool is not None and self.decode_pool.accepts(image_path):
+                return self.decode_pool.load(image_path)
+            return cv2.imread(image_path)
+    
+    def load_image_reduced(self, image_path: str, target_side: int = 1000):
+        """Décode un JPEG à résolution réduite (1/2, 1/4 ou 1/8) pour un premier affichage rapide.
+        
+        Retourne (image, échelle image réduite / pleine résolution, (largeur, hauteur) pleine
+        résolution), ou None si l'image est petite ou n'est pas un JPEG.
+        """
+        if not image_path.lower().endswith(('.jpg', '.jpeg')):
+            return None
+        size = read_image_size(image_path)
+        if size is None:
+            return None
+        # Le plus fort facteur de réduction qui garde au moins target_side pixels sur le grand côté
+        factor = 1
+        for candidate in (2, 4, 8):
+            if max(size) / candidate >= target_side:
+                factor = candidate
+        if factor == 1:
+            return None
+        flags = {2: cv2.IMREAD_REDUCED_COLOR_2, 4: cv2.IMREAD_REDUCED_COLOR_4, 8: cv2.IMREAD_REDUCED_COLOR_8}
+        with recorder.stage("decode", image_path):
+            image = cv2.imread(image_path, flags[factor])
+        if image is None:
+            return None
+        return image, image.shape[1] / size[0], size
+    
+    @staticmethod
+    def to_bgr(image: np.ndarray) -> np.ndarray:
+        """Convertit une image en BGR 8 bits à 3 canaux contigus (sans copie si c'est déjà le cas)."""
+        return to_bgr(image)
     
     def display_image(self, image: np.ndarray, label):
         """Affiche une image dans un QLabel."""
@@ -81,86 +207,77 @@ class ImageProcessor:
     
     def run_detection(self, image_path: str) -> tuple:
         """Exécute la détection sur une image."""
+        self.last_predictions = None
         if not self.ai_assist_enabled or self.model is None:
             return None, None
         
         try:
-            print("Exécution de la prédiction via l'API Roboflow...")
-            result = self.model.predict(image_path, confidence=40, overlap=30)
-            print(f"Résultat brut : {result}")
+            self.last_predictions = self.predict(image_path)
+            with recorder.stage("postprocess", image_path):
+                return self.predictions_to_detections(self.last_predictions, read_image_size(image_path))
             
-            if result is None:
-                raise Exception("La prédiction a retourné None")
+        except Exception:
+            logger.exception("Erreur lors de la détection")
+            return None, None
+    
+    def predict(self, image_path: str) -> list:
+        """Interroge le modèle et retourne les prédictions brutes (utilisable hors du thread de l'interface)."""
+        model = self.load_model()
+        with recorder.stage("inference", image_path):
+            result = model.predict(image_path, confidence=40, overlap=30)
+        
+        if result is None:
+            raise Exception("La prédiction a retourné None")
+        results = result if isinstance(result, dict) else result.json()
+        return results['predictions']
+    
+    def predictions_to_detections(self, predictions: list, image_size) -> tuple:
+        """Convertit les prédictions brutes en détections filtrées par le seuil de confiance."""
+        # Convertir les résultats en format supervision
+        boxes = []
+        confidences = []
+        class_ids = []
+        labels = []
+        
+        # Dimensions de l'image (largeur, hauteur)
+        image_width, image_height = image_size
+        
+        for prediction in predictions:
+            confidence = prediction['confidence']
+            if confidence >= self.confidence_threshold:
+                # Calculer la boîte englobante
+                x = float(prediction['x'])
+                y = float(prediction['y'])
+                width = float(prediction['width'])
+                height = float(prediction['height'])
                 
-            if isinstance(result, dict):
-                results = result
-            else:
-                results = result.json()
+                # Calculer les coordonnées des coins
+                x1 = max(0, x - width/2)
+                y1 = max(0, y - height/2)
+                x2 = min(image_width, x + width/2)
+                y2 = min(image_height, y + height/2)
                 
-            print(f"Résultats de la prédiction : {results}")
-            
-            # Convertir les résultats en format supervision
-            boxes = []
-            confidences = []
-            class_ids = []
-            labels = []
-            
-            # Obtenir les dimensions de l'image
-            image = cv2.imread(image_path)
-            image_height, image_width = image.shape[:2]
-            print(f"Dimensions de l'image : {image_width}x{image_height}")
-            
-            for prediction in results['predictions']:
-                confidence = prediction['confidence']
-                if confidence >= self.confidence_threshold:
-                    # Calculer la boîte englobante
-                    x = float(prediction['x'])
-                    y = float(prediction['y'])
-                    width = float(prediction['width'])
-                    height = float(prediction['height'])
-                    
-                    # Calculer les coordonnées des coins
-                    x1 = max(0, x - width/2)
-                    y1 = max(0, y - height/2)
-                    x2 = min(image_width, x + width/2)
-                    y2 = min(image_height, y + height/2)
-                    
-                    print(f"Boîte englobante : x={x}, y={y}, w={width}, h={height}")
-                    print(f"Coins : ({x1}, {y1}), ({x2}, {y2})")
-                    
-                    boxes.append([x1, y1, x2, y2])
-                    confidences.append(confidence)
-                    class_ids.append(0)  # 0 pour "hold"
-                    labels.append(f"Hold ({confidence*100:.1f}%)")
-            
-            if not boxes:
-                print("Aucune détection ne dépasse le seuil de confiance")
-                return None, None
-                
-            # Créer l'objet Detections
-            boxes = np.array(boxes, dtype=np.float32)
-            confidences = np.array(confidences, dtype=np.float32)
-            class_ids = np.array(class_ids, dtype=np.int32)
-            
-            print(f"Boxes shape: {boxes.shape}")
-            print(f"Confidences shape: {confidences.shape}")
-            print(f"Class IDs shape: {class_ids.shape}")
-            
-            detections = sv.Detections(
-                xyxy=boxes,
-                confidence=confidences,
-                class_id=class_ids
-            )
-            
-            print(f"Nombre de détections trouvées : {len(detections)}")
-            return detections, labels
-            
-        except Exception as e:
-            print(f"Erreur lors de la détection : {str(e)}")
-            print(f"Type de l'erreur : {type(e)}")
-            import traceback
-            print(f"Traceback complet :\n{traceback.format_exc()}")
+                boxes.append([x1, y1, x2, y2])
+                confidences.append(confidence)
+                class_ids.append(0)  # 0 pour "hold"
+                labels.append(f"Hold ({confidence*100:.1f}%)")
+        
+        logger.debug("%d prédictions reçues, %d au-dessus du seuil de %.2f",
+                     len(predictions), len(boxes), self.confidence_threshold)
+        
+        if not boxes:
+            logger.info("Aucune détection ne dépasse le seuil de confiance")
             return None, None
+        
+        # Créer l'objet Detections
+        detections = sv.Detections(
+            xyxy=np.array(boxes, dtype=np.float32),
+            confidence=np.array(confidences, dtype=np.float32),
+            class_id=np.array(class_ids, dtype=np.int32)
+        )
+        
+        logger.info("Nombre de détections trouvées : %d", len(detections))
+        return detections, labels
     
     def draw_annotations(self, image: np.ndarray, detections: sv.Detections, labels: list) -> np.ndarray:
         """Dessine les annotations sur l'image."""
@@ -0,0 +1,251 @@
+import logging
+import os
+import threading
+import uuid
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+from urllib.parse import urlparse
+
+from .dataset_scanner import IMAGE_EXTENSIONS, sample_name
+
+try:
+    import boto3
+except ImportError:
+    boto3 = None
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CACHE_DIR = "data/image_cache"
+
+
+def parse_s3_url(url: str) -> Tuple[str, str]:
+    """Découpe « s3://bucket/préfixe/ » en (bucket, préfixe terminé par /)."""
+    parsed = urlparse(url)
+    if parsed.scheme != "s3" or not parsed.netloc:
+        raise ValueError(f"URL S3 invalide : {url}")
+    prefix = parsed.path.lstrip('/')
+    if prefix and not prefix.endswith('/'):
+        prefix += '/'
+    return parsed.netloc, prefix
+
+
+class S3ImageSource:
+    """Images lues dans un bucket compatible S3, à travers un cache local de taille bornée.
+
+    Les objets sont copiés à la demande dans un miroir local (même arborescence que dans le
+    bucket), si bien que le reste de l'application ne manipule que des chemins de fichiers.
+    Les images voisines sont téléchargées à l'avance en parallèle ; au-delà de la taille
+    maximale du cache, les images les moins récemment utilisées sont supprimées. Les
+    annotations sont renvoyées dans le bucket à chaque sauvegarde.
+    """
+
+    def __init__(self, url: str, cache_dir: str = DEFAULT_CACHE_DIR, max_cache_bytes: int = 20 * 1024 ** 3,
+                 endpoint_url: Optional[str] = None, labels_prefix: Optional[str] = None, workers: int = 4):
+        if boto3 is None:
+            raise ImportError("boto3 est requis pour lire les images depuis S3 (pip install boto3)")
+        self.bucket, self.prefix = parse_s3_url(url)
+        self.labels_prefix = labels_prefix if labels_prefix is not None else self.prefix + "labels/"
+        self.root = os.path.abspath(os.path.join(cache_dir, self.bucket, self.prefix))
+        self.max_cache_bytes = max_cache_bytes
+        # Les clients boto3 peuvent être partagés entre threads
+        self.client = boto3.client("s3", endpoint_url=endpoint_url)
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="s3")
+        self._lock = threading.Lock()
+        self._inflight: Dict[str, Future] = {}
+        self._uploads: Dict[str, Future] = {}
+        self._cached: "OrderedDict[str, int]" = OrderedDict()  # Chemin local -> taille, du plus ancien au plus récent
+        self._cached_bytes = 0
+        self._pinned = None  # Image affichée : jamais évincée
+        self._held: Dict[str, Set[str]] = {}  # Images lues par des tâches d'arrière-plan, par usage
+        os.makedirs(self.root, exist_ok=True)
+        self._load_cache()
+
+    def _load_cache(self):
+        """Recense les fichiers déjà présents dans le cache, les plus anciens en premier."""
+        files = []
+        for directory, _, names in os.walk(self.root):
+            for name in names:
+                if name.lower().endswith(IMAGE_EXTENSIONS):
+                    path = os.path.join(directory, name)
+                    stat = os.stat(path)
+                    files.append((stat.st_atime, path, stat.st_size))
+        for _, path, size in sorted(files):
+            self._cached[path] = size
+            self._cached_bytes += size
+
+    def _paginate(self, prefix: str):
+        paginator = self.client.get_paginator("list_objects_v2")
+        for page in paginator.paginate(Bucket=self.bucket, Prefix=prefix):
+            yield from page.get("Contents", [])
+
+    def list_images(self) -> List[str]:
+        """Chemins relatifs (au préfixe) des images du bucket, hors dossier des annotations."""
+        images = []
+        for item in self._paginate(self.prefix):
+            key = item["Key"]
+            if key.startswith(self.labels_prefix) or not key.lower().endswith(IMAGE_EXTENSIONS):
+                continue
+            images.append(key[len(self.prefix):])
+        return images
+
+    def local_path(self, rel_path: str) -> str:
+        return os.path.join(self.root, *rel_path.split('/'))
+
+    def _rel_path(self, local_path: str) -> str:
+        return os.path.relpath(os.path.abspath(local_path), self.root).replace(os.sep, '/')
+
+    def _key(self, local_path: str) -> str:
+        return self.prefix + self._rel_path(local_path)
+
+    def fetch(self, local_path: str, pin: bool = False) -> str:
+        """Garantit la présence locale de l'image (téléchargement si besoin) et retourne son chemin.
+
+        pin protège l'image de l'éviction jusqu'au prochain appel avec pin (image affichée).
+        """
+        local_path = os.path.abspath(local_path)
+        with self._lock:
+            if pin:
+                self._pinned = local_path
+            if local_path in self._cached and os.path.exists(local_path):
+                self._cached.move_to_end(local_path)
+                return local_path
+            future = self._inflight.get(local_path)
+            if future is None:
+                future = self.executor.submit(self._download, local_path)
+                self._inflight[local_path] = future
+        return future.result()
+
+    def prefetch(self, local_paths: Iterable[str]):
+        """Lance en arrière-plan le téléchargement des images absentes du cache."""
+        with self._lock:
+            for local_path in map(os.path.abspath, local_paths):
+                if local_path in self._cached or local_path in self._inflight:
+                    continue
+                self._inflight[local_path] = self.executor.submit(self._download, local_path)
+
+    def _get_object(self, key: str, local_path: str):
+        """Télécharge un objet sous un nom temporaire puis le renomme : jamais de fichier lu à moitié écrit."""
+        os.makedirs(os.path.dirname(local_path), exist_ok=True)
+        tmp_path = f"{local_path}.{uuid.uuid4().hex[:8]}.part"
+        try:
+            self.client.download_file(self.bucket, key, tmp_path)
+            os.replace(tmp_path, local_path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+    def _download(self, local_path: str) -> str:
+        try:
+            self._get_object(self._key(local_path), local_path)
+            size = os.path.getsize(local_path)
+            with self._lock:
+                self._cached_bytes += size - self._cached.pop(local_path, 0)
+                self._cached[local_path] = size
+                self._evict(keep=local_path)
+            logger.debug("Image téléchargée : %s", local_path)
+            return local_path
+        finally:
+            with self._lock:
+                self._inflight.pop(local_path, None)
+
+    def hold(self, usage: str, local_paths: Iterable[str]):
+        """Protège de l'éviction les images lues par une tâche d'arrière-plan.
+
+        Chaque usage (index, vignettes, images voisines...) remplace son jeu précédent ; une
+        liste vide lève la protection.
+        """
+        paths = set(map(os.path.abspath, local_paths))
+        with self._lock:
+            if paths:
+                self._held[usage] = paths
+            else:
+                self._held.pop(usage, None)
+
+    def forget(self, local_path: str):
+        """Retire du cache une image qui a quitté le miroir local (image terminée, déplacée)."""
+        local_path = os.path.abspath(local_path)
+        with self._lock:
+            self._cached_bytes -= self._cached.pop(local_path, 0)
+            if self._pinned == local_path:
+                self._pinned = None
+
+    def _evict(self, keep: str):
+        """Supprime les images les moins récemment utilisées jusqu'à repasser sous la taille maximale.
+
+        Les images protégées (affichée, en cours de lecture) sont gardées, quitte à dépasser
+        temporairement la taille maximale.
+        """
+        held = set().union(*self._held.values())
+        for path, size in list(self._cached.items()):
+            if self._cached_bytes <= self.max_cache_bytes:
+                break
+            if path == keep or path == self._pinned or path in held:
+                continue
+            del self._cached[path]
+            self._cached_bytes -= size
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+    def upload_label(self, image_path: str, label_path: str) -> Future:
+        """Renvoie en arrière-plan le fichier d'annotations de l'image dans le bucket.
+
+        La clé reprend le chemin de l'image relatif au préfixe : deux homonymes de dossiers
+        différents n'écrasent pas leurs annotations.
+        """
+        key = self.labels_prefix + os.path.splitext(self._rel_path(image_path))[0] + ".txt"
+        with self._lock:
+            previous = self._uploads.get(key)
+
+        def upload():
+            # Les envois d'un même fichier restent dans l'ordre des sauvegardes
+            if previous is not None:
+                try:
+                    previous.result()
+                except Exception:
+                    pass
+            self.client.upload_file(label_path, self.bucket, key)
+            logger.debug("Annotations envoyées : s3://%s/%s", self.bucket, key)
+
+        def report(future):
+            if not future.cancelled() and future.exception() is not None:
+                logger.error("Envoi des annotations %s impossible : %s", key, future.exception())
+
+        future = self.executor.submit(upload)
+        future.add_done_callback(report)
+        with self._lock:
+            self._uploads[key] = future
+        return future
+
+    def sync_labels(self, labels_dir: str) -> int:
+        """Télécharge les annotations du bucket absentes ou plus récentes que la copie locale.
+
+        Les clés suivent l'arborescence des images ; la copie locale prend le nom à plat de
+        l'image (voir sample_name).
+        """
+        os.makedirs(labels_dir, exist_ok=True)
+        futures = []
+        for item in self._paginate(self.labels_prefix):
+            rel_path = item["Key"][len(self.labels_prefix):]
+            if not rel_path.endswith('.txt'):
+                continue
+            local_path = os.path.join(labels_dir, sample_name(rel_path) + ".txt")
+            try:
+                if os.path.getmtime(local_path) >= item["LastModified"].timestamp():
+                    continue
+            except OSError:
+                pass
+            futures.append(self.executor.submit(self._get_object, item["Key"], local_path))
+        for future in futures:
+            future.result()
+        return len(futures)
+
+    def shutdown(self):
+        """Abandonne les téléchargements anticipés et attend la fin des envois d'annotations."""
+        with self._lock:
+            for future in self._inflight.values():
+                future.cancel()
+        self.executor.shutdown(wait=True)
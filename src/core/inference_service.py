@@ -0,0 +1,210 @@
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+import urllib.request
+from collections import OrderedDict, deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Tuple
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_PORT = 8765
+
+
+def image_digest(image_path: str) -> str:
+    """Empreinte SHA-1 du contenu d'une image (deux chemins identiques partagent leur résultat)."""
+    digest = hashlib.sha1()
+    with open(image_path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class RoboflowDetector:
+    """Détecteur chargé une seule fois et partagé par tous les clients du service.
+
+    Le modèle Roboflow est toujours créé directement : le service ne doit jamais passer par
+    INFERENCE_SERVICE_URL, qui le renverrait vers lui-même.
+    """
+
+    def __init__(self):
+        from .image_processor import ImageProcessor
+        self.model = ImageProcessor()._create_roboflow_model()
+
+    def predict(self, image_path: str, confidence: int, overlap: int) -> dict:
+        """Une prédiction ; retourne la réponse brute de l'API."""
+        result = self.model.predict(image_path, confidence=confidence, overlap=overlap)
+        return result if isinstance(result, dict) else result.json()
+
+
+class _Pending:
+    """Requête en attente : toutes les demandes identiques partagent la même prédiction."""
+
+    def __init__(self, key, image_path, confidence, overlap):
+        self.key = key
+        self.item = (image_path, confidence, overlap)
+        self.futures: List[Tuple[Future, float]] = []
+
+
+class InferenceService:
+    """Partage les prédictions entre clients : dédoublonnage des requêtes identiques et cache par contenu d'image.
+
+    Chaque nouvelle requête part vers le détecteur dès son arrivée, sur un pool de
+    max_parallel appels simultanés : une image lente ne retient pas les autres.
+    """
+
+    def __init__(self, detector, max_parallel: int = 8, cache_size: int = 1024):
+        self.detector = detector
+        self.cache_size = cache_size
+        self._cache: "OrderedDict[str, dict]" = OrderedDict()
+        self._pending: Dict[str, _Pending] = {}
+        self._lock = threading.Lock()
+        self._latencies = deque(maxlen=1000)
+        self._stats = {"requests": 0, "cache_hits": 0, "deduplicated": 0, "predictions": 0, "errors": 0}
+        self._pool = ThreadPoolExecutor(max_workers=max_parallel, thread_name_prefix="detector")
+
+    def submit(self, image_path: str, confidence: int = 40, overlap: int = 30) -> Future:
+        """Soumet une prédiction et retourne un Future résolu avec la réponse brute de l'API."""
+        submitted = time.perf_counter()
+        key = f"{image_digest(image_path)}:{confidence}:{overlap}"
+        future: Future = Future()
+        with self._lock:
+            self._stats["requests"] += 1
+            cached = self._cache.get(key)
+            if cached is not None:
+                self._cache.move_to_end(key)
+                self._stats["cache_hits"] += 1
+                self._latencies.append(time.perf_counter() - submitted)
+                future.set_result(cached)
+                return future
+            pending = self._pending.get(key)
+            if pending is not None:
+                # Même image déjà en file : on attend la même prédiction
+                self._stats["deduplicated"] += 1
+                pending.futures.append((future, submitted))
+                return future
+            pending = _Pending(key, image_path, confidence, overlap)
+            pending.futures.append((future, submitted))
+            self._pending[key] = pending
+        self._pool.submit(self._run, pending)
+        return future
+
+    def _run(self, pending: _Pending):
+        try:
+            result, error = self.detector.predict(*pending.item), None
+        except Exception as e:
+            logger.exception("Erreur lors de la prédiction de %s", pending.item[0])
+            result, error = None, e
+        self._complete(pending, result, error)
+
+    def _complete(self, pending: _Pending, result: dict, error):
+        finished = time.perf_counter()
+        with self._lock:
+            self._stats["predictions"] += 1
+            del self._pending[pending.key]
+            if error is None:
+                self._cache[pending.key] = result
+                if len(self._cache) > self.cache_size:
+                    self._cache.popitem(last=False)
+            else:
+                self._stats["errors"] += 1
+            futures = pending.futures
+        for future, submitted in futures:
+            self._latencies.append(finished - submitted)
+            if error is None:
+                future.set_result(result)
+            else:
+                future.set_exception(error)
+
+    def metrics(self) -> dict:
+        """Profondeur de file, taux de cache et latences (p50/p95 en ms)."""
+        with self._lock:
+            latencies = sorted(self._latencies)
+            stats = dict(self._stats)
+            stats["in_flight"] = len(self._pending)
+            stats["cache_entries"] = len(self._cache)
+        for name, q in (("latency_p50_ms", 0.50), ("latency_p95_ms", 0.95)):
+            stats[name] = latencies[int(q * (len(latencies) - 1))] * 1000.0 if latencies else None
+        return stats
+
+
+class _Handler(BaseHTTPRequestHandler):
+    service: InferenceService = None
+    timeout_s: float = 120.0
+
+    def _send_json(self, status: int, payload: dict):
+        body = json.dumps(payload).encode('utf-8')
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        if self.path == "/metrics":
+            self._send_json(200, self.service.metrics())
+        else:
+            self._send_json(404, {"error": "inconnu"})
+
+    def do_POST(self):
+        if self.path != "/predict":
+            self._send_json(404, {"error": "inconnu"})
+            return
+        try:
+            length = int(self.headers.get("Content-Length", 0))
+            request = json.loads(self.rfile.read(length))
+            future = self.service.submit(
+                request["image_path"],
+                int(request.get("confidence", 40)),
+                int(request.get("overlap", 30)),
+            )
+            self._send_json(200, future.result(timeout=self.timeout_s))
+        except Exception as e:
+            self._send_json(500, {"error": str(e)})
+
+    def log_message(self, format, *args):
+        logger.debug("%s - %s", self.address_string(), format % args)
+
+
+def serve(service: InferenceService, host: str = "127.0.0.1", port: int = DEFAULT_PORT):
+    """Expose le service en HTTP local (POST /predict, GET /metrics)."""
+    handler = type("InferenceHandler", (_Handler,), {"service": service})
+    server = ThreadingHTTPServer((host, port), handler)
+    logger.info("Service d'inférence à l'écoute sur http://%s:%d", host, port)
+    try:
+        server.serve_forever()
+    finally:
+        server.server_close()
+
+
+class InferenceClient:
+    """Client du service d'inférence local ; s'utilise comme le modèle Roboflow (méthode predict)."""
+
+    def __init__(self, url: str, timeout: float = 120.0):
+        self.url = url.rstrip('/')
+        self.timeout = timeout
+
+    def _request(self, path: str, payload: dict = None) -> dict:
+        data = json.dumps(payload).encode('utf-8') if payload is not None else None
+        request = urllib.request.Request(
+            self.url + path, data=data,
+            headers={"Content-Type": "application/json"} if data else {}
+        )
+        with urllib.request.urlopen(request, timeout=self.timeout) as response:
+            return json.loads(response.read())
+
+    def predict(self, image_path: str, confidence: int = 40, overlap: int = 30) -> dict:
+        """Demande une prédiction au service ; retourne la réponse brute (clé 'predictions')."""
+        return self._request("/predict", {
+            "image_path": os.path.abspath(image_path),
+            "confidence": confidence,
+            "overlap": overlap,
+        })
+
+    def metrics(self) -> dict:
+        """Retourne les métriques du service."""
+        return self._request("/metrics")
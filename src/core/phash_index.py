@@ -0,0 +1,189 @@
+import json
+import logging
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import cv2
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CACHE_PATH = "data/phash_cache.json"
+HASH_BITS = 64
+
+
+def compute_phash(image_path: str) -> Optional[int]:
+    """Hash perceptuel 64 bits (DCT 32x32, 8x8 basses fréquences comparées à leur médiane)."""
+    # Le décodage réduit au quart suffit pour une vignette 32x32 et divise le coût du JPEG
+    image = cv2.imread(image_path, cv2.IMREAD_REDUCED_GRAYSCALE_4)
+    if image is None:
+        return None
+    small = cv2.resize(image, (32, 32), interpolation=cv2.INTER_AREA).astype(np.float32)
+    low = cv2.dct(small)[:8, :8].flatten()
+    bits = low > np.median(low[1:])
+    return int.from_bytes(np.packbits(bits).tobytes(), 'big')
+
+
+def _hash_file(item: Tuple[str, int, int]) -> Tuple[str, int, int, Optional[int]]:
+    path, mtime_ns, size = item
+    cv2.setNumThreads(1)
+    return path, mtime_ns, size, compute_phash(path)
+
+
+def hamming(a: int, b: int) -> int:
+    """Distance de Hamming entre deux hashs."""
+    return bin(a ^ b).count("1")
+
+
+class PHashIndex:
+    """Index de hashs perceptuels avec recherche par rayon de Hamming.
+
+    Le hash est découpé en rayon+1 segments (multi-index hashing) : deux hashs à distance
+    inférieure ou égale au rayon partagent forcément au moins un segment identique, ce qui
+    limite la comparaison complète aux images d'un même seau.
+    """
+
+    def __init__(self, cache_path: str = DEFAULT_CACHE_PATH, radius: int = 6):
+        self.cache_path = cache_path
+        self.radius = radius
+        self.entries: Dict[str, dict] = {}
+        bounds = np.linspace(0, HASH_BITS, radius + 2).astype(int)
+        self._segments = [(int(lo), int(hi)) for lo, hi in zip(bounds[:-1], bounds[1:])]
+        self._buckets: List[Dict[int, set]] = [{} for _ in self._segments]
+        self._build_lock = threading.Lock()
+        self._load()
+
+    def _load(self):
+        try:
+            with open(self.cache_path, 'r') as f:
+                self.entries = json.load(f)
+        except (OSError, ValueError):
+            self.entries = {}
+        for path, entry in self.entries.items():
+            if entry.get("hash") is not None:
+                self._add_to_buckets(path, entry["hash"])
+
+    def save(self):
+        """Écrit le cache de manière atomique."""
+        directory = os.path.dirname(self.cache_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp_path = self.cache_path + ".tmp"
+        with open(tmp_path, 'w') as f:
+            f.write(json.dumps(self.entries, separators=(',', ':')))
+        os.replace(tmp_path, self.cache_path)
+
+    def _segment_keys(self, value: int):
+        for i, (lo, hi) in enumerate(self._segments):
+            yield i, (value >> lo) & ((1 << (hi - lo)) - 1)
+
+    def _add_to_buckets(self, path: str, value: int):
+        for i, key in self._segment_keys(value):
+            self._buckets[i].setdefault(key, set()).add(path)
+
+    def _remove_from_buckets(self, path: str, value: int):
+        for i, key in self._segment_keys(value):
+            bucket = self._buckets[i].get(key)
+            if bucket is not None:
+                bucket.discard(path)
+
+    def build(self, image_paths: Iterable[str], workers: Optional[int] = None) -> int:
+        """Calcule en parallèle les hashs manquants ou périmés (mtime/taille) ; retourne leur nombre.
+
+        Les entrées des images absentes de la liste ou disparues (déplacées une fois
+        terminées) sont retirées de l'index.
+        """
+        with self._build_lock:
+            return self._build(image_paths, workers)
+
+    def _build(self, image_paths: Iterable[str], workers: Optional[int]) -> int:
+        todo = []
+        present = set()
+        for path in image_paths:
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            present.add(path)
+            entry = self.entries.get(path)
+            if entry and entry["mtime_ns"] == stat.st_mtime_ns and entry["size"] == stat.st_size:
+                continue
+            todo.append((path, stat.st_mtime_ns, stat.st_size))
+
+        stale = [path for path in self.entries if path not in present]
+        for path in stale:
+            self.remove(path)
+        if stale:
+            logger.info("%d hashs d'images disparues retirés de l'index", len(stale))
+
+        if todo:
+            logger.info("Calcul de %d hashs perceptuels...", len(todo))
+            # spawn : ne pas dupliquer par fork un processus qui a déjà des threads (Qt)
+            context = multiprocessing.get_context("spawn")
+            with ProcessPoolExecutor(max_workers=workers, mp_context=context) as pool:
+                chunksize = max(1, len(todo) // (8 * (workers or os.cpu_count() or 1)))
+                for path, mtime_ns, size, value in pool.map(_hash_file, todo, chunksize=chunksize):
+                    self.add(path, value, mtime_ns, size)
+        if todo or stale:
+            self.save()
+        return len(todo)
+
+    def remove(self, path: str):
+        """Retire une image de l'index."""
+        entry = self.entries.pop(path, None)
+        if entry and entry.get("hash") is not None:
+            self._remove_from_buckets(path, entry["hash"])
+
+    def add(self, path: str, value: Optional[int], mtime_ns: int = 0, size: int = 0):
+        """Ajoute ou remplace le hash d'une image."""
+        previous = self.entries.get(path)
+        if previous and previous.get("hash") is not None:
+            self._remove_from_buckets(path, previous["hash"])
+        self.entries[path] = {"mtime_ns": mtime_ns, "size": size, "hash": value}
+        if value is not None:
+            self._add_to_buckets(path, value)
+
+    def query(self, value: int, radius: Optional[int] = None) -> List[Tuple[str, int]]:
+        """Retourne les images à distance de Hamming inférieure ou égale au rayon, triées."""
+        radius = self.radius if radius is None else min(radius, self.radius)
+        candidates = set()
+        for i, key in self._segment_keys(value):
+            candidates.update(self._buckets[i].get(key, ()))
+        matches = []
+        for path in candidates:
+            distance = hamming(value, self.entries[path]["hash"])
+            if distance <= radius:
+                matches.append((path, distance))
+        return sorted(matches, key=lambda match: (match[1], match[0]))
+
+    def duplicates_of(self, path: str, radius: Optional[int] = None) -> List[Tuple[str, int]]:
+        """Quasi-doublons d'une image indexée (l'image elle-même exclue)."""
+        entry = self.entries.get(path)
+        if not entry or entry.get("hash") is None:
+            return []
+        return [match for match in self.query(entry["hash"], radius) if match[0] != path]
+
+    def groups(self, image_paths: Iterable[str], radius: Optional[int] = None) -> List[List[str]]:
+        """Regroupe les images données en composantes de quasi-doublons (ordre d'origine conservé)."""
+        image_paths = list(image_paths)
+        members = set(image_paths)
+        parent = {path: path for path in image_paths}
+
+        def find(path):
+            while parent[path] != path:
+                parent[path] = parent[parent[path]]
+                path = parent[path]
+            return path
+
+        for path in image_paths:
+            for other, _ in self.duplicates_of(path, radius):
+                if other in members:
+                    parent[find(other)] = find(path)
+
+        grouped: Dict[str, List[str]] = {}
+        for path in image_paths:
+            grouped.setdefault(find(path), []).append(path)
+        return list(grouped.values())
@@ -21,6 +21,9 @@ class Polygon:
         self.selected_point_index = -1
         self.is_selected = False  # Pour la sélection du polygone entier
         self.drag_start = None  # Point de départ du déplacement
+        # Propositions IA : confiance et boîte de la détection d'origine
+        self.confidence = None
+        self.source_box = None
     
     def add_point(self, x: float, y: float):
         """Ajoute un point au polygone."""
@@ -88,46 +91,58 @@ class Polygon:
         """Termine le déplacement du polygone."""
         self.drag_start = None
 
-    def draw(self, image, line_thickness=2, point_radius=5, opacity=0.1, color=None):
-        """Dessine le polygone sur l'image."""
+    def bounds(self) -> Tuple[float, float, float, float]:
+        """Rectangle englobant (x0, y0, x1, y1) du polygone."""
+        xs = [p.x for p in self.points]
+        ys = [p.y for p in self.points]
+        return min(xs), min(ys), max(xs), max(ys)
+    
+    def default_color(self):
+        """Couleur par défaut selon le type : rouge pour les prises, bleu pour les volumes."""
+        return (255, 0, 0) if self.class_type == "hold" else (0, 0, 255)
+    
+    def draw_marker(self, image, radius, color=None, scale=1.0):
+        """Dessine le polygone réduit à un point (polygone trop petit à l'écran pour être lisible)."""
+        if not self.points:
+            return
+        x0, y0, x1, y1 = self.bounds()
+        center = (int((x0 + x1) / 2 * scale), int((y0 + y1) / 2 * scale))
+        cv2.circle(image, center, radius, color if color is not None else self.default_color(), -1)
+    
+    def draw(self, image, line_thickness=2, point_radius=5, opacity=0.1, color=None, scale=1.0, draw_points=True):
+        """Dessine le polygone sur l'image (scale : taille de l'image / résolution des coordonnées)."""
         if not self.points:
             return
         
-        # Créer une copie de l'image pour le masque
-        overlay = image.copy()
-        
-        # Convertir les points en format numpy
-        points = np.array([[int(p.x), int(p.y)] for p in self.points], dtype=np.int32)
+        # Convertir les points en format numpy, dans l'espace de l'image dessinée
+        points = np.array([[int(p.x * scale), int(p.y * scale)] for p in self.points], dtype=np.int32)
         
         # Choisir la couleur en fonction du type et de la sélection
-        if color is not None:
-            fill_color = color
-            line_color = color
-        else:
-            # Couleurs par défaut
-            if self.class_type == "hold":
-                fill_color = (255, 0, 0)  # Rouge pour les prises
-                line_color = (255, 0, 0)
-            else:
-                fill_color = (0, 0, 255)  # Bleu pour les volumes
-                line_color = (0, 0, 255)
-        
-        # Dessiner le polygone rempli
-        cv2.fillPoly(overlay, [points], fill_color)
+        fill_color = line_color = color if color is not None else self.default_color()
         
-        # Fusionner avec l'image originale avec l'opacité spécifiée
-        cv2.addWeighted(overlay, opacity, image, 1 - opacity, 0, image)
+        # Le remplissage et la fusion se limitent au rectangle englobant du polygone :
+        # en dehors, la fusion laisserait les pixels inchangés
+        image_height, image_width = image.shape[:2]
+        x, y, w, h = cv2.boundingRect(points)
+        x0, y0 = max(x, 0), max(y, 0)
+        x1, y1 = min(x + w, image_width), min(y + h, image_height)
+        if x1 > x0 and y1 > y0:
+            roi = image[y0:y1, x0:x1]
+            overlay = roi.copy()
+            cv2.fillPoly(overlay, [points - (x0, y0)], fill_color)
+            
+            # Fusionner avec l'image originale avec l'opacité spécifiée
+            cv2.addWeighted(overlay, opacity, roi, 1 - opacity, 0, roi)
         
         # Dessiner les lignes du polygone
-        for i in range(len(self.points)):
-            p1 = self.points[i]
-            p2 = self.points[(i + 1) % len(self.points)]
-            cv2.line(image,
-                    (int(p1.x), int(p1.y)),
-                    (int(p2.x), int(p2.y)),
-                    line_color, line_thickness)
+        for i in range(len(points)):
+            p1 = points[i]
+            p2 = points[(i + 1) % len(points)]
+            cv2.line(image, (int(p1[0]), int(p1[1])), (int(p2[0]), int(p2[1])), line_color, line_thickness)
         
-        # Dessiner les points
-        for i, point in enumerate(self.points):
+        # Dessiner les points (masqués quand ils seraient trop petits à l'écran)
+        if not draw_points:
+            return
+        for i, point in enumerate(points):
             point_color = (0, 255, 255) if i == self.selected_point_index else line_color
-            cv2.circle(image, (int(point.x), int(point.y)), point_radius, point_color, -1) 
\ No newline at end of file
+            cv2.circle(image, (int(point[0]), int(point[1])), point_radius, point_color, -1) 
\ No newline at end of file
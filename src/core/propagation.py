@@ -0,0 +1,125 @@
+import logging
+import threading
+from collections import OrderedDict
+from typing import List, Optional, Tuple
+
+import cv2
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+def _create_detector(method: str, max_features: int):
+    """Crée le détecteur de points d'intérêt (SIFT si disponible en mode auto, sinon ORB)."""
+    if method in ("auto", "sift") and hasattr(cv2, "SIFT_create"):
+        return cv2.SIFT_create(nfeatures=max_features), cv2.NORM_L2
+    if method == "sift":
+        logger.warning("SIFT indisponible dans cette version d'OpenCV, utilisation d'ORB")
+    return cv2.ORB_create(nfeatures=max_features), cv2.NORM_HAMMING
+
+
+class AnnotationPropagator:
+    """Transfère les polygones d'une image voisine déjà annotée vers l'image courante.
+
+    Les points d'intérêt sont extraits sur des images réduites (décodage JPEG réduit puis
+    redimensionnement), appariés avec le test du ratio de Lowe, puis une homographie est
+    estimée par RANSAC et ramenée en coordonnées pleine résolution.
+    """
+
+    def __init__(self, method: str = "auto", max_side: int = 1024, max_features: int = 4000,
+                 ratio: float = 0.75, min_inliers: int = 25, cache_size: int = 8):
+        self.method = method
+        self.max_side = max_side
+        self.max_features = max_features
+        self.ratio = ratio
+        self.min_inliers = min_inliers
+        self.cache_size = cache_size
+        self._features: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def features(self, image_path: str) -> Optional[Tuple[np.ndarray, np.ndarray, int]]:
+        """Points (en pixels pleine résolution), descripteurs et norme d'une image, mis en cache."""
+        with self._lock:
+            cached = self._features.get(image_path)
+            if cached is not None:
+                self._features.move_to_end(image_path)
+                return cached
+
+        # Le décodage réduit de moitié évite de décompresser toute l'image
+        image = cv2.imread(image_path, cv2.IMREAD_REDUCED_GRAYSCALE_2)
+        if image is None:
+            logger.error("Impossible de lire l'image %s", image_path)
+            return None
+        scale = min(1.0, self.max_side / max(image.shape[:2]))
+        if scale < 1.0:
+            image = cv2.resize(image, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA)
+
+        # Un détecteur par appel : les objets OpenCV ne sont pas partagés entre threads
+        detector, norm = _create_detector(self.method, self.max_features)
+        keypoints, descriptors = detector.detectAndCompute(image, None)
+        if descriptors is None or len(keypoints) < self.min_inliers:
+            result = None
+        else:
+            points = np.float32([kp.pt for kp in keypoints]) * (2.0 / scale)
+            result = (points, descriptors, norm)
+
+        with self._lock:
+            self._features[image_path] = result
+            if len(self._features) > self.cache_size:
+                self._features.popitem(last=False)
+        return result
+
+    def estimate_homography(self, source_path: str, target_path: str) -> Optional[Tuple[np.ndarray, int]]:
+        """Homographie source -> cible et nombre d'inliers, ou None si l'appariement échoue."""
+        source = self.features(source_path)
+        target = self.features(target_path)
+        if source is None or target is None:
+            return None
+        source_points, source_descriptors, norm = source
+        target_points, target_descriptors, _ = target
+
+        matcher = cv2.BFMatcher(norm)
+        pairs = matcher.knnMatch(source_descriptors, target_descriptors, k=2)
+        good = [pair[0] for pair in pairs
+                if len(pair) == 2 and pair[0].distance < self.ratio * pair[1].distance]
+        if len(good) < self.min_inliers:
+            logger.debug("Appariement insuffisant entre %s et %s (%d)", source_path, target_path, len(good))
+            return None
+
+        src = source_points[[m.queryIdx for m in good]].reshape(-1, 1, 2)
+        dst = target_points[[m.trainIdx for m in good]].reshape(-1, 1, 2)
+        homography, mask = cv2.findHomography(src, dst, cv2.RANSAC, 5.0)
+        if homography is None:
+            return None
+        inliers = int(mask.sum())
+        # Rejeter les transformations dégénérées (retournement, écrasement, agrandissement extrême)
+        determinant = np.linalg.det(homography[:2, :2])
+        if inliers < self.min_inliers or not 0.2 < determinant < 5.0:
+            logger.debug("Homographie rejetée (%d inliers, déterminant %.2f)", inliers, determinant)
+            return None
+        return homography, inliers
+
+    def propagate(self, source_path: str, target_path: str, annotations: List[Tuple[str, list]],
+                  target_size: Tuple[int, int]) -> List[Tuple[str, list]]:
+        """Projette les annotations (type, points) de la source dans l'image cible (largeur, hauteur)."""
+        if not annotations:
+            return []
+        estimate = self.estimate_homography(source_path, target_path)
+        if estimate is None:
+            return []
+        homography, inliers = estimate
+
+        width, height = target_size
+        proposals = []
+        for class_type, points in annotations:
+            warped = cv2.perspectiveTransform(np.float32(points).reshape(-1, 1, 2), homography).reshape(-1, 2)
+            center_x, center_y = warped.mean(axis=0)
+            # Polygones sortis du champ de la nouvelle prise de vue : ignorés
+            if not (0 <= center_x < width and 0 <= center_y < height):
+                continue
+            warped[:, 0] = np.clip(warped[:, 0], 0, width - 1)
+            warped[:, 1] = np.clip(warped[:, 1], 0, height - 1)
+            proposals.append((class_type, [(float(x), float(y)) for x, y in warped]))
+
+        logger.info("%d polygones propagés depuis %s (%d inliers)", len(proposals), source_path, inliers)
+        return proposals
@@ -0,0 +1,205 @@
+import csv
+import logging
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+import cv2
+import numpy as np
+
+from .image_header import read_image_size
+from .polygon import Polygon
+from .yolo_labels import CLASS_NAMES, read_label_file
+
+logger = logging.getLogger(__name__)
+
+TILE_SIZE = (320, 240)
+CAPTION_HEIGHT = 22
+BACKGROUND = 30
+
+
+def count_classes(label_path: str) -> Dict[str, int]:
+    """Nombre de polygones par classe, sans analyser les coordonnées."""
+    counts = dict.fromkeys(CLASS_NAMES, 0)
+    with open(label_path, 'r') as f:
+        for line in f:
+            class_id = line.split(maxsplit=1)[:1]
+            if class_id and class_id[0].isdigit() and int(class_id[0]) < len(CLASS_NAMES):
+                counts[CLASS_NAMES[int(class_id[0])]] += 1
+    return counts
+
+
+def _decode_reduced(image_path: str, max_side: int) -> Tuple[Optional[np.ndarray], Optional[Tuple[int, int]]]:
+    """Décode l'image au plus fort facteur de réduction qui garde max_side ; retourne (image, taille pleine)."""
+    size = read_image_size(image_path)
+    if size is None:
+        return None, None
+    flags = cv2.IMREAD_COLOR
+    for factor, reduced in ((8, cv2.IMREAD_REDUCED_COLOR_8), (4, cv2.IMREAD_REDUCED_COLOR_4),
+                            (2, cv2.IMREAD_REDUCED_COLOR_2)):
+        if max(size) / factor >= max_side:
+            flags = reduced
+            break
+    image = cv2.imread(image_path, flags)
+    if image is None:
+        return None, None
+    if max(image.shape[:2]) > max_side:
+        resize = max_side / max(image.shape[:2])
+        image = cv2.resize(image, None, fx=resize, fy=resize, interpolation=cv2.INTER_AREA)
+    return image, size
+
+
+def render_overlay(image_path: str, label_path: str, max_side: int = 1600) -> Optional[np.ndarray]:
+    """Image réduite avec ses annotations, dessinées comme dans l'interface (Polygon.draw)."""
+    image, size = _decode_reduced(image_path, max_side)
+    if image is None:
+        return None
+    width, height = size
+    # Épaisseurs fixes en pixels de l'image réduite : le même aspect qu'à l'écran au zoom 1
+    scale = image.shape[1] / width
+    for class_id, points in read_label_file(label_path):
+        class_type = CLASS_NAMES[class_id] if class_id < len(CLASS_NAMES) else CLASS_NAMES[-1]
+        polygon = Polygon(class_type, class_type)
+        for x, y in points * (width, height):
+            polygon.add_point(x, y)
+        polygon.draw(image, line_thickness=2, point_radius=3, opacity=0.2, scale=scale)
+    return image
+
+
+def _render_sample(task: dict) -> dict:
+    """Écrit l'image de contrôle d'un échantillon (exécuté dans un processus du pool)."""
+    cv2.setNumThreads(1)
+    if not task["changed"]:
+        return {"stem": task["stem"], "rendered": False}
+    overlay = render_overlay(task["image"], task["label"], task["max_side"])
+    if overlay is None:
+        return {"stem": task["stem"], "error": f"image illisible : {task['image']}"}
+    cv2.imwrite(task["output"], overlay, [cv2.IMWRITE_JPEG_QUALITY, 85])
+    return {"stem": task["stem"], "rendered": True}
+
+
+def _caption(counts: Dict[str, int]) -> str:
+    return " / ".join(f"{count} {name}" for name, count in counts.items())
+
+
+def _compose_sheet(task: dict) -> str:
+    """Assemble une planche contact à partir des images de contrôle (exécuté dans un processus du pool)."""
+    cv2.setNumThreads(1)
+    columns, rows = task["grid"]
+    tile_width, tile_height = task["tile_size"]
+    cell_height = tile_height + CAPTION_HEIGHT
+    sheet = np.full((rows * cell_height, columns * tile_width, 3), BACKGROUND, dtype=np.uint8)
+    for position, (stem, review_path, counts) in enumerate(task["entries"]):
+        x = (position % columns) * tile_width
+        y = (position // columns) * cell_height
+        image = cv2.imread(review_path, cv2.IMREAD_REDUCED_COLOR_2)
+        if image is not None:
+            scale = min((tile_width - 4) / image.shape[1], (tile_height - 4) / image.shape[0])
+            tile = cv2.resize(image, (max(1, int(image.shape[1] * scale)), max(1, int(image.shape[0] * scale))),
+                              interpolation=cv2.INTER_AREA)
+            tx = x + (tile_width - tile.shape[1]) // 2
+            ty = y + (tile_height - tile.shape[0]) // 2
+            sheet[ty:ty + tile.shape[0], tx:tx + tile.shape[1]] = tile
+        text = f"{stem}  {_caption(counts)}"
+        cv2.putText(sheet, text[:48], (x + 4, y + tile_height + 16), cv2.FONT_HERSHEY_SIMPLEX, 0.4,
+                    (230, 230, 230), 1, cv2.LINE_AA)
+    cv2.imwrite(task["output"], sheet, [cv2.IMWRITE_JPEG_QUALITY, 85])
+    return task["output"]
+
+
+class QARenderer:
+    """Rendu hors interface des annotations d'un dossier, pour les relire d'un coup d'œil.
+
+    Chaque image annotée donne une image de contrôle réduite (review/) ; les images retenues
+    par les filtres sont ensuite assemblées en planches contact paginées (sheets/) avec le
+    nombre de polygones par classe. Une image de contrôle plus récente que l'image et ses
+    annotations n'est pas recalculée.
+    """
+
+    def __init__(self, output_dir: str, max_side: int = 1600, grid: Sequence[int] = (6, 5),
+                 tile_size: Sequence[int] = TILE_SIZE, workers: Optional[int] = None):
+        self.output_dir = output_dir
+        self.max_side = max_side
+        self.grid = tuple(grid)
+        self.tile_size = tuple(tile_size)
+        self.workers = workers
+
+    @staticmethod
+    def select(samples: Iterable[Tuple[str, str, str]], classes: Optional[Sequence[str]] = None,
+               min_polygons: int = 0, max_polygons: Optional[int] = None) -> List[Tuple[str, str, str, dict]]:
+        """Filtre les échantillons par classe présente et par nombre de polygones ; ajoute les comptes."""
+        selected = []
+        for stem, image_path, label_path in samples:
+            counts = count_classes(label_path)
+            total = sum(counts.values()) if not classes else sum(counts[name] for name in classes)
+            if classes and total == 0:
+                continue
+            if total < min_polygons or (max_polygons is not None and total > max_polygons):
+                continue
+            selected.append((stem, image_path, label_path, counts))
+        return selected
+
+    def _is_fresh(self, output: str, image_path: str, label_path: str) -> bool:
+        try:
+            rendered = os.path.getmtime(output)
+            return rendered >= os.path.getmtime(image_path) and rendered >= os.path.getmtime(label_path)
+        except OSError:
+            return False
+
+    def render(self, selected: List[Tuple[str, str, str, dict]]) -> dict:
+        """Produit images de contrôle, planches contact et résumé CSV ; retourne des statistiques."""
+        review_dir = os.path.join(self.output_dir, "review")
+        sheets_dir = os.path.join(self.output_dir, "sheets")
+        os.makedirs(review_dir, exist_ok=True)
+        os.makedirs(sheets_dir, exist_ok=True)
+
+        tasks = []
+        for stem, image_path, label_path, _ in selected:
+            output = os.path.join(review_dir, stem + ".jpg")
+            tasks.append({
+                "stem": stem, "image": image_path, "label": label_path, "output": output,
+                "max_side": self.max_side, "changed": not self._is_fresh(output, image_path, label_path),
+            })
+
+        stats = {"images": len(selected), "rendered": 0, "errors": 0, "sheets": 0}
+        failed = set()
+        per_sheet = self.grid[0] * self.grid[1]
+        with ProcessPoolExecutor(max_workers=self.workers) as pool:
+            for result in pool.map(_render_sample, tasks, chunksize=8):
+                if "error" in result:
+                    stats["errors"] += 1
+                    failed.add(result["stem"])
+                    logger.warning(result["error"])
+                elif result["rendered"]:
+                    stats["rendered"] += 1
+
+            entries = [(stem, task["output"], counts)
+                       for (stem, _, _, counts), task in zip(selected, tasks) if stem not in failed]
+            sheet_tasks = []
+            for page, start in enumerate(range(0, len(entries), per_sheet), start=1):
+                sheet_tasks.append({
+                    "entries": entries[start:start + per_sheet], "grid": self.grid, "tile_size": self.tile_size,
+                    "output": os.path.join(sheets_dir, f"page_{page:04d}.jpg"),
+                })
+            for _ in pool.map(_compose_sheet, sheet_tasks):
+                stats["sheets"] += 1
+
+        self._remove_stale_sheets(sheets_dir, len(sheet_tasks))
+        self._write_summary(entries, per_sheet)
+        return stats
+
+    @staticmethod
+    def _remove_stale_sheets(sheets_dir: str, count: int):
+        """Supprime les planches d'une exécution précédente plus longue."""
+        for name in os.listdir(sheets_dir):
+            number = name[5:-4]
+            if name.startswith("page_") and name.endswith(".jpg") and number.isdigit() and int(number) > count:
+                os.remove(os.path.join(sheets_dir, name))
+
+    def _write_summary(self, entries, per_sheet: int):
+        """Résumé par image : comptes par classe et page de la planche contact."""
+        with open(os.path.join(self.output_dir, "summary.csv"), 'w', newline='') as f:
+            writer = csv.writer(f)
+            writer.writerow(["image", *CLASS_NAMES, "page"])
+            for index, (stem, _, counts) in enumerate(entries):
+                writer.writerow([stem, *(counts[name] for name in CLASS_NAMES), index // per_sheet + 1])
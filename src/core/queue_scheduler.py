@@ -0,0 +1,141 @@
+import heapq
+import json
+import logging
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Iterable, List, Optional
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SCORES_PATH = "data/queue_scores.jsonl"
+
+
+def _pairwise_iou(boxes: np.ndarray) -> np.ndarray:
+    """IoU de toutes les paires de boîtes (x1, y1, x2, y2)."""
+    x1 = np.maximum(boxes[:, None, 0], boxes[None, :, 0])
+    y1 = np.maximum(boxes[:, None, 1], boxes[None, :, 1])
+    x2 = np.minimum(boxes[:, None, 2], boxes[None, :, 2])
+    y2 = np.minimum(boxes[:, None, 3], boxes[None, :, 3])
+    intersection = np.clip(x2 - x1, 0, None) * np.clip(y2 - y1, 0, None)
+    areas = (boxes[:, 2] - boxes[:, 0]) * (boxes[:, 3] - boxes[:, 1])
+    union = areas[:, None] + areas[None, :] - intersection
+    return np.divide(intersection, union, out=np.zeros_like(intersection), where=union > 0)
+
+
+def score_predictions(predictions: List[dict], count_weight: float = 0.5,
+                      disagreement_weight: float = 2.0, overlap_iou: float = 0.3) -> float:
+    """Estime le besoin de relecture humaine d'une image à partir des prédictions brutes.
+
+    Le score additionne la masse d'incertitude (maximale pour une confiance de 50 %),
+    le nombre de boîtes (en log) et le désaccord entre boîtes qui se chevauchent.
+    """
+    if not predictions:
+        return 0.0
+    confidences = np.array([float(p['confidence']) for p in predictions])
+    centers = np.array([[float(p['x']), float(p['y']), float(p['width']), float(p['height'])]
+                        for p in predictions])
+    boxes = np.column_stack([
+        centers[:, 0] - centers[:, 2] / 2, centers[:, 1] - centers[:, 3] / 2,
+        centers[:, 0] + centers[:, 2] / 2, centers[:, 1] + centers[:, 3] / 2,
+    ])
+
+    uncertainty_mass = float(np.sum(1.0 - np.abs(2.0 * confidences - 1.0)))
+
+    disagreement = 0.0
+    if len(boxes) > 1:
+        iou = np.triu(_pairwise_iou(boxes), k=1)
+        rows, cols = np.nonzero(iou > overlap_iou)
+        # Deux boîtes qui se recouvrent : le modèle hésite sur la même prise
+        disagreement = float(np.sum(np.minimum(confidences[rows], confidences[cols])))
+
+    return uncertainty_mass + count_weight * float(np.log1p(len(boxes))) + disagreement_weight * disagreement
+
+
+class UncertaintyScheduler:
+    """File d'images ordonnée par score d'incertitude, mise à jour au fil des prédictions.
+
+    Les scores sont conservés dans un fichier JSONL en ajout seul, écrit par un thread dédié
+    (jamais par l'appelant, souvent le thread de l'interface) ; un tas permet d'obtenir l'image
+    la plus incertaine sans retrier la file à chaque prédiction.
+    """
+
+    def __init__(self, scores_path: str = DEFAULT_SCORES_PATH):
+        self.scores_path = scores_path
+        self.scores: Dict[str, float] = {}
+        self._queue = set()
+        self._heap = []
+        # Un seul thread d'écriture : les lignes restent dans l'ordre des mises à jour
+        self._writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="scores")
+        self._load()
+
+    def _load(self):
+        """Relit les scores enregistrés (la dernière ligne pour une image l'emporte)."""
+        lines = 0
+        try:
+            with open(self.scores_path, 'r') as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                    except ValueError:
+                        continue
+                    self.scores[entry["image"]] = float(entry["score"])
+                    lines += 1
+        except OSError:
+            return
+        if lines > 2 * len(self.scores) + 100:
+            self._compact()
+
+    def _compact(self):
+        """Réécrit le fichier avec un seul score par image."""
+        tmp_path = self.scores_path + ".tmp"
+        with open(tmp_path, 'w') as f:
+            for image_path, score in self.scores.items():
+                f.write(json.dumps({"image": image_path, "score": score}) + "\n")
+        os.replace(tmp_path, self.scores_path)
+
+    def set_queue(self, image_paths: Iterable[str]):
+        """Définit les images en attente et construit le tas à partir des scores connus."""
+        self._queue = set(image_paths)
+        self._heap = [(-score, path) for path, score in self.scores.items() if path in self._queue]
+        heapq.heapify(self._heap)
+
+    def discard(self, image_path: str):
+        """Retire une image de la file (image terminée ou déplacée)."""
+        self._queue.discard(image_path)
+
+    def update(self, image_path: str, predictions: List[dict]) -> float:
+        """Met à jour le score d'une image à partir de nouvelles prédictions brutes."""
+        score = score_predictions(predictions)
+        self.scores[image_path] = score
+        self._writer.submit(self._append, image_path, score).add_done_callback(self._report)
+        if image_path in self._queue:
+            heapq.heappush(self._heap, (-score, image_path))
+        return score
+
+    def _append(self, image_path: str, score: float):
+        directory = os.path.dirname(self.scores_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(self.scores_path, 'a') as f:
+            f.write(json.dumps({"image": image_path, "score": score}) + "\n")
+
+    @staticmethod
+    def _report(future):
+        if future.exception() is not None:
+            logger.error("Enregistrement du score impossible : %s", future.exception())
+
+    def close(self):
+        """Attend l'écriture des scores en attente."""
+        self._writer.shutdown(wait=True)
+
+    def next_image(self, accept: Callable[[str], bool]) -> Optional[str]:
+        """Retourne l'image acceptée la plus incertaine, ou None si aucune n'a de score."""
+        while self._heap:
+            neg_score, image_path = heapq.heappop(self._heap)
+            if image_path not in self._queue or self.scores.get(image_path) != -neg_score:
+                continue  # Entrée périmée : image retirée ou score mis à jour depuis
+            if accept(image_path):
+                return image_path
+        return None
@@ -0,0 +1,74 @@
+import json
+import logging
+import os
+import time
+from typing import Callable, Dict, Iterable, Optional, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+REVIEW_ACCEPTED = "accepted"
+REVIEW_REJECTED = "rejected"
+
+DEFAULT_REVIEW_DIR = "data/annotations/review"
+
+
+def proposal_key(box: Sequence[float]) -> Tuple[int, ...]:
+    """Identifiant d'une proposition : sa boîte de détection arrondie au pixel."""
+    return tuple(int(round(float(v))) for v in box)
+
+
+class ReviewStore:
+    """Décisions de relecture des propositions IA, dans un fichier JSON par image.
+
+    Chaque proposition acceptée ou rejetée est enregistrée avec sa boîte et sa confiance :
+    une détection déjà tranchée n'est plus proposée, et une image dont toutes les
+    propositions ont été tranchées est marquée relue.
+    """
+
+    def __init__(self, review_dir: str = DEFAULT_REVIEW_DIR,
+                 name_fn: Optional[Callable[[str], str]] = None):
+        self.review_dir = review_dir
+        # Même nom que le fichier d'annotations (voir AnnotationManager.get_sample_name)
+        self.name_fn = name_fn or (lambda image_path: os.path.splitext(os.path.basename(image_path))[0])
+        self._records: Dict[str, dict] = {}
+
+    def _path(self, image_path: str) -> str:
+        return os.path.join(self.review_dir, f"{self.name_fn(image_path)}.json")
+
+    def load(self, image_path: str) -> dict:
+        """Relecture enregistrée pour l'image (vide si aucune)."""
+        path = self._path(image_path)
+        record = self._records.get(path)
+        if record is None:
+            try:
+                with open(path, 'r') as f:
+                    record = json.load(f)
+            except (OSError, ValueError):
+                record = {"image": self.name_fn(image_path), "complete": False, "decisions": []}
+            self._records[path] = record
+        return record
+
+    def decisions(self, image_path: str) -> Dict[Tuple[int, ...], str]:
+        """Décision (acceptée ou rejetée) par proposition déjà tranchée."""
+        return {tuple(entry["box"]): entry["state"] for entry in self.load(image_path)["decisions"]}
+
+    def is_reviewed(self, image_path: str) -> bool:
+        return self.load(image_path)["complete"]
+
+    def record(self, image_path: str, entries: Iterable[Tuple[Sequence[float], Optional[float], str]],
+               complete: bool):
+        """Ajoute des décisions (boîte, confiance, état) et écrit le fichier de manière atomique."""
+        record = self.load(image_path)
+        by_key = {tuple(entry["box"]): entry for entry in record["decisions"]}
+        for box, confidence, state in entries:
+            key = proposal_key(box)
+            by_key[key] = {"box": list(key), "confidence": confidence, "state": state}
+        record["decisions"] = list(by_key.values())
+        record["complete"] = complete
+        record["updated"] = time.strftime("%Y-%m-%dT%H:%M:%S")
+
+        path = self._path(image_path)
+        os.makedirs(self.review_dir, exist_ok=True)
+        with open(path + ".tmp", 'w') as f:
+            json.dump(record, f)
+        os.replace(path + ".tmp", path)
@@ -0,0 +1,174 @@
+import logging
+import threading
+from collections import OrderedDict
+from typing import Iterable, List, Optional, Set, Tuple
+
+import cv2
+import numpy as np
+
+from .image_header import read_image_size
+
+logger = logging.getLogger(__name__)
+
+
+def _read_reduced_color(image_path: str, max_side: int) -> Tuple[Optional[np.ndarray], float]:
+    """Décode l'image en couleur à résolution réduite ; retourne (image, échelle réduite/pleine)."""
+    size = read_image_size(image_path)
+    if size is None:
+        return None, 1.0
+    flags = cv2.IMREAD_COLOR
+    for factor, reduced in ((8, cv2.IMREAD_REDUCED_COLOR_8), (4, cv2.IMREAD_REDUCED_COLOR_4),
+                            (2, cv2.IMREAD_REDUCED_COLOR_2)):
+        if max(size) / factor >= max_side:
+            flags = reduced
+            break
+    image = cv2.imread(image_path, flags)
+    if image is None:
+        return None, 1.0
+    if max(image.shape[:2]) > max_side:
+        resize = max_side / max(image.shape[:2])
+        image = cv2.resize(image, None, fx=resize, fy=resize, interpolation=cv2.INTER_AREA)
+    return image, image.shape[1] / size[0]
+
+
+def _slic_labels(image: np.ndarray, region_size: int) -> np.ndarray:
+    """Superpixels SLIC (module opencv-contrib)."""
+    lab = cv2.cvtColor(cv2.GaussianBlur(image, (3, 3), 0), cv2.COLOR_BGR2LAB)
+    slic = cv2.ximgproc.createSuperpixelSLIC(lab, algorithm=cv2.ximgproc.SLICO, region_size=region_size)
+    slic.iterate(10)
+    slic.enforceLabelConnectivity(max(1, region_size // 2))
+    return slic.getLabels().astype(np.int32)
+
+
+def _watershed_labels(image: np.ndarray, region_size: int) -> np.ndarray:
+    """Régions par ligne de partage des eaux, germes placés au minimum du gradient de chaque case d'une grille."""
+    gray = cv2.GaussianBlur(cv2.cvtColor(image, cv2.COLOR_BGR2GRAY), (5, 5), 0)
+    gradient = cv2.magnitude(cv2.Sobel(gray, cv2.CV_32F, 1, 0), cv2.Sobel(gray, cv2.CV_32F, 0, 1))
+    height, width = gray.shape
+    rows, columns = max(1, height // region_size), max(1, width // region_size)
+    cells = gradient[:rows * region_size, :columns * region_size]
+    cells = cells.reshape(rows, region_size, columns, region_size).transpose(0, 2, 1, 3)
+    flat_index = cells.reshape(rows, columns, -1).argmin(axis=2)
+    ys = np.arange(rows)[:, None] * region_size + flat_index // region_size
+    xs = np.arange(columns)[None, :] * region_size + flat_index % region_size
+
+    markers = np.zeros((height, width), dtype=np.int32)
+    markers[ys.ravel(), xs.ravel()] = np.arange(1, rows * columns + 1)
+    cv2.watershed(image, markers)
+    # Les frontières (-1) rejoignent une région voisine
+    while True:
+        boundary = markers <= 0
+        if not boundary.any():
+            break
+        grown = cv2.dilate(np.where(boundary, 0, markers).astype(np.float32), np.ones((3, 3), np.uint8))
+        markers[boundary] = grown[boundary].astype(np.int32)
+    return markers - 1
+
+
+class SuperpixelMap:
+    """Découpage de l'image en régions : carte d'étiquettes, pixels et voisines de chaque région.
+
+    Les pixels de chaque région sont regroupés une fois pour toutes (tri des étiquettes) :
+    construire le polygone d'un ensemble de régions ne parcourt que leurs pixels.
+    """
+
+    def __init__(self, labels: np.ndarray, scale: float):
+        self.labels = labels
+        self.scale = scale
+        self.count = int(labels.max()) + 1
+        flat = labels.ravel()
+        self.order = np.argsort(flat, kind='stable').astype(np.int32)
+        self.starts = np.searchsorted(flat[self.order], np.arange(self.count + 1)).astype(np.int32)
+
+        # Voisinage : paires d'étiquettes différentes entre pixels adjacents
+        pairs = [np.stack([labels[:, :-1].ravel(), labels[:, 1:].ravel()], axis=1),
+                 np.stack([labels[:-1, :].ravel(), labels[1:, :].ravel()], axis=1)]
+        pairs = np.concatenate(pairs).astype(np.int64)
+        pairs = np.sort(pairs[pairs[:, 0] != pairs[:, 1]], axis=1)
+        keys = np.unique(pairs[:, 0] * self.count + pairs[:, 1])
+        self.adjacency: List[Set[int]] = [set() for _ in range(self.count)]
+        for a, b in zip((keys // self.count).tolist(), (keys % self.count).tolist()):
+            self.adjacency[a].add(b)
+            self.adjacency[b].add(a)
+
+    @classmethod
+    def compute(cls, image_path: str, max_side: int = 1024, region_size: int = 16) -> Optional["SuperpixelMap"]:
+        image, scale = _read_reduced_color(image_path, max_side)
+        if image is None:
+            return None
+        if hasattr(cv2, 'ximgproc'):
+            labels = _slic_labels(image, region_size)
+        else:
+            labels = _watershed_labels(image, region_size)
+        return cls(labels, scale)
+
+    def region_at(self, x: float, y: float) -> Optional[int]:
+        """Région contenant le point (x, y) en pleine résolution."""
+        height, width = self.labels.shape
+        column, row = int(x * self.scale), int(y * self.scale)
+        if not (0 <= column < width and 0 <= row < height):
+            return None
+        return int(self.labels[row, column])
+
+    def is_adjacent(self, region: int, regions: Iterable[int]) -> bool:
+        return not self.adjacency[region].isdisjoint(regions)
+
+    def is_connected(self, regions: Set[int]) -> bool:
+        """Vrai si l'union des régions est d'un seul tenant (parcours du graphe de voisinage)."""
+        if not regions:
+            return True
+        start = next(iter(regions))
+        seen, stack = {start}, [start]
+        while stack:
+            for neighbour in self.adjacency[stack.pop()] & regions:
+                if neighbour not in seen:
+                    seen.add(neighbour)
+                    stack.append(neighbour)
+        return len(seen) == len(regions)
+
+    def polygon(self, regions: Iterable[int], epsilon: float = 1.0) -> List[Tuple[float, float]]:
+        """Contour extérieur (simplifié) de l'union des régions, en coordonnées pleine résolution."""
+        pixels = np.concatenate([self.order[self.starts[r]:self.starts[r + 1]] for r in regions])
+        if pixels.size == 0:
+            return []
+        width = self.labels.shape[1]
+        ys, xs = pixels // width, pixels % width
+        x0, y0 = xs.min(), ys.min()
+        # Marge d'un pixel pour que le contour ne touche pas le bord du masque
+        mask = np.zeros((ys.max() - y0 + 3, xs.max() - x0 + 3), dtype=np.uint8)
+        mask[ys - y0 + 1, xs - x0 + 1] = 255
+        contours, _ = cv2.findContours(mask, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+        contour = cv2.approxPolyDP(max(contours, key=cv2.contourArea), epsilon, True).reshape(-1, 2)
+        if len(contour) < 3:
+            return []
+        return [((float(cx + x0) - 0.5) / self.scale, (float(cy + y0) - 0.5) / self.scale) for cx, cy in contour]
+
+
+class SuperpixelCache:
+    """Découpages des dernières images ouvertes (LRU en mémoire)."""
+
+    def __init__(self, capacity: int = 4):
+        self.capacity = capacity
+        self._maps: "OrderedDict[str, SuperpixelMap]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, image_path: str) -> Optional[SuperpixelMap]:
+        """Découpage déjà calculé pour cette image, sans calcul."""
+        with self._lock:
+            return self._maps.get(image_path)
+
+    def get_or_compute(self, image_path: str) -> Optional[SuperpixelMap]:
+        """Retourne le découpage de l'image, calculé si besoin (à appeler hors du thread de l'interface)."""
+        superpixels = self.get(image_path)
+        if superpixels is not None:
+            return superpixels
+        superpixels = SuperpixelMap.compute(image_path)
+        if superpixels is None:
+            logger.warning("Impossible de découper l'image %s en régions", image_path)
+            return None
+        with self._lock:
+            self._maps[image_path] = superpixels
+            self._maps.move_to_end(image_path)
+            if len(self._maps) > self.capacity:
+                self._maps.popitem(last=False)
+        return superpixels
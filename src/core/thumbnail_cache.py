@@ -0,0 +1,177 @@
+import json
+import logging
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Iterable, Optional, Tuple
+
+import cv2
+import numpy as np
+
+from .image_header import read_image_size
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CACHE_PATH = "data/thumbnails.bin"
+THUMBNAIL_SIZE = (96, 72)
+BACKGROUND = 40
+
+
+def make_thumbnail(image_path: str, size: Tuple[int, int] = THUMBNAIL_SIZE) -> Optional[np.ndarray]:
+    """Vignette BGR de taille fixe (image centrée, bandes grises), décodée à résolution réduite."""
+    width, height = size
+    flags = cv2.IMREAD_COLOR
+    if image_path.lower().endswith(('.jpg', '.jpeg')):
+        full_size = read_image_size(image_path)
+        if full_size is not None:
+            # Le plus fort décodage réduit qui garde deux fois la taille de la vignette
+            for factor, reduced in ((8, cv2.IMREAD_REDUCED_COLOR_8), (4, cv2.IMREAD_REDUCED_COLOR_4),
+                                    (2, cv2.IMREAD_REDUCED_COLOR_2)):
+                if full_size[0] / factor >= 2 * width and full_size[1] / factor >= 2 * height:
+                    flags = reduced
+                    break
+    image = cv2.imread(image_path, flags)
+    if image is None:
+        return None
+    scale = min(width / image.shape[1], height / image.shape[0])
+    new_width = max(1, round(image.shape[1] * scale))
+    new_height = max(1, round(image.shape[0] * scale))
+    resized = cv2.resize(image, (new_width, new_height), interpolation=cv2.INTER_AREA)
+    thumbnail = np.full((height, width, 3), BACKGROUND, dtype=np.uint8)
+    x, y = (width - new_width) // 2, (height - new_height) // 2
+    thumbnail[y:y + new_height, x:x + new_width] = resized
+    return thumbnail
+
+
+def _render_into_slot(task) -> Tuple[str, int, bool]:
+    """Calcule une vignette et l'écrit directement dans son emplacement du fichier (processus du pool)."""
+    image_path, mtime_ns, cache_path, slot, capacity, size = task
+    cv2.setNumThreads(1)
+    thumbnail = make_thumbnail(image_path, size)
+    if thumbnail is None:
+        return image_path, mtime_ns, False
+    array = np.memmap(cache_path, dtype=np.uint8, mode='r+', shape=(capacity, size[1], size[0], 3))
+    array[slot] = thumbnail
+    array.flush()
+    del array
+    return image_path, mtime_ns, True
+
+
+class ThumbnailCache:
+    """Cache persistant de vignettes dans un seul fichier projeté en mémoire.
+
+    Chaque vignette occupe un emplacement de taille fixe du fichier binaire ; un index JSON
+    associe chaque chemin à son emplacement et au mtime de l'image source. Une vignette est
+    recalculée seulement si l'image a changé.
+    """
+
+    def __init__(self, cache_path: str = DEFAULT_CACHE_PATH, size: Tuple[int, int] = THUMBNAIL_SIZE):
+        self.cache_path = cache_path
+        self.index_path = os.path.splitext(cache_path)[0] + ".index.json"
+        self.size = tuple(size)
+        self.entries: Dict[str, dict] = {}
+        self.capacity = 0
+        self._array = None
+        self._lock = threading.Lock()
+        self._build_lock = threading.Lock()
+        self._load()
+
+    @property
+    def slot_bytes(self) -> int:
+        return self.size[0] * self.size[1] * 3
+
+    def _load(self):
+        try:
+            with open(self.index_path, 'r') as f:
+                index = json.load(f)
+            file_size = os.path.getsize(self.cache_path)
+        except (OSError, ValueError):
+            return
+        # Un changement de taille de vignette ou un fichier tronqué invalide le cache
+        if tuple(index.get("size", ())) != self.size or file_size < index["capacity"] * self.slot_bytes:
+            logger.info("Cache de vignettes invalide, il sera reconstruit")
+            return
+        self.entries = index["entries"]
+        self._open(index["capacity"])
+
+    def _open(self, capacity: int):
+        """Agrandit si besoin le fichier puis le projette en mémoire."""
+        directory = os.path.dirname(self.cache_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(self.cache_path, 'ab') as f:
+            if f.tell() < capacity * self.slot_bytes:
+                f.truncate(capacity * self.slot_bytes)
+        array = None
+        if capacity:
+            array = np.memmap(self.cache_path, dtype=np.uint8, mode='r+',
+                              shape=(capacity, self.size[1], self.size[0], 3))
+        # L'ancienne projection reste valide pour les lecteurs qui la détiennent encore
+        with self._lock:
+            self._array = array
+            self.capacity = capacity
+
+    def save(self):
+        """Écrit l'index de manière atomique."""
+        with self._lock:
+            payload = json.dumps({"size": list(self.size), "capacity": self.capacity,
+                                  "entries": self.entries}, separators=(',', ':'))
+        tmp_path = self.index_path + ".tmp"
+        with open(tmp_path, 'w') as f:
+            f.write(payload)
+        os.replace(tmp_path, self.index_path)
+
+    def get(self, image_path: str) -> Optional[np.ndarray]:
+        """Vignette en cache (vue sur le fichier projeté, sans copie), ou None."""
+        with self._lock:
+            entry = self.entries.get(image_path)
+            if entry is None or not entry.get("ready") or self._array is None:
+                return None
+            return self._array[entry["slot"]]
+
+    def build(self, image_paths: Iterable[str], workers: Optional[int] = None) -> int:
+        """Calcule en parallèle les vignettes manquantes ou périmées, dans l'ordre donné."""
+        with self._build_lock:
+            return self._build(image_paths, workers)
+
+    def _build(self, image_paths: Iterable[str], workers: Optional[int]) -> int:
+        todo = []
+        next_slot = max((entry["slot"] for entry in self.entries.values()), default=-1) + 1
+        for path in image_paths:
+            try:
+                mtime_ns = os.stat(path).st_mtime_ns
+            except OSError:
+                continue
+            entry = self.entries.get(path)
+            if entry is not None and entry["mtime_ns"] == mtime_ns:
+                continue
+            if entry is None:
+                slot, next_slot = next_slot, next_slot + 1
+            else:
+                slot = entry["slot"]
+            todo.append((path, mtime_ns, slot))
+        if not todo:
+            return 0
+
+        if next_slot > self.capacity:
+            # Croissance géométrique : peu de réagrandissements du fichier
+            self._open(max(next_slot, 2 * self.capacity, 1024))
+        with self._lock:
+            for path, mtime_ns, slot in todo:
+                self.entries[path] = {"slot": slot, "mtime_ns": mtime_ns, "ready": False}
+
+        logger.info("Calcul de %d vignettes...", len(todo))
+        tasks = [(path, mtime_ns, self.cache_path, slot, self.capacity, self.size)
+                 for path, mtime_ns, slot in todo]
+        # spawn : ne pas dupliquer par fork un processus qui a déjà des threads (Qt)
+        context = multiprocessing.get_context("spawn")
+        try:
+            with ProcessPoolExecutor(max_workers=workers, mp_context=context) as pool:
+                for path, mtime_ns, ok in pool.map(_render_into_slot, tasks, chunksize=16):
+                    with self._lock:
+                        # Les vignettes apparaissent au fil du calcul
+                        self.entries[path]["ready"] = ok
+        finally:
+            self.save()
+        return len(todo)
@@ -0,0 +1,112 @@
+import hashlib
+import logging
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Iterable, List
+
+import cv2
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+VIDEO_EXTENSIONS = ('.mp4', '.mov', '.avi', '.mkv', '.m4v')
+SIGNATURE_SIZE = (64, 36)
+
+
+def frame_signature(frame: np.ndarray) -> np.ndarray:
+    """Réduit une trame à une petite vignette en niveaux de gris, base du score de mouvement."""
+    gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+    small = cv2.resize(gray, SIGNATURE_SIZE, interpolation=cv2.INTER_AREA)
+    return cv2.GaussianBlur(small, (3, 3), 0).astype(np.float32)
+
+
+def motion_score(signature: np.ndarray, reference: np.ndarray) -> float:
+    """Différence absolue moyenne (entre 0 et 1) entre deux vignettes."""
+    return float(cv2.absdiff(signature, reference).mean()) / 255.0
+
+
+def source_id(video_path: str) -> str:
+    """Identifiant court du chemin absolu de la vidéo : deux IMG_1234.MOV de dossiers différents n'écrivent pas les mêmes trames."""
+    return hashlib.sha1(os.path.abspath(video_path).encode('utf-8')).hexdigest()[:8]
+
+
+def find_videos(inputs: Iterable[str]) -> List[str]:
+    """Développe une liste de fichiers et de dossiers en chemins de vidéos."""
+    videos = []
+    for path in inputs:
+        if os.path.isdir(path):
+            for root, _, files in os.walk(path):
+                videos.extend(
+                    os.path.join(root, name) for name in sorted(files)
+                    if name.lower().endswith(VIDEO_EXTENSIONS)
+                )
+        elif path.lower().endswith(VIDEO_EXTENSIONS):
+            videos.append(path)
+    return videos
+
+
+def ingest_video(video_path: str, output_dir: str, threshold: float = 0.06,
+                 sample_fps: float = 5.0, jpeg_quality: int = 95) -> dict:
+    """Extrait d'une vidéo les trames suffisamment différentes de la dernière trame conservée.
+
+    Les trames sont lues en flux : seule la vignette de la dernière trame conservée est
+    gardée en mémoire, quelle que soit la durée de la vidéo. Les trames hors échantillonnage
+    sont sautées avec grab(), sans conversion de couleurs.
+    """
+    # Un processus par vidéo : éviter qu'OpenCV multiplie les threads dans chacun
+    cv2.setNumThreads(1)
+    os.makedirs(output_dir, exist_ok=True)
+    capture = cv2.VideoCapture(video_path)
+    if not capture.isOpened():
+        logger.error("Impossible d'ouvrir la vidéo %s", video_path)
+        return {"video": video_path, "frames_read": 0, "frames_kept": 0}
+
+    fps = capture.get(cv2.CAP_PROP_FPS) or 30.0
+    step = max(1, int(round(fps / sample_fps))) if sample_fps > 0 else 1
+    stem = f"{os.path.splitext(os.path.basename(video_path))[0]}_{source_id(video_path)}"
+    params = [cv2.IMWRITE_JPEG_QUALITY, jpeg_quality]
+
+    reference = None
+    frame_index = -1
+    frames_read = frames_kept = 0
+    try:
+        while True:
+            frame_index += 1
+            if frame_index % step:
+                if not capture.grab():
+                    break
+                continue
+            ok, frame = capture.read()
+            if not ok:
+                break
+            frames_read += 1
+            signature = frame_signature(frame)
+            if reference is not None and motion_score(signature, reference) < threshold:
+                continue
+            output_path = os.path.join(output_dir, f"{stem}_f{frame_index:06d}.jpg")
+            cv2.imwrite(output_path, frame, params)
+            reference = signature
+            frames_kept += 1
+    finally:
+        capture.release()
+
+    logger.info("%s : %d trames conservées sur %d analysées", video_path, frames_kept, frames_read)
+    return {"video": video_path, "frames_read": frames_read, "frames_kept": frames_kept}
+
+
+def ingest_videos(video_paths: List[str], output_dir: str, workers: int = None, **kwargs) -> List[dict]:
+    """Traite plusieurs vidéos en parallèle, une par processus."""
+    if not video_paths:
+        return []
+    workers = min(workers or os.cpu_count() or 1, len(video_paths))
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(ingest_video, path, output_dir, **kwargs) for path in video_paths]
+        results = []
+        for path, future in zip(video_paths, futures):
+            try:
+                results.append(future.result())
+            except Exception as e:
+                # Une vidéo illisible n'interrompt pas les autres
+                logger.error("Vidéo ignorée %s : %s", path, e)
+                results.append({"video": path, "frames_read": 0, "frames_kept": 0, "error": str(e)})
+        return results
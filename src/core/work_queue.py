@@ -0,0 +1,197 @@
+import errno
+import logging
+import os
+import shutil
+import socket
+import sqlite3
+import time
+import uuid
+from contextlib import contextmanager
+from typing import Iterable, Optional
+
+logger = logging.getLogger(__name__)
+
+STATE_PENDING = "pending"
+STATE_DONE = "done"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS images (
+    path TEXT PRIMARY KEY,
+    state TEXT NOT NULL DEFAULT 'pending',
+    owner TEXT,
+    lease_expires REAL,
+    finished_by TEXT,
+    finished_at REAL
+)
+"""
+
+
+def default_owner() -> str:
+    """Identifiant de l'annotateur : machine, processus et suffixe aléatoire."""
+    return f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:6]}"
+
+
+def move_file(source: str, destination: str):
+    """Déplace un fichier, y compris entre deux systèmes de fichiers.
+
+    Sur un même système de fichiers, le renommage est atomique. Sinon le fichier est copié
+    sous un nom temporaire à côté de la destination, renommé, puis la source est supprimée :
+    la destination n'est jamais visible à moitié écrite.
+    """
+    try:
+        os.replace(source, destination)
+        return
+    except OSError as e:
+        if e.errno != errno.EXDEV:
+            raise
+    tmp_path = copy_beside(source, destination)
+    try:
+        os.replace(tmp_path, destination)
+    except BaseException:
+        os.remove(tmp_path)
+        raise
+    os.remove(source)
+
+
+def same_filesystem(source: str, destination: str) -> bool:
+    """Vrai si un renommage suffit pour déplacer source vers destination."""
+    return os.stat(source).st_dev == os.stat(os.path.dirname(os.path.abspath(destination))).st_dev
+
+
+def copy_beside(source: str, destination: str) -> str:
+    """Copie source (synchronisée sur disque) sous un nom temporaire à côté de destination ; retourne ce nom."""
+    tmp_path = f"{destination}.{uuid.uuid4().hex[:8]}.tmp"
+    try:
+        with open(source, 'rb') as src, open(tmp_path, 'wb') as dst:
+            shutil.copyfileobj(src, dst, 1024 * 1024)
+            dst.flush()
+            os.fsync(dst.fileno())
+        shutil.copystat(source, tmp_path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    return tmp_path
+
+
+class WorkQueue:
+    """File de travail partagée entre annotateurs, dans une base SQLite posée sur le dossier commun.
+
+    Chaque image est prêtée (bail) à un seul annotateur pour une durée limitée, prolongée par
+    des battements réguliers ; un bail expiré (poste fermé brutalement) rend l'image disponible.
+    La validation d'une image est atomique : un seul annotateur peut la terminer. Les chemins
+    sont enregistrés relativement au dossier de la base, pour que chaque poste puisse monter
+    le partage à un endroit différent.
+    """
+
+    def __init__(self, db_path: str, owner: Optional[str] = None, lease_seconds: float = 300):
+        self.db_path = db_path
+        self.root = os.path.dirname(os.path.abspath(db_path))
+        self.owner = owner or default_owner()
+        self.lease_seconds = lease_seconds
+        with self._transaction() as db:
+            db.execute(SCHEMA)
+
+    @contextmanager
+    def _transaction(self):
+        """Transaction exclusive en écriture ; une connexion par appel (utilisable depuis tout thread)."""
+        # Journal classique (pas de WAL) : le WAL ne fonctionne pas sur un partage réseau
+        db = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+        try:
+            db.execute("BEGIN IMMEDIATE")
+            try:
+                yield db
+            except BaseException:
+                db.execute("ROLLBACK")
+                raise
+            db.execute("COMMIT")
+        finally:
+            db.close()
+
+    def _key(self, image_path: str) -> str:
+        return os.path.relpath(os.path.abspath(image_path), self.root).replace(os.sep, '/')
+
+    def sync(self, image_paths: Iterable[str]) -> int:
+        """Enregistre les images inconnues de la file ; retourne le nombre d'ajouts."""
+        with self._transaction() as db:
+            before = db.total_changes
+            db.executemany("INSERT OR IGNORE INTO images (path) VALUES (?)",
+                           ((self._key(path),) for path in image_paths))
+            return db.total_changes - before
+
+    def lease(self, image_path: str) -> bool:
+        """Prend (ou prolonge) le bail d'une image ; False si elle est terminée ou prêtée à un autre."""
+        now = time.time()
+        key = self._key(image_path)
+        with self._transaction() as db:
+            db.execute("INSERT OR IGNORE INTO images (path) VALUES (?)", (key,))
+            cursor = db.execute(
+                "UPDATE images SET owner = ?, lease_expires = ? WHERE path = ? AND state = ? "
+                "AND (owner IS NULL OR owner = ? OR lease_expires < ?)",
+                (self.owner, now + self.lease_seconds, key, STATE_PENDING, self.owner, now)
+            )
+            return cursor.rowcount == 1
+
+    def release(self, image_path: str):
+        """Rend une image non terminée à la file."""
+        with self._transaction() as db:
+            db.execute("UPDATE images SET owner = NULL, lease_expires = NULL "
+                       "WHERE path = ? AND owner = ? AND state = ?",
+                       (self._key(image_path), self.owner, STATE_PENDING))
+
+    def release_all(self):
+        """Rend toutes les images prêtées à cet annotateur (fermeture de l'application)."""
+        with self._transaction() as db:
+            db.execute("UPDATE images SET owner = NULL, lease_expires = NULL WHERE owner = ? AND state = ?",
+                       (self.owner, STATE_PENDING))
+
+    def heartbeat(self) -> int:
+        """Prolonge les baux de cet annotateur ; retourne le nombre de baux encore détenus."""
+        with self._transaction() as db:
+            cursor = db.execute("UPDATE images SET lease_expires = ? WHERE owner = ? AND state = ?",
+                                (time.time() + self.lease_seconds, self.owner, STATE_PENDING))
+            return cursor.rowcount
+
+    def complete(self, image_path: str, destination: Optional[str] = None) -> bool:
+        """Marque l'image terminée si cet annotateur en détient le bail, et la déplace vers destination.
+
+        Le renommage vers destination a lieu dans la transaction : s'il échoue, l'image reste
+        en attente ; si c'est la validation de la transaction qui échoue (verrou, partage
+        réseau), l'image est remise à sa place. Une copie d'un système de fichiers à l'autre est
+        faite avant la transaction, pour que le verrou de la base partagée ne soit tenu que le
+        temps du renommage.
+        """
+        staged = None
+        if destination is not None and not same_filesystem(image_path, destination):
+            staged = copy_beside(image_path, destination)
+        now = time.time()
+        completed = moved = False
+        try:
+            with self._transaction() as db:
+                cursor = db.execute(
+                    "UPDATE images SET state = ?, owner = NULL, lease_expires = NULL, finished_by = ?, "
+                    "finished_at = ? WHERE path = ? AND state = ? AND (owner = ? OR owner IS NULL "
+                    "OR lease_expires < ?)",
+                    (STATE_DONE, self.owner, now, self._key(image_path), STATE_PENDING, self.owner, now)
+                )
+                if cursor.rowcount == 1:
+                    if destination is not None:
+                        os.replace(staged or image_path, destination)
+                        moved = True
+                    completed = True
+        except BaseException:
+            if moved:
+                # La base n'a pas enregistré la validation : la destination ne doit pas rester
+                if staged is not None:
+                    os.remove(destination)
+                else:
+                    os.replace(destination, image_path)
+            completed = False
+            raise
+        finally:
+            if staged is not None and not completed and os.path.exists(staged):
+                os.remove(staged)
+        if completed and staged is not None:
+            os.remove(image_path)
+        return completed
+
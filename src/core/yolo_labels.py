@@ -0,0 +1,126 @@
+import logging
+from dataclasses import dataclass
+from itertools import chain
+from typing import Dict, Iterator, List, Sequence, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+CLASS_NAMES = ["hold", "volume"]
+
+
+@dataclass
+class PackedLabels:
+    """Polygones d'un fichier d'annotations rangés dans des tableaux contigus.
+
+    Les sommets de tous les polygones se suivent dans points (Nx2) ; ceux du polygone i
+    occupent les lignes offsets[i] à offsets[i + 1].
+    """
+    class_ids: np.ndarray
+    offsets: np.ndarray
+    points: np.ndarray
+
+    @classmethod
+    def empty(cls) -> "PackedLabels":
+        return cls(np.zeros(0, dtype=np.int64), np.zeros(1, dtype=np.int64), np.zeros((0, 2), dtype=np.float64))
+
+    @classmethod
+    def from_counts(cls, class_ids: Sequence[int], counts: Sequence[int], points: np.ndarray) -> "PackedLabels":
+        """Assemble les tableaux à partir du nombre de sommets de chaque polygone."""
+        offsets = np.zeros(len(counts) + 1, dtype=np.int64)
+        np.cumsum(counts, out=offsets[1:])
+        return cls(np.asarray(class_ids, dtype=np.int64), offsets, np.asarray(points, dtype=np.float64).reshape(-1, 2))
+
+    def __len__(self) -> int:
+        return len(self.class_ids)
+
+    def __iter__(self) -> Iterator[Tuple[int, np.ndarray]]:
+        for class_id, start, end in zip(self.class_ids.tolist(), self.offsets[:-1].tolist(), self.offsets[1:].tolist()):
+            yield class_id, self.points[start:end]
+
+
+def _parse_tokens(text: str) -> Tuple[np.ndarray, np.ndarray]:
+    """(valeurs, ligne de chaque valeur) : une seule conversion numérique pour tout le texte.
+
+    La ligne de chaque nombre se déduit des octets (débuts de mots, position des sauts de
+    ligne) plutôt que d'un découpage ligne par ligne ; les textes non ASCII sont découpés
+    ligne par ligne.
+    """
+    try:
+        data = np.frombuffer(text.encode('ascii'), dtype=np.uint8)
+    except UnicodeEncodeError:
+        rows = [line.split() for line in text.split('\n')]
+        counts = np.fromiter(map(len, rows), dtype=np.int64, count=len(rows))
+        values = np.array(list(chain.from_iterable(rows)), dtype=np.float64)
+        return values, np.repeat(np.arange(len(rows)), counts)
+    values = np.array(text.split(), dtype=np.float64)
+    # Une fois la conversion réussie, aucun nombre ne contient de caractère de contrôle :
+    # tout octet <= 32 est un séparateur, comme pour str.split()
+    space = data <= 32
+    is_start = ~space
+    is_start[1:] &= space[:-1]
+    token_line = np.searchsorted(np.flatnonzero(data == 10), np.flatnonzero(is_start))
+    return values, token_line
+
+
+def decode_labels(text: str, min_points: int = 3, source: str = "") -> PackedLabels:
+    """Analyse le contenu d'un fichier YOLO polygonal en tableaux, sans boucle par nombre.
+
+    Les lignes vides sont ignorées ; les lignes de moins de min_points sommets ou au nombre
+    de coordonnées impair sont signalées puis ignorées.
+    """
+    values, token_line = _parse_tokens(text)
+    counts = np.bincount(token_line, minlength=text.count('\n') + 1)
+    valid = (counts >= 1 + 2 * min_points) & (counts % 2 == 1)
+    for line_number in np.flatnonzero((counts > 0) & ~valid).tolist():
+        logger.warning("Ligne ignorée dans %s:%d (polygone invalide)", source, line_number + 1)
+    counts = counts[valid]
+    if counts.size == 0:
+        return PackedLabels.empty()
+
+    values = values[valid[token_line]]
+    # Premier nombre de chaque ligne : la classe ; le reste : les coordonnées
+    starts = np.zeros(counts.size, dtype=np.int64)
+    np.cumsum(counts[:-1], out=starts[1:])
+    is_coordinate = np.ones(values.size, dtype=bool)
+    is_coordinate[starts] = False
+    offsets = np.zeros(counts.size + 1, dtype=np.int64)
+    np.cumsum((counts - 1) // 2, out=offsets[1:])
+    return PackedLabels(values[starts].astype(np.int64), offsets, values[is_coordinate].reshape(-1, 2))
+
+
+_LINE_FORMATS: Dict[int, str] = {}
+
+
+def _line_format(point_count: int) -> str:
+    line_format = _LINE_FORMATS.get(point_count)
+    if line_format is None:
+        line_format = _LINE_FORMATS[point_count] = "%d" + " %.6f %.6f" * point_count + "\n"
+    return line_format
+
+
+def encode_labels(labels: PackedLabels) -> str:
+    """Texte YOLO polygonal (6 décimales), formaté en un seul passage pour tout le fichier."""
+    if len(labels) == 0:
+        return ""
+    template = "".join(map(_line_format, np.diff(labels.offsets).tolist()))
+    # Classe insérée devant les coordonnées de chaque polygone, dans l'ordre du gabarit
+    values = np.insert(labels.points.ravel(), labels.offsets[:-1] * 2, labels.class_ids)
+    return template % tuple(values.tolist())
+
+
+def read_labels(label_path: str, min_points: int = 3) -> PackedLabels:
+    with open(label_path, 'r') as f:
+        return decode_labels(f.read(), min_points, label_path)
+
+
+def write_labels(label_path: str, labels: PackedLabels):
+    with open(label_path, 'w') as f:
+        f.write(encode_labels(labels))
+
+
+def read_label_file(label_path: str) -> List[Tuple[int, np.ndarray]]:
+    """Lit un fichier YOLO polygonal et retourne (classe, points normalisés Nx2) par ligne."""
+    return list(read_labels(label_path))
+
@@ -0,0 +1,49 @@
+import logging
+from concurrent.futures import Future, ThreadPoolExecutor
+
+from PyQt6.QtCore import QObject, pyqtSignal
+
+logger = logging.getLogger(__name__)
+
+
+class BackgroundTasks(QObject):
+    """Exécute des tâches hors du thread de l'interface et rappelle le résultat dans ce thread.
+
+    Le rappel passe par un signal Qt : émis depuis un thread de travail, il est mis en file
+    et exécuté par la boucle d'événements de la fenêtre.
+    """
+    _done = pyqtSignal(object, object, object)
+
+    def __init__(self, max_workers: int = 2, parent=None):
+        super().__init__(parent)
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="background")
+        self._done.connect(self._dispatch)
+
+    def submit(self, fn, *args, callback=None, error_callback=None, **kwargs) -> Future:
+        """Soumet fn(*args, **kwargs) ; callback(résultat) est appelé dans le thread de l'interface."""
+        future = self.executor.submit(fn, *args, **kwargs)
+        future.add_done_callback(lambda f: self._notify(f, callback, error_callback))
+        return future
+
+    def _notify(self, future: Future, callback, error_callback):
+        try:
+            self._done.emit(future, callback, error_callback)
+        except RuntimeError:
+            # Objet Qt déjà détruit (fenêtre fermée) : le résultat n'a plus de destinataire
+            logger.debug("Résultat d'une tâche ignoré après la fermeture de la fenêtre")
+
+    def _dispatch(self, future: Future, callback, error_callback):
+        if future.cancelled():
+            return
+        error = future.exception()
+        if error is not None:
+            if error_callback is not None:
+                error_callback(error)
+            else:
+                logger.error("Erreur dans une tâche en arrière-plan", exc_info=error)
+        elif callback is not None:
+            callback(future.result())
+
+    def shutdown(self):
+        """Arrête le pool sans attendre les tâches en cours."""
+        self.executor.shutdown(wait=False)
@@ -0,0 +1,116 @@
+from PyQt6.QtWidgets import QListView, QStyledItemDelegate, QStyle, QAbstractItemView
+from PyQt6.QtCore import Qt, QAbstractListModel, QModelIndex, QSize, QRect
+from PyQt6.QtGui import QImage, QColor, QPen
+import os
+import logging
+from ..core.dataset_scanner import STATUS_UNTOUCHED, STATUS_IN_PROGRESS, STATUS_DONE
+
+logger = logging.getLogger(__name__)
+
+STATUS_COLORS = {
+    STATUS_UNTOUCHED: QColor(150, 150, 150),
+    STATUS_IN_PROGRESS: QColor(255, 165, 0),
+    STATUS_DONE: QColor(0, 200, 0),
+}
+
+
+class FilmstripModel(QAbstractListModel):
+    """Liste des images de la file ; les vignettes sont lues dans le cache à l'affichage."""
+
+    def __init__(self, thumbnail_cache, status_fn, parent=None):
+        super().__init__(parent)
+        self.thumbnail_cache = thumbnail_cache
+        self.status_fn = status_fn
+        self.images = []
+
+    def set_images(self, images):
+        """Remplace la liste affichée si elle a changé."""
+        if images == self.images:
+            return
+        self.beginResetModel()
+        self.images = list(images)
+        self.endResetModel()
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.images)
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid():
+            return None
+        path = self.images[index.row()]
+        if role == Qt.ItemDataRole.DisplayRole:
+            return str(index.row() + 1)
+        if role == Qt.ItemDataRole.ToolTipRole:
+            return os.path.basename(path)
+        if role == Qt.ItemDataRole.UserRole:
+            return path
+        return None
+
+
+class FilmstripDelegate(QStyledItemDelegate):
+    """Dessine la vignette, le numéro de l'image et une pastille de statut."""
+
+    def __init__(self, model: FilmstripModel, parent=None):
+        super().__init__(parent)
+        self.model = model
+        width, height = model.thumbnail_cache.size
+        self.thumbnail_size = QSize(width, height)
+
+    def sizeHint(self, option, index):
+        return self.thumbnail_size + QSize(8, 8)
+
+    def paint(self, painter, option, index):
+        rect = option.rect.adjusted(4, 4, -4, -4)
+        path = self.model.images[index.row()]
+        thumbnail = self.model.thumbnail_cache.get(path)
+        if thumbnail is not None:
+            # Vue sur le fichier projeté : le QImage ne vit que le temps du dessin
+            height, width = thumbnail.shape[:2]
+            image = QImage(thumbnail.data, width, height, thumbnail.strides[0], QImage.Format.Format_BGR888)
+            painter.drawImage(rect.topLeft(), image)
+        else:
+            painter.fillRect(rect, QColor(40, 40, 40))
+
+        if option.state & QStyle.StateFlag.State_Selected:
+            painter.setPen(QPen(QColor(0, 255, 255), 3))
+            painter.drawRect(rect)
+
+        painter.setPen(QColor(255, 255, 255))
+        painter.drawText(rect.adjusted(3, 0, 0, -2), Qt.AlignmentFlag.AlignLeft | Qt.AlignmentFlag.AlignBottom,
+                         index.data())
+
+        status = self.model.status_fn(path)
+        painter.setPen(Qt.PenStyle.NoPen)
+        painter.setBrush(STATUS_COLORS.get(status, STATUS_COLORS[STATUS_UNTOUCHED]))
+        painter.drawEllipse(QRect(rect.right() - 13, rect.top() + 3, 10, 10))
+
+
+class Filmstrip(QListView):
+    """Bandeau de vignettes pour naviguer directement vers n'importe quelle image."""
+
+    def __init__(self, thumbnail_cache, status_fn, parent=None):
+        super().__init__(parent)
+        self.filmstrip_model = FilmstripModel(thumbnail_cache, status_fn, self)
+        self.setModel(self.filmstrip_model)
+        self.setItemDelegate(FilmstripDelegate(self.filmstrip_model, self))
+
+        # Bandeau horizontal à taille d'éléments uniforme : la mise en page ne dépend
+        # pas du nombre d'images, et seuls les éléments visibles sont dessinés
+        self.setFlow(QListView.Flow.LeftToRight)
+        self.setWrapping(False)
+        self.setUniformItemSizes(True)
+        self.setLayoutMode(QListView.LayoutMode.Batched)
+        self.setBatchSize(1000)
+        self.setSelectionMode(QAbstractItemView.SelectionMode.SingleSelection)
+        self.setHorizontalScrollMode(QAbstractItemView.ScrollMode.ScrollPerPixel)
+        self.setVerticalScrollBarPolicy(Qt.ScrollBarPolicy.ScrollBarAlwaysOff)
+        self.setFixedHeight(thumbnail_cache.size[1] + 8 + self.horizontalScrollBar().sizeHint().height() + 4)
+        self.setFocusPolicy(Qt.FocusPolicy.NoFocus)
+
+    def show_images(self, images, current_index):
+        """Met à jour la liste et centre le bandeau sur l'image courante."""
+        self.filmstrip_model.set_images(images)
+        if 0 <= current_index < len(images):
+            index = self.filmstrip_model.index(current_index)
+            self.setCurrentIndex(index)
+            self.scrollTo(index, QAbstractItemView.ScrollHint.PositionAtCenter)
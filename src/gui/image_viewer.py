@@ -1,7 +1,48 @@
-from PyQt6.QtWidgets import QGraphicsView, QGraphicsScene
-from PyQt6.QtCore import Qt, QPointF
+from PyQt6.QtWidgets import QGraphicsView, QGraphicsScene, QGraphicsItem
+from PyQt6.QtCore import Qt, QPoint, QPointF, QRect, QRectF
 from PyQt6.QtGui import QImage, QPixmap, QPainter, QTransform, QWheelEvent
 import cv2
+import logging
+
+logger = logging.getLogger(__name__)
+
+class FrameItem(QGraphicsItem):
+    """Image de fond de la scène, gardée dans un QPixmap persistant.
+
+    Seules les zones modifiées du tampon de trame sont recopiées dans le pixmap, et seule la
+    partie exposée est peinte : le coût d'une trame suit la zone redessinée, pas la taille de
+    l'image.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.pixmap = QPixmap()
+        self.setFlag(QGraphicsItem.GraphicsItemFlag.ItemUsesExtendedStyleOption)
+
+    def boundingRect(self):
+        return QRectF(0, 0, self.pixmap.width(), self.pixmap.height())
+
+    def paint(self, painter, option, widget=None):
+        rect = option.exposedRect.toAlignedRect().intersected(self.pixmap.rect())
+        if not rect.isEmpty():
+            painter.drawPixmap(rect, self.pixmap, rect)
+
+    def set_image(self, image: QImage):
+        """Remplace tout le pixmap (nouvelle image ou nouvelle taille)."""
+        self.prepareGeometryChange()
+        self.pixmap = QPixmap.fromImage(image)
+        self.update()
+
+    def update_region(self, image: QImage, x0: int, y0: int, x1: int, y1: int):
+        """Recopie la zone (x0, y0, x1, y1) de l'image dans le pixmap, sans réallouer."""
+        if x1 <= x0 or y1 <= y0:
+            return
+        rect = QRect(x0, y0, x1 - x0, y1 - y0)
+        painter = QPainter(self.pixmap)
+        painter.drawImage(QPoint(x0, y0), image, rect)
+        painter.end()
+        self.update(QRectF(rect))
+
 
 class ImageViewer(QGraphicsView):
     def __init__(self, parent=None):
@@ -29,7 +70,6 @@ class ImageViewer(QGraphicsView):
         if image is None:
             return
             
-        print(f"[DEBUG] Configuration de l'image. Zoom actuel : {self.zoom_factor}")
         height, width = image.shape[:2]
         bytes_per_line = 3 * width
         q_image = QImage(image.data, width, height, bytes_per_line, QImage.Format.Format_RGB888)
@@ -37,14 +77,12 @@ class ImageViewer(QGraphicsView):
         
         # Sauvegarder le zoom actuel si ce n'est pas le premier chargement
         current_zoom = self.zoom_factor if not self.first_image_load else None
-        print(f"[DEBUG] Zoom sauvegardé : {current_zoom}")
         
         self._scene.clear()
         self._scene.addPixmap(pixmap)
         self._scene.setSceneRect(0, 0, width, height)
         
         if self.first_image_load:
-            print("[DEBUG] Premier chargement de l'image")
             self.fitInView(self._scene.sceneRect(), Qt.AspectRatioMode.KeepAspectRatio)
             
             # Calculer le facteur de zoom initial
@@ -54,17 +92,15 @@ class ImageViewer(QGraphicsView):
             scale_y = viewport_rect.height() / scene_rect.height()
             self.zoom_factor = min(scale_x, scale_y)
             
-            print(f"[DEBUG] Zoom initial calculé : {self.zoom_factor}")
+            logger.debug("Zoom initial calculé : %s", self.zoom_factor)
             self.first_image_load = False
             self.initial_zoom_done = True
         else:
             # Restaurer le zoom précédent
             self.zoom_factor = current_zoom
-            print(f"[DEBUG] Restauration du zoom précédent : {self.zoom_factor}")
         
         # Appliquer le zoom
         self.setTransform(QTransform().scale(self.zoom_factor, self.zoom_factor))
-        print(f"[DEBUG] Transform appliquée avec zoom : {self.zoom_factor}")
 
     def resizeEvent(self, event):
         super().resizeEvent(event)
@@ -79,6 +115,15 @@ class ImageViewer(QGraphicsView):
                 self.setTransform(QTransform().scale(self.zoom_factor, self.zoom_factor))
                 self.initial_zoom_done = True
 
+    def focus_on(self, x0, y0, x1, y1, fill=0.3):
+        """Centre la vue sur un rectangle de la scène et zoome pour qu'il occupe la fraction fill de la vue."""
+        viewport_rect = self.viewport().rect()
+        width, height = max(x1 - x0, 1.0), max(y1 - y0, 1.0)
+        zoom = min(viewport_rect.width() * fill / width, viewport_rect.height() * fill / height)
+        self.zoom_factor = max(0.1, min(10.0, zoom))
+        self.setTransform(QTransform().scale(self.zoom_factor, self.zoom_factor))
+        self.centerOn(QPointF((x0 + x1) / 2, (y0 + y1) / 2))
+
     def mousePressEvent(self, event):
         """Gère les événements de clic de souris."""
         if event.button() == Qt.MouseButton.MiddleButton:
@@ -89,7 +134,7 @@ class ImageViewer(QGraphicsView):
             # Transmettre l'événement à la fenêtre principale
             main_window = self.window()
             if main_window:
-                main_window.handle_mouse_click(event.pos())
+                main_window.handle_mouse_click(event.pos(), event.modifiers())
 
     def mouseReleaseEvent(self, event):
         """Gère les événements de relâchement du bouton de la souris."""
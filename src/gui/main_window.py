@@ -1,21 +1,77 @@
 from PyQt6.QtWidgets import (
     QMainWindow, QWidget, QVBoxLayout, QHBoxLayout,
     QPushButton, QLabel, QMessageBox,
-    QSlider, QGroupBox, QComboBox, QLineEdit,
-    QGraphicsScene, QGraphicsPixmapItem, QGraphicsItem
+    QSlider, QGroupBox, QComboBox, QLineEdit, QCheckBox, QSpinBox,
+    QGraphicsScene, QGraphicsItem
 )
-from PyQt6.QtCore import Qt, QPoint, QRectF, QPointF
+from PyQt6.QtCore import Qt, QPoint, QRectF, QPointF, QTimer
+from collections import OrderedDict
 from PyQt6.QtGui import (
     QKeySequence, QShortcut, QMouseEvent, QWheelEvent,
     QPixmap, QImage, QPainter, QTransform
 )
 import os
+import sqlite3
 from ..core.image_processor import ImageProcessor
 from ..core.annotation_manager import AnnotationManager
 from ..core.polygon import Polygon, Point
-from .image_viewer import ImageViewer
+from ..core.dataset_scanner import DatasetScanner, STATUS_UNTOUCHED, STATUS_IN_PROGRESS, STATUS_DONE
+from ..core.queue_scheduler import UncertaintyScheduler
+from ..core.phash_index import PHashIndex
+from ..core.propagation import AnnotationPropagator
+from ..core.edge_snap import EdgeMapCache
+from ..core.superpixels import SuperpixelCache
+from ..core.work_queue import WorkQueue, move_file
+from ..core.image_source import S3ImageSource
+from ..core.decode_pool import DecodePool
+from ..core.review import ReviewStore, REVIEW_ACCEPTED, REVIEW_REJECTED, proposal_key
+from ..core.thumbnail_cache import ThumbnailCache
+from ..core.dataset_scanner import IMAGE_EXTENSIONS
+from .background import BackgroundTasks
+from .filmstrip import Filmstrip
+from .image_viewer import FrameItem, ImageViewer
 import cv2
+import logging
 import numpy as np
+from ..utils.perf import recorder
+try:
+    from config import WORK_QUEUE_DB
+except ImportError:
+    WORK_QUEUE_DB = None
+try:
+    from config import IMAGE_SOURCE_URL
+except ImportError:
+    IMAGE_SOURCE_URL = None
+try:
+    from config import S3_ENDPOINT_URL
+except ImportError:
+    S3_ENDPOINT_URL = None
+try:
+    from config import IMAGE_CACHE_MAX_GB
+except ImportError:
+    IMAGE_CACHE_MAX_GB = 20
+try:
+    from config import DECODE_WORKERS
+except ImportError:
+    DECODE_WORKERS = None
+
+logger = logging.getLogger(__name__)
+
+# Distance maximale d'aimantation d'un sommet, en pixels écran
+SNAP_RADIUS = 12
+# Nombre d'images suivantes téléchargées à l'avance depuis une source distante
+PREFETCH_COUNT = 3
+# Nombre d'images suivantes décodées à l'avance par le pool de décodage
+DECODE_PREFETCH_COUNT = 2
+# Niveaux de détail du rendu, en pixels écran : sommets masqués sous MIN_VERTEX_PX de rayon,
+# polygones de moins de TINY_POLYGON_PX réduits à un point de MARKER_PX de rayon
+MIN_VERTEX_PX = 2
+TINY_POLYGON_PX = 8
+MARKER_PX = 2
+# Marge autour de la zone visible redessinée, en fraction de sa taille
+RENDER_MARGIN = 0.25
+# Relecture : fraction de la vue occupée par la proposition centrée
+REVIEW_FILL = 0.3
 
 class MainWindow(QMainWindow):
     def __init__(self):
@@ -24,8 +80,18 @@ class MainWindow(QMainWindow):
         self.setMinimumSize(1200, 800)
         
         # Initialisation des composants
-        self.image_processor = ImageProcessor()
+        # Grandes images décodées dans des processus, en mémoire partagée
+        self.decode_pool = DecodePool(DECODE_WORKERS) if DECODE_WORKERS != 0 else None
+        self.image_processor = ImageProcessor(decode_pool=self.decode_pool)
         self.annotation_manager = AnnotationManager()
+        # Source d'images distante (optionnelle) : bucket S3 lu à travers un cache local
+        self.image_source = None
+        if IMAGE_SOURCE_URL:
+            self.image_source = S3ImageSource(
+                IMAGE_SOURCE_URL, endpoint_url=S3_ENDPOINT_URL,
+                max_cache_bytes=int(IMAGE_CACHE_MAX_GB * 1024 ** 3)
+            )
+            self.annotation_manager.label_store = self.image_source
         
         # Widget central
         central_widget = QWidget()
@@ -59,6 +125,17 @@ class MainWindow(QMainWindow):
         navigation_layout.addWidget(self.save_button)
         navigation_layout.addSpacing(10)
         navigation_layout.addWidget(self.finish_button)
+        
+        # Ordre de la file : les images les plus incertaines d'abord
+        self.prioritize_checkbox = QCheckBox("Prioriser les images incertaines")
+        self.prioritize_checkbox.setChecked(False)
+        navigation_layout.addWidget(self.prioritize_checkbox)
+        
+        # Quasi-doublons : les ignorer ou les regrouper dans la file
+        self.skip_duplicates_checkbox = QCheckBox("Ignorer les quasi-doublons")
+        self.group_duplicates_button = QPushButton("Grouper les quasi-doublons")
+        navigation_layout.addWidget(self.skip_duplicates_checkbox)
+        navigation_layout.addWidget(self.group_duplicates_button)
         navigation_layout.addStretch()
         navigation_group.setLayout(navigation_layout)
         
@@ -85,6 +162,22 @@ class MainWindow(QMainWindow):
         # Ajout des contrôles IA au layout
         ai_layout.addWidget(self.ai_assist_button)
         ai_layout.addLayout(confidence_layout)
+        
+        # Relecture rapide des propositions IA
+        self.review_checkbox = QCheckBox("Mode relecture")
+        self.review_checkbox.setToolTip("a : accepter, x : rejeter, espace : proposition suivante")
+        bulk_layout = QHBoxLayout()
+        self.bulk_accept_button = QPushButton("Accepter au-dessus de")
+        self.bulk_accept_cutoff = QSpinBox()
+        self.bulk_accept_cutoff.setRange(0, 100)
+        self.bulk_accept_cutoff.setValue(90)
+        self.bulk_accept_cutoff.setSuffix(" %")
+        bulk_layout.addWidget(self.bulk_accept_button)
+        bulk_layout.addWidget(self.bulk_accept_cutoff)
+        self.review_label = QLabel()
+        ai_layout.addWidget(self.review_checkbox)
+        ai_layout.addLayout(bulk_layout)
+        ai_layout.addWidget(self.review_label)
         ai_group.setLayout(ai_layout)
         
         # Groupe pour les contrôles d'annotation
@@ -113,8 +206,17 @@ class MainWindow(QMainWindow):
         annotation_layout.addWidget(self.delete_polygon_button)
         annotation_layout.addWidget(self.duplicate_polygon_button)
         
+        # Propagation des annotations d'une prise de vue voisine
+        self.propagate_button = QPushButton("Propager depuis l'image voisine (r)")
+        annotation_layout.addWidget(self.propagate_button)
+        
+        # Aimantation des sommets déplacés vers les contours de l'image
+        self.snap_checkbox = QCheckBox("Aimanter les sommets aux contours")
+        annotation_layout.addWidget(self.snap_checkbox)
+        
         # Ajouter un label pour la touche =
-        help_label = QLabel("Appuyez sur = pour ajouter des points au milieu de chaque ligne du polygone sélectionné")
+        help_label = QLabel("Appuyez sur = pour ajouter des points au milieu de chaque ligne du polygone sélectionné. "
+                            "Ctrl+clic crée un polygone à partir de la région cliquée, Ctrl+Maj+clic l'agrandit.")
         help_label.setWordWrap(True)
         annotation_layout.addWidget(help_label)
         
@@ -142,11 +244,62 @@ class MainWindow(QMainWindow):
         
         main_layout.addLayout(h_layout)
         
+        # Bandeau de vignettes pour accéder directement à n'importe quelle image
+        self.thumbnail_cache = ThumbnailCache()
+        self.filmstrip = Filmstrip(self.thumbnail_cache, self.get_image_status)
+        main_layout.addWidget(self.filmstrip)
+        self.thumbnail_timer = QTimer(self)
+        self.thumbnail_timer.setInterval(500)
+        # Redessin différé après un défilement : les annotations hors de la zone visible
+        # ne sont dessinées qu'une fois celle-ci atteinte
+        self.render_timer = QTimer(self)
+        self.render_timer.setSingleShot(True)
+        self.render_timer.setInterval(15)
+        
+        # HUD des performances dans la barre d'état
+        self.perf_label = QLabel()
+        self.statusBar().addPermanentWidget(self.perf_label)
+        
         # Variables d'état
         self.image_files = []
         self.current_image_index = -1
+        self.current_image_path = None
+        self.dataset_scanner = None
+        self.scheduler = UncertaintyScheduler()
+        self.visited_images = set()
+        self.background = BackgroundTasks(max_workers=4, parent=self)
+        # Pool dédié aux détections : elles ne doivent pas attendre les tâches d'indexation
+        self.detection_tasks = BackgroundTasks(max_workers=2, parent=self)
+        self.detection_generation = 0
+        self.fetch_generation = 0  # Téléchargement S3 de l'image courante
+        self.detection_future = None
+        self.detection_image = None
+        self.prediction_cache = OrderedDict()  # Prédictions brutes par image (LRU)
+        self.phash_index = PHashIndex()
+        self.duplicate_index_ready = False
+        self.propagator = AnnotationPropagator()
+        self.proposals = {}
+        self.last_finished_image = None
+        self.edge_maps = EdgeMapCache()
+        self.superpixels = SuperpixelCache()
+        self.region_selection = None  # (polygon, régions) du polygone construit par clic
+        # Décisions de relecture des propositions IA, à côté des annotations
+        self.review_store = ReviewStore(os.path.join(os.path.dirname(self.annotation_manager.annotations_dir), "review"),
+                                        name_fn=self.annotation_manager.get_sample_name)
+        self.review_current = None  # Proposition centrée dans la vue
+        # File partagée entre annotateurs (optionnelle) : bail sur l'image affichée
+        self.work_queue = WorkQueue(WORK_QUEUE_DB) if WORK_QUEUE_DB else None
+        self.leased_image = None
+        self.heartbeat_timer = QTimer(self)
+        self.heartbeat_timer.setInterval(60 * 1000)
         self.original_image = None
+        self.display_scale = 1.0  # Taille de original_image / pleine résolution
+        self.image_size = None  # (largeur, hauteur) en pleine résolution
         self.display_image = None
+        self.frame_buffer = None
+        self.frame_source = None  # Image dont le tampon de trame contient une copie complète
+        self.frame_dirty = None  # Zone (x0, y0, x1, y1) du tampon dessinée à la trame précédente
+        self.preview_buffer = None
         self.current_annotations = []
         self.current_polygon = None
         self.selected_point = None
@@ -157,6 +310,10 @@ class MainWindow(QMainWindow):
         self.scene = QGraphicsScene()
         self.labels = ["hold", "volume"]  # Ajout des labels disponibles
         
+        # Initialiser le modèle dès le démarrage, hors du thread de l'interface
+        if self.image_processor.is_ai_configured():
+            self.image_processor.warm_up()
+        
         # Connecter les signaux
         self.setup_connections()
         
@@ -178,23 +335,38 @@ class MainWindow(QMainWindow):
         self.new_polygon_button.clicked.connect(self.start_new_polygon)
         self.delete_polygon_button.clicked.connect(self.enable_polygon_deletion)
         self.duplicate_polygon_button.clicked.connect(self.duplicate_selected_polygon)
+        self.group_duplicates_button.clicked.connect(self.group_duplicates)
+        self.propagate_button.clicked.connect(self.apply_proposals)
+        self.snap_checkbox.toggled.connect(self.start_edge_map)
+        self.review_checkbox.toggled.connect(self.toggle_review_mode)
+        self.bulk_accept_button.clicked.connect(self.bulk_accept_proposals)
+        self.filmstrip.clicked.connect(lambda index: self.jump_to_image(index.row()))
+        # Rafraîchir le bandeau pendant le calcul des vignettes
+        self.thumbnail_timer.timeout.connect(self.filmstrip.viewport().update)
+        self.heartbeat_timer.timeout.connect(self.send_heartbeat)
+        self.render_timer.timeout.connect(self.update_image_display)
+        self.image_viewer.horizontalScrollBar().valueChanged.connect(self.schedule_render)
+        self.image_viewer.verticalScrollBar().valueChanged.connect(self.schedule_render)
         
         # Ajouter la connexion pour le changement de type d'annotation
         self.polygon_class.currentTextChanged.connect(self.update_selected_polygon_type)
         
-        print("Configuration des raccourcis clavier...")
-        # Ajout des raccourcis clavier
-        QShortcut(QKeySequence("p"), self).activated.connect(self.show_previous_image)
-        print("Raccourci 'p' configuré")
-        QShortcut(QKeySequence("n"), self).activated.connect(self.show_next_image)
-        print("Raccourci 'n' configuré")
-        QShortcut(QKeySequence("d"), self).activated.connect(self.enable_polygon_deletion)
-        print("Raccourci 'd' configuré")
-        QShortcut(QKeySequence(":"), self).activated.connect(self.start_new_polygon)
-        print("Raccourci ':' configuré")
-        QShortcut(QKeySequence("="), self).activated.connect(self.add_midpoints_to_polygon)
-        print("Raccourci '=' configuré")
-        print("Configuration des raccourcis clavier terminée")
+        # Ajout des raccourcis clavier (touche -> raccourci, repris par l'enregistrement des sessions)
+        actions = {
+            "p": self.show_previous_image,
+            "n": self.show_next_image,
+            "d": self.enable_polygon_deletion,
+            ":": self.start_new_polygon,
+            "=": self.add_midpoints_to_polygon,
+            "r": self.apply_proposals,
+            "a": self.accept_proposal,
+            "x": self.reject_proposal,
+            "Space": self.next_proposal,
+        }
+        self.shortcuts = {}
+        for key, action in actions.items():
+            self.shortcuts[key] = QShortcut(QKeySequence(key), self)
+            self.shortcuts[key].activated.connect(action)
     
     def start_new_polygon(self):
         """Démarre la création d'un nouveau polygone."""
@@ -209,7 +381,7 @@ class MainWindow(QMainWindow):
         self.current_polygon = Polygon(name, class_type)
         
         # Calculer les dimensions de l'image
-        height, width = self.original_image.shape[:2]
+        width, height = self.image_size
         center_x = width / 2
         center_y = height / 2
         size = min(width, height) / 8  # Taille du carré (1/4 de la plus petite dimension)
@@ -222,7 +394,7 @@ class MainWindow(QMainWindow):
         
         # Ajouter directement le polygone aux annotations
         self.current_annotations.append(self.current_polygon)
-        print(f"Création d'un nouveau polygone : {name} ({class_type})")
+        logger.debug("Création d'un nouveau polygone : %s (%s)", name, class_type)
         
         # Mettre à jour l'affichage
         self.update_image_display()
@@ -232,7 +404,7 @@ class MainWindow(QMainWindow):
         if self.selected_point is not None:
             # Supprimer le point sélectionné
             polygon, point_index = self.selected_point
-            print(f"Suppression du point {point_index} du polygone {polygon.name}")
+            logger.debug("Suppression du point %d du polygone %s", point_index, polygon.name)
             polygon.points.pop(point_index)
             if len(polygon.points) < 3:
                 # Si le polygone n'a plus assez de points, le supprimer
@@ -240,7 +412,7 @@ class MainWindow(QMainWindow):
             self.selected_point = None
         elif self.current_polygon is not None:
             # Supprimer le polygone sélectionné
-            print(f"Suppression du polygone {self.current_polygon.name}")
+            logger.debug("Suppression du polygone %s", self.current_polygon.name)
             self.current_annotations.remove(self.current_polygon)
             self.current_polygon = None
         
@@ -257,10 +429,10 @@ class MainWindow(QMainWindow):
         y = pos.y()
         
         self.current_polygon.add_point(x, y)
-        print(f"Point ajouté au polygone {self.current_polygon.name} : ({x}, {y})")
+        logger.debug("Point ajouté au polygone %s : (%s, %s)", self.current_polygon.name, x, y)
         self.update_image_display()
     
-    def handle_mouse_click(self, pos):
+    def handle_mouse_click(self, pos, modifiers=Qt.KeyboardModifier.NoModifier):
         if self.original_image is None:
             return
         
@@ -268,6 +440,12 @@ class MainWindow(QMainWindow):
         point = QPoint(int(pos.x()), int(pos.y()))
         scene_pos = self.image_viewer.mapToScene(point)
         
+        # Ctrl+clic : polygone construit à partir des régions de l'image
+        if modifiers & Qt.KeyboardModifier.ControlModifier:
+            self.select_region(scene_pos.x(), scene_pos.y(),
+                               extend=bool(modifiers & Qt.KeyboardModifier.ShiftModifier))
+            return
+        
         # Vérifier si on clique sur un point d'un polygone
         for polygon in self.current_annotations:
             for i, point in enumerate(polygon.points):
@@ -289,6 +467,49 @@ class MainWindow(QMainWindow):
         # Si on ne clique sur rien, désélectionner tout
         self.deselect_all()
     
+    def select_region(self, x, y, extend=False):
+        """Crée un polygone couvrant la région cliquée, ou y ajoute la région (extend)."""
+        superpixels = self.superpixels.get(self.current_image_path)
+        if superpixels is None:
+            self.statusBar().showMessage("Découpage de l'image en régions en cours...", 3000)
+            return
+        region = superpixels.region_at(x, y)
+        if region is None:
+            return
+        
+        if extend and self.region_selection is not None and self.region_selection[0] in self.current_annotations:
+            polygon, regions = self.region_selection
+            if region in regions:
+                regions = regions - {region}
+                if not superpixels.is_connected(regions):
+                    # Le polygone ne garderait qu'un morceau : la sélection et le contour divergeraient
+                    self.statusBar().showMessage("Retirer cette région couperait le polygone en deux", 3000)
+                    return
+            elif superpixels.is_adjacent(region, regions):
+                regions = regions | {region}
+            else:
+                self.statusBar().showMessage("La région doit toucher le polygone en cours", 3000)
+                return
+            if not regions:
+                return
+        else:
+            class_type = self.polygon_class.currentText()
+            polygon_count = sum(1 for p in self.current_annotations if p.class_type == class_type)
+            polygon = Polygon(f"{class_type}_{polygon_count + 1}", class_type)
+            regions = {region}
+        
+        points = superpixels.polygon(regions)
+        if not points:
+            return
+        polygon.points = []
+        for px, py in points:
+            polygon.add_point(px, py)
+        if polygon not in self.current_annotations:
+            self.current_annotations.append(polygon)
+        self.region_selection = (polygon, regions)
+        logger.debug("Polygone %s construit à partir de %d régions", polygon.name, len(regions))
+        self.select_polygon(polygon)
+    
     def handle_mouse_move(self, pos):
         if self.original_image is None:
             return
@@ -299,7 +520,8 @@ class MainWindow(QMainWindow):
         
         if self.selected_point:
             polygon, point_index = self.selected_point
-            polygon.move_point(point_index, scene_pos.x(), scene_pos.y())
+            x, y = self.snap_to_edges(scene_pos.x(), scene_pos.y())
+            polygon.move_point(point_index, x, y)
             self.update_image_display()
         elif self.selected_polygon:
             self.selected_polygon.update_drag(scene_pos.x(), scene_pos.y())
@@ -338,27 +560,109 @@ class MainWindow(QMainWindow):
         """Met à jour l'affichage de l'image avec les annotations."""
         if self.original_image is None:
             return
-
-        # Créer une copie profonde de l'image originale
-        display_image = self.original_image.copy()
+        
+        with recorder.stage("render", self.current_image_path):
+            self._render_annotations()
+        self.update_perf_hud()
+    
+    def update_perf_hud(self):
+        """Affiche les dernières durées mesurées dans la barre d'état."""
+        self.perf_label.setText(recorder.summary_text())
+    
+    def schedule_render(self):
+        """Regroupe les demandes de rendu rapprochées (défilement) en un seul redessin."""
+        if self.original_image is not None and not self.render_timer.isActive():
+            self.render_timer.start()
+    
+    def visible_image_rect(self):
+        """Zone de l'image (pleine résolution) visible à l'écran, élargie de RENDER_MARGIN."""
+        width, height = self.image_size
+        viewport = self.image_viewer.viewport().rect()
+        if viewport.isEmpty():
+            return 0, 0, width, height
+        rect = self.image_viewer.mapToScene(viewport).boundingRect()
+        margin_x, margin_y = rect.width() * RENDER_MARGIN, rect.height() * RENDER_MARGIN
+        return (max(0, rect.left() - margin_x), max(0, rect.top() - margin_y),
+                min(width, rect.right() + margin_x), min(height, rect.bottom() + margin_y))
+    
+    def _render_annotations(self):
+        """Dessine les annotations dans le tampon de trame et le transmet à la scène."""
+        scale = self.display_scale
+        visible = self.visible_image_rect()
+        # Réutiliser le tampon de trame tant que la taille de l'image ne change pas
+        if self.frame_buffer is None or self.frame_buffer.shape != self.original_image.shape:
+            self.frame_buffer = np.empty_like(self.original_image)
+            self.frame_source = None
+        display_image = self.frame_buffer
         
         # Calculer l'épaisseur des lignes en fonction du zoom
         line_thickness = max(1, int(2 * self.current_zoom))
         point_radius = max(3, int(5 * self.current_zoom))
+        if scale != 1.0:
+            # Image réduite affichée en attendant la pleine résolution : épaisseurs ramenées à son échelle
+            line_thickness = max(1, int(line_thickness * scale))
+            point_radius = max(1, int(point_radius * scale))
+        
+        # Niveau de détail selon la taille à l'écran (zoom de la vue, en pixels écran par pixel image)
+        view_zoom = max(self.image_viewer.transform().m11(), 1e-6)
+        show_vertices = point_radius / scale * view_zoom >= MIN_VERTEX_PX
+        marker_radius = max(1, int(MARKER_PX / view_zoom * scale))
 
-        # Dessiner tous les polygones
+        # Polygones visibles : ils sont dessinés en entier, y compris hors de la zone visible
+        drawn = []
         for polygon in self.current_annotations:
+            if not polygon.points:
+                continue
+            bx0, by0, bx1, by1 = polygon.bounds()
+            if bx1 < visible[0] or bx0 > visible[2] or by1 < visible[1] or by0 > visible[3]:
+                continue
+            drawn.append((polygon, (bx0, by0, bx1, by1)))
+        
+        # Zone à effacer : la zone visible, ce que cette trame dessine et ce que la précédente a dessiné.
+        # Sans cela, un polygone à cheval sur le bord serait refusionné à chaque trame.
+        pad = max(line_thickness, point_radius, marker_radius) + 2
+        dirty = [visible[0] * scale, visible[1] * scale, visible[2] * scale, visible[3] * scale]
+        for _, (bx0, by0, bx1, by1) in drawn:
+            dirty = [min(dirty[0], bx0 * scale - pad), min(dirty[1], by0 * scale - pad),
+                     max(dirty[2], bx1 * scale + pad), max(dirty[3], by1 * scale + pad)]
+        height, width = display_image.shape[:2]
+        dirty = (max(0, int(dirty[0])), max(0, int(dirty[1])),
+                 min(width, int(np.ceil(dirty[2]))), min(height, int(np.ceil(dirty[3]))))
+        if self.frame_source is not self.original_image:
+            np.copyto(display_image, self.original_image)
+            self.frame_source = self.original_image
+            region = None  # Tout le pixmap est à remplacer
+        else:
+            x0, y0, x1, y1 = dirty
+            if self.frame_dirty is not None:
+                x0, y0 = min(x0, self.frame_dirty[0]), min(y0, self.frame_dirty[1])
+                x1, y1 = max(x1, self.frame_dirty[2]), max(y1, self.frame_dirty[3])
+            np.copyto(display_image[y0:y1, x0:x1], self.original_image[y0:y1, x0:x1])
+            region = (x0, y0, x1, y1)
+        self.frame_dirty = dirty
+
+        # Dessiner les polygones visibles
+        for polygon, (bx0, by0, bx1, by1) in drawn:
             # Ajuster l'opacité et la couleur en fonction du type de polygone
             if polygon.name.startswith("ia_"):
                 # Polygone créé par l'IA : plus transparent et en vert
                 opacity = 0.15 if polygon.is_selected else 0.1
                 color = (0, 255, 0)  # Vert pour les polygones IA
+            elif polygon.name.startswith("prop_"):
+                # Polygone propagé depuis une image voisine : transparent et en orange
+                opacity = 0.15 if polygon.is_selected else 0.1
+                color = (0, 165, 255)
             else:
                 # Polygone créé manuellement : normal et en bleu/rouge
                 opacity = 0.3 if polygon.is_selected else 0.2
                 color = None  # Utiliser la couleur par défaut
             
-            polygon.draw(display_image, line_thickness=line_thickness, point_radius=point_radius, opacity=opacity, color=color)
+            if not polygon.is_selected and max(bx1 - bx0, by1 - by0) * view_zoom < TINY_POLYGON_PX:
+                polygon.draw_marker(display_image, marker_radius, color=color, scale=scale)
+                continue
+            polygon.draw(display_image, line_thickness=line_thickness, point_radius=point_radius,
+                         opacity=opacity, color=color, scale=scale,
+                         draw_points=show_vertices or polygon.is_selected)
             
             # Si c'est le polygone sélectionné, créer la prévisualisation
             if polygon.is_selected:
@@ -371,28 +675,26 @@ class MainWindow(QMainWindow):
                         Qt.TransformationMode.SmoothTransformation
                     ))
 
-        # Convertir l'image en QImage pour l'affichage
-        height, width, channel = display_image.shape
-        bytes_per_line = 3 * width
-        
-        # S'assurer que l'image est au format RGB
-        if channel == 4:  # Si l'image a un canal alpha
-            display_image = cv2.cvtColor(display_image, cv2.COLOR_BGRA2RGB)
-        elif channel == 3:  # Si l'image est en BGR
-            display_image = cv2.cvtColor(display_image, cv2.COLOR_BGR2RGB)
-            
-        # Créer le QImage
-        q_image = QImage(display_image.data, width, height, bytes_per_line, QImage.Format.Format_RGB888)
+        # Le tampon BGR est transmis tel quel à Qt, sans conversion de couleurs :
+        # original_image est déjà au format BGR 8 bits sur 3 canaux
+        q_image = QImage(display_image.data, width, height, display_image.strides[0],
+                         QImage.Format.Format_BGR888)
 
-        # Mettre à jour l'image dans le QGraphicsScene
+        # Mettre à jour l'image dans le QGraphicsScene : seule la zone redessinée est recopiée
         if self.image_item is None:
-            self.image_item = QGraphicsPixmapItem(QPixmap.fromImage(q_image))
+            self.image_item = FrameItem()
             self.scene.addItem(self.image_item)
+            region = None
+        if region is None or self.image_item.pixmap.size() != q_image.size():
+            self.image_item.set_image(q_image)
         else:
-            self.image_item.setPixmap(QPixmap.fromImage(q_image))
+            self.image_item.update_region(q_image, *region)
+        
+        # La scène reste en coordonnées pleine résolution, quelle que soit l'image affichée
+        self.image_item.setScale(1.0 / scale)
 
         # Mettre à jour la scène
-        self.scene.setSceneRect(self.image_item.boundingRect())
+        self.scene.setSceneRect(QRectF(0, 0, *self.image_size))
         self.image_viewer.setScene(self.scene)
         
         # Restaurer le zoom précédent
@@ -404,40 +706,30 @@ class MainWindow(QMainWindow):
         if self.original_image is None:
             return None
 
-        # Créer une copie de l'image originale
-        preview = self.original_image.copy()
-        
-        # Créer un masque pour le polygone
-        mask = np.zeros(preview.shape[:2], dtype=np.uint8)
-        points = np.array([[int(p.x), int(p.y)] for p in polygon.points], dtype=np.int32)
-        cv2.fillPoly(mask, [points], 255)
-        
-        # Appliquer le masque à l'image
-        preview = cv2.bitwise_and(preview, preview, mask=mask)
-        
-        # Trouver les limites du polygone
+        # Trouver les limites du polygone, dans l'espace de l'image affichée
+        scale = self.display_scale
+        points = np.array([[int(p.x * scale), int(p.y * scale)] for p in polygon.points], dtype=np.int32)
         x, y, w, h = cv2.boundingRect(points)
         
+        # Limiter le recadrage à l'image
+        image_height, image_width = self.original_image.shape[:2]
+        x0, y0 = max(x, 0), max(y, 0)
+        x1, y1 = min(x + w, image_width), min(y + h, image_height)
+        
         # Vérifier que les dimensions sont valides
-        if w <= 0 or h <= 0:
+        if x1 <= x0 or y1 <= y0:
             return None
-            
-        # Recadrer l'image sur le polygone
-        preview = preview[y:y+h, x:x+w]
         
-        # Vérifier que l'image n'est pas vide
-        if preview.size == 0:
-            return None
-            
-        # Convertir en QImage
-        height, width, channel = preview.shape
-        bytes_per_line = 3 * width
-        if channel == 4:
-            preview = cv2.cvtColor(preview, cv2.COLOR_BGRA2RGB)
-        elif channel == 3:
-            preview = cv2.cvtColor(preview, cv2.COLOR_BGR2RGB)
-            
-        return QImage(preview.data, width, height, bytes_per_line, QImage.Format.Format_RGB888)
+        # Masquer uniquement la zone recadrée, sans copier l'image entière
+        crop = self.original_image[y0:y1, x0:x1]
+        mask = np.zeros(crop.shape[:2], dtype=np.uint8)
+        cv2.fillPoly(mask, [points - (x0, y0)], 255)
+        preview = cv2.bitwise_and(crop, crop, mask=mask)
+        
+        # Le QImage ne copie pas les pixels : garder une référence au tableau
+        self.preview_buffer = preview
+        height, width = preview.shape[:2]
+        return QImage(preview.data, width, height, preview.strides[0], QImage.Format.Format_BGR888)
     
     def update_confidence_threshold(self, value):
         """Met à jour le seuil de confiance et l'affiche."""
@@ -446,30 +738,229 @@ class MainWindow(QMainWindow):
         self.confidence_value_label.setText(f"{value}%")
         
         if self.current_image_path and self.ai_assist_button.isChecked():
-            # Supprimer les polygones dont la confiance est inférieure au seuil
-            detections, labels = self.image_processor.run_detection(self.current_image_path)
-            if detections is not None and labels is not None:
-                # Filtrer les annotations existantes
-                self.current_annotations = [
-                    polygon for polygon in self.current_annotations
-                    if not polygon.name.startswith("ia_")
-                ]
-                
-                # Créer des polygones à partir des détections
-                for i, (box, confidence) in enumerate(zip(detections.xyxy, detections.confidence)):
-                    if confidence >= threshold:
-                        # Par défaut, toutes les détections sont des prises
-                        polygon = Polygon(f"ia_hold_{i+1}", "hold")
-                        # Convertir la boîte englobante en points de polygone
-                        x1, y1, x2, y2 = box
-                        # Créer un rectangle avec les 4 coins
-                        polygon.add_point(x1, y1)  # Haut gauche
-                        polygon.add_point(x2, y1)  # Haut droite
-                        polygon.add_point(x2, y2)  # Bas droite
-                        polygon.add_point(x1, y2)  # Bas gauche
-                        self.current_annotations.append(polygon)
-                
-                self.update_image_display()
+            predictions = self.prediction_cache.get(self.current_image_path)
+            if predictions is not None:
+                # Refiltrer les prédictions déjà reçues, sans nouvel appel au modèle
+                self.apply_predictions(predictions)
+            else:
+                self.request_detection()
+    
+    def request_detection(self, notify=False, octagon=False):
+        """Lance la détection de l'image courante hors du thread de l'interface.
+        
+        Chaque demande reçoit un numéro de génération : un résultat arrivé après un
+        changement d'image ou une nouvelle demande est ignoré. notify affiche le nombre
+        d'objets détectés ; octagon choisit la forme des polygones IA.
+        """
+        image_path = self.current_image_path
+        if (not notify and self.detection_future is not None and not self.detection_future.done()
+                and self.detection_image == image_path):
+            return  # Déjà en cours pour cette image : le seuil sera appliqué à l'arrivée
+        if self.detection_future is not None:
+            # Annule la demande précédente si elle n'a pas encore démarré
+            self.detection_future.cancel()
+        self.detection_generation += 1
+        generation = self.detection_generation
+        self.detection_image = image_path
+        self.detection_future = self.detection_tasks.submit(
+            self.image_processor.predict, image_path,
+            callback=lambda predictions: self.on_detection_ready(generation, image_path, predictions,
+                                                                 notify, octagon),
+            error_callback=lambda error: self.on_detection_failed(generation, image_path, error)
+        )
+    
+    def cancel_detection(self):
+        """Invalide la détection en cours (changement d'image ou désactivation de l'IA)."""
+        if self.detection_future is not None:
+            self.detection_future.cancel()
+            self.detection_future = None
+        self.detection_generation += 1
+    
+    def on_detection_ready(self, generation, image_path, predictions, notify, octagon):
+        """Reçoit les prédictions dans le thread de l'interface."""
+        self.prediction_cache[image_path] = predictions
+        if len(self.prediction_cache) > 256:
+            self.prediction_cache.popitem(last=False)
+        self.record_predictions(image_path, predictions)
+        
+        if generation != self.detection_generation or image_path != self.current_image_path:
+            logger.debug("Détection périmée ignorée : %s", image_path)
+            return
+        if not self.ai_assist_button.isChecked():
+            return
+        detections = self.apply_predictions(predictions, octagon=octagon)
+        if notify and detections is not None:
+            QMessageBox.information(
+                self, "Détection terminée",
+                f"{len(detections.xyxy)} objets détectés"
+            )
+    
+    def on_detection_failed(self, generation, image_path, error):
+        logger.error("Erreur lors de la détection de %s", image_path, exc_info=error)
+        if generation == self.detection_generation:
+            self.statusBar().showMessage(f"Erreur lors de la détection : {error}", 5000)
+    
+    def apply_predictions(self, predictions, octagon=False, render=True):
+        """Remplace les polygones IA par les détections au-dessus du seuil de confiance."""
+        with recorder.stage("postprocess", self.current_image_path):
+            detections, labels = self.image_processor.predictions_to_detections(predictions, self.image_size)
+        
+        # Supprimer les polygones existants créés par l'IA
+        self.current_annotations = [
+            polygon for polygon in self.current_annotations
+            if not polygon.name.startswith("ia_")
+        ]
+        
+        if detections is not None and labels is not None:
+            # Les propositions déjà acceptées ou rejetées en relecture ne sont plus proposées
+            decided = self.review_store.decisions(self.current_image_path)
+            # Créer des polygones à partir des détections
+            for i, (box, confidence) in enumerate(zip(detections.xyxy, detections.confidence)):
+                if proposal_key(box) in decided:
+                    continue
+                # Par défaut, toutes les détections sont des prises
+                polygon = Polygon(f"ia_hold_{i+1}", "hold")
+                polygon.confidence = float(confidence)
+                polygon.source_box = [float(v) for v in box]
+                x1, y1, x2, y2 = box
+                if octagon:
+                    center_x = (x1 + x2) / 2
+                    center_y = (y1 + y2) / 2
+                    width = x2 - x1
+                    height = y2 - y1
+                    
+                    # Ajouter 8 points pour créer un octogone
+                    # Points sur les côtés
+                    polygon.add_point(x1, center_y - height/4)  # Gauche haut
+                    polygon.add_point(center_x - width/4, y1)   # Haut gauche
+                    polygon.add_point(center_x + width/4, y1)   # Haut droite
+                    polygon.add_point(x2, center_y - height/4)  # Droite haut
+                    polygon.add_point(x2, center_y + height/4)  # Droite bas
+                    polygon.add_point(center_x + width/4, y2)   # Bas droite
+                    polygon.add_point(center_x - width/4, y2)   # Bas gauche
+                    polygon.add_point(x1, center_y + height/4)  # Gauche bas
+                else:
+                    # Créer un rectangle avec les 4 coins
+                    polygon.add_point(x1, y1)  # Haut gauche
+                    polygon.add_point(x2, y1)  # Haut droite
+                    polygon.add_point(x2, y2)  # Bas droite
+                    polygon.add_point(x1, y2)  # Bas gauche
+                self.current_annotations.append(polygon)
+            logger.info("%d polygones IA créés", len(detections.xyxy))
+        
+        if self.review_checkbox.isChecked():
+            # Sans proposition en attente (aucune détection, ou toutes déjà tranchées), l'image est relue
+            complete = not self.pending_proposals()
+            if complete != self.review_store.is_reviewed(self.current_image_path):
+                self.review_store.record(self.current_image_path, [], complete=complete)
+            self.review_current = None
+            self.next_proposal()
+        elif render:
+            self.update_image_display()
+        return detections
+    
+    def pending_proposals(self):
+        """Propositions IA pas encore tranchées, les plus sûres d'abord."""
+        proposals = [polygon for polygon in self.current_annotations if polygon.name.startswith("ia_")]
+        return sorted(proposals, key=lambda polygon: -(polygon.confidence or 0.0))
+    
+    def annotations_to_save(self):
+        """Annotations à écrire : en mode relecture, sans les propositions IA pas encore acceptées."""
+        if not self.review_checkbox.isChecked():
+            return self.current_annotations
+        return [polygon for polygon in self.current_annotations if not polygon.name.startswith("ia_")]
+    
+    def toggle_review_mode(self, enabled):
+        """Active la relecture : centre la première proposition et ignore les images déjà relues."""
+        self.review_current = None
+        if enabled and self.current_image_path:
+            self.next_proposal()
+        else:
+            self.review_label.clear()
+    
+    def update_review_status(self):
+        pending = self.pending_proposals()
+        if self.review_current in pending:
+            confidence = self.review_current.confidence or 0.0
+            self.review_label.setText(f"Proposition {pending.index(self.review_current) + 1}/{len(pending)} "
+                                      f"(confiance {confidence:.0%})")
+        else:
+            self.review_label.setText(f"{len(pending)} proposition(s) en attente")
+    
+    def next_proposal(self):
+        """Centre et sélectionne la proposition suivante (mode relecture)."""
+        if not self.review_checkbox.isChecked() or self.original_image is None:
+            return
+        pending = self.pending_proposals()
+        if not pending:
+            self.review_current = None
+            self.update_review_status()
+            self.update_image_display()
+            return
+        if self.review_current in pending:
+            index = (pending.index(self.review_current) + 1) % len(pending)
+        else:
+            index = 0
+        self.review_current = pending[index]
+        self.image_viewer.focus_on(*self.review_current.bounds(), fill=REVIEW_FILL)
+        self.select_polygon(self.review_current)
+        self.update_review_status()
+    
+    def _current_proposal(self):
+        """Proposition visée par a/x : celle centrée, sinon la proposition sélectionnée."""
+        pending = self.pending_proposals()
+        if self.review_current in pending:
+            return self.review_current
+        if self.selected_polygon in pending:
+            return self.selected_polygon
+        return pending[0] if pending else None
+    
+    def next_polygon_name(self, class_type):
+        """Premier nom « classe_n » qu'aucun polygone de l'image ne porte encore."""
+        used = {polygon.name for polygon in self.current_annotations}
+        index = 1
+        while f"{class_type}_{index}" in used:
+            index += 1
+        return f"{class_type}_{index}"
+    
+    def _decide(self, proposals, state):
+        """Applique et enregistre une décision ; passe à l'image suivante quand tout est tranché."""
+        for polygon in proposals:
+            if state == REVIEW_ACCEPTED:
+                # Devient une annotation ordinaire, sauvegardée avec les autres
+                polygon.name = self.next_polygon_name(polygon.class_type)
+            else:
+                self.current_annotations.remove(polygon)
+        remaining = self.pending_proposals()
+        self.review_store.record(self.current_image_path,
+                                 [(p.source_box or p.bounds(), p.confidence, state) for p in proposals],
+                                 complete=not remaining)
+        self.deselect_all()
+        if remaining:
+            self.next_proposal()
+            return
+        self.statusBar().showMessage("Toutes les propositions de l'image ont été relues", 3000)
+        self.review_current = None
+        self.update_review_status()
+        self.show_next_image()
+    
+    def accept_proposal(self):
+        if self.review_checkbox.isChecked() and self._current_proposal() is not None:
+            self._decide([self._current_proposal()], REVIEW_ACCEPTED)
+    
+    def reject_proposal(self):
+        if self.review_checkbox.isChecked() and self._current_proposal() is not None:
+            self._decide([self._current_proposal()], REVIEW_REJECTED)
+    
+    def bulk_accept_proposals(self):
+        """Accepte d'un coup les propositions au-dessus du seuil choisi."""
+        cutoff = self.bulk_accept_cutoff.value() / 100.0
+        accepted = [polygon for polygon in self.pending_proposals() if (polygon.confidence or 0.0) >= cutoff]
+        if not accepted:
+            self.statusBar().showMessage("Aucune proposition au-dessus du seuil", 3000)
+            return
+        logger.info("%d propositions acceptées au-dessus de %.0f %%", len(accepted), cutoff * 100)
+        self._decide(accepted, REVIEW_ACCEPTED)
     
     def _polygons_overlap(self, polygon, detection):
         """Vérifie si un polygone et une détection se chevauchent."""
@@ -477,11 +968,12 @@ class MainWindow(QMainWindow):
         polygon_points = np.array([[p.x, p.y] for p in polygon.points], dtype=np.int32)
         
         # Créer un masque pour le polygone
-        mask = np.zeros(self.original_image.shape[:2], dtype=np.uint8)
+        width, height = self.image_size
+        mask = np.zeros((height, width), dtype=np.uint8)
         cv2.fillPoly(mask, [polygon_points], 255)
         
         # Créer un masque pour la détection
-        detection_mask = np.zeros(self.original_image.shape[:2], dtype=np.uint8)
+        detection_mask = np.zeros((height, width), dtype=np.uint8)
         detection_points = np.array(detection.points, dtype=np.int32)
         cv2.fillPoly(detection_mask, [detection_points], 255)
         
@@ -491,89 +983,474 @@ class MainWindow(QMainWindow):
         # Si l'intersection n'est pas vide, les polygones se chevauchent
         return np.any(intersection)
     
-    def load_images(self):
-        """Charge les images du dossier data/to_annotate."""
-        images_dir = "data/to_annotate"
+    def load_images(self, images_dir="data/to_annotate"):
+        """Charge les images du dossier (récursivement) et reprend à la première image non terminée."""
+        if self.image_source is not None:
+            images_dir = self.image_source.root
         if os.path.exists(images_dir):
-            self.image_files = [
-                os.path.join(images_dir, f) for f in os.listdir(images_dir)
-                if f.lower().endswith(('.png', '.jpg', '.jpeg'))
-            ]
+            self.annotation_manager.images_root = os.path.abspath(images_dir)
+            self.dataset_scanner = DatasetScanner(
+                images_dir, self.annotation_manager.get_annotation_path
+            )
+            if self.image_source is not None:
+                # Annotations des autres postes d'abord, pour que les statuts soient à jour
+                synced = self.image_source.sync_labels(self.annotation_manager.annotations_dir)
+                logger.info("%d fichiers d'annotations récupérés depuis le bucket", synced)
+                self.image_files = self.dataset_scanner.scan_listing(self.image_source.list_images())
+            else:
+                self.image_files = self.dataset_scanner.scan()
+            self.scheduler.set_queue(self.image_files)
+            self.visited_images = set()
+            if self.work_queue is not None:
+                added = self.work_queue.sync(self.image_files)
+                logger.info("File partagée %s : %d nouvelles images", self.work_queue.db_path, added)
+                self.heartbeat_timer.start()
+            self.start_duplicate_index()
+            self.start_thumbnail_cache()
             if self.image_files:
-                self.current_image_index = 0
+                self.current_image_index = self.dataset_scanner.first_unfinished_index()
                 self.show_current_image()
             else:
                 QMessageBox.warning(
                     self, "Attention",
-                    "Aucune image trouvée dans le dossier data/to_annotate"
+                    f"Aucune image trouvée dans le dossier {images_dir}"
                 )
         else:
             QMessageBox.warning(
                 self, "Erreur",
-                "Le dossier data/to_annotate n'existe pas"
+                f"Le dossier {images_dir} n'existe pas"
+            )
+    
+    def read_held_images(self, usage, build, image_paths):
+        """Exécute build(image_paths) (thread d'arrière-plan) sans que le cache S3 n'évince les images lues.
+
+        Avec un bucket, seules les images déjà présentes dans le cache local sont traitées.
+        """
+        if self.image_source is None:
+            return build(image_paths)
+        self.image_source.hold(usage, image_paths)
+        try:
+            return build(image_paths)
+        finally:
+            self.image_source.hold(usage, [])
+    
+    def start_duplicate_index(self):
+        """Met à jour en arrière-plan l'index des quasi-doublons (images à annoter et annotées)."""
+        self.duplicate_index_ready = False
+        image_paths = list(self.image_files)
+        annotated_dir = os.path.abspath("data/annotations/images")
+        if os.path.isdir(annotated_dir):
+            with os.scandir(annotated_dir) as entries:
+                image_paths.extend(
+                    entry.path for entry in entries
+                    if entry.name.lower().endswith(IMAGE_EXTENSIONS)
+                )
+        self.background.submit(
+            self.read_held_images, "duplicates", self.phash_index.build, image_paths,
+            callback=self.on_duplicate_index_ready
+        )
+    
+    def on_duplicate_index_ready(self, computed):
+        """Appelé dans le thread de l'interface une fois l'index des quasi-doublons à jour."""
+        logger.info("Index des quasi-doublons prêt (%d hashs calculés)", computed)
+        self.duplicate_index_ready = True
+        self.flag_duplicates()
+    
+    def flag_duplicates(self):
+        """Signale dans la barre d'état les quasi-doublons de l'image courante."""
+        if not self.duplicate_index_ready or not self.current_image_path:
+            return
+        duplicates = self.phash_index.duplicates_of(self.current_image_path)
+        if duplicates:
+            path, distance = duplicates[0]
+            others = f" et {len(duplicates) - 1} autre(s)" if len(duplicates) > 1 else ""
+            self.statusBar().showMessage(
+                f"Quasi-doublon de {os.path.basename(path)} (distance {distance}){others}"
+            )
+        else:
+            self.statusBar().clearMessage()
+    
+    def is_redundant_image(self, image_path):
+        """Vrai si l'image est un quasi-doublon d'une image déjà vue ou annotée."""
+        annotated_dir = os.path.abspath("data/annotations/images")
+        for path, _ in self.phash_index.duplicates_of(image_path):
+            if path in self.visited_images or path.startswith(annotated_dir + os.sep):
+                return True
+            if self.dataset_scanner is not None and self.dataset_scanner.get_status(path) == STATUS_DONE:
+                return True
+        return False
+    
+    def skip_redundant_images(self):
+        """Avance au-delà des quasi-doublons d'images déjà vues ou annotées."""
+        if not (self.skip_duplicates_checkbox.isChecked() and self.duplicate_index_ready):
+            return
+        while (self.current_image_index < len(self.image_files) - 1
+               and self.is_redundant_image(self.image_files[self.current_image_index])):
+            logger.info("Quasi-doublon ignoré : %s", self.image_files[self.current_image_index])
+            self.current_image_index += 1
+    
+    def skip_reviewed_images(self):
+        """En mode relecture, avance au-delà des images dont toutes les propositions ont été relues."""
+        if not self.review_checkbox.isChecked():
+            return
+        while (self.current_image_index < len(self.image_files) - 1
+               and self.review_store.is_reviewed(self.image_files[self.current_image_index])):
+            logger.info("Image déjà relue ignorée : %s", self.image_files[self.current_image_index])
+            self.current_image_index += 1
+    
+    def group_duplicates(self):
+        """Regroupe les quasi-doublons restants pour qu'ils se suivent dans la file."""
+        if not self.duplicate_index_ready:
+            QMessageBox.information(
+                self, "Patientez",
+                "L'index des quasi-doublons est en cours de construction"
+            )
+            return
+        head = self.image_files[:self.current_image_index + 1]
+        groups = self.phash_index.groups(self.image_files[self.current_image_index + 1:])
+        self.image_files = head + [path for group in groups for path in group]
+        self.filmstrip.show_images(self.image_files, self.current_image_index)
+        grouped = sum(len(group) for group in groups if len(group) > 1)
+        self.statusBar().showMessage(f"{grouped} images regroupées en quasi-doublons", 5000)
+    
+    def start_thumbnail_cache(self):
+        """Calcule en arrière-plan les vignettes manquantes, en commençant par la reprise."""
+        start = self.dataset_scanner.first_unfinished_index() if self.dataset_scanner else 0
+        image_paths = self.image_files[start:] + self.image_files[:start]
+        self.thumbnail_timer.start()
+        self.background.submit(
+            self.read_held_images, "thumbnails", self.thumbnail_cache.build, image_paths,
+            callback=self.on_thumbnails_ready, error_callback=self.on_thumbnails_failed
+        )
+    
+    def on_thumbnails_ready(self, computed):
+        """Appelé dans le thread de l'interface une fois toutes les vignettes calculées."""
+        logger.info("Vignettes à jour (%d calculées)", computed)
+        self.thumbnail_timer.stop()
+        self.filmstrip.viewport().update()
+    
+    def on_thumbnails_failed(self, error):
+        logger.error("Erreur lors du calcul des vignettes", exc_info=error)
+        self.thumbnail_timer.stop()
+    
+    def jump_to_image(self, index):
+        """Affiche directement l'image d'index donné (depuis le bandeau de vignettes)."""
+        if index == self.current_image_index or not 0 <= index < len(self.image_files):
+            return
+        # Sauvegarder les annotations actuelles si nécessaire, sans valider l'image
+        if self.annotations_to_save():
+            self.annotation_manager.save_annotations(
+                self.current_image_path,
+                self.annotations_to_save(),
+                self.labels
+            )
+            self.set_image_status(self.current_image_path, STATUS_IN_PROGRESS)
+        self.current_image_index = index
+        self.current_annotations = []
+        self.current_polygon = None
+        self.selected_point = None
+        self.show_current_image()
+    
+    def start_edge_map(self):
+        """Calcule en arrière-plan la carte des contours de l'image courante si l'aimantation est active."""
+        if self.snap_checkbox.isChecked() and self.current_image_path is not None:
+            self.background.submit(self.edge_maps.get_or_compute, self.current_image_path)
+    
+    def snap_to_edges(self, x, y):
+        """Ramène (x, y) sur le contour le plus proche si l'aimantation est active et la carte prête."""
+        if not self.snap_checkbox.isChecked():
+            return x, y
+        edge_map = self.edge_maps.get(self.current_image_path)
+        if edge_map is None:
+            return x, y
+        # Rayon constant à l'écran, quel que soit le zoom
+        radius = SNAP_RADIUS / max(self.image_viewer.transform().m11(), 1e-6)
+        snapped = edge_map.snap(x, y, radius)
+        return snapped if snapped is not None else (x, y)
+    
+    def find_propagation_source(self):
+        """Choisit l'image voisine déjà annotée la plus proche de l'image courante."""
+        index = self.current_image_index
+        candidates = []
+        if index > 0:
+            candidates.append(self.image_files[index - 1])
+        candidates.append(self.last_finished_image)
+        if index < len(self.image_files) - 1:
+            candidates.append(self.image_files[index + 1])
+        for path in candidates:
+            if (path and path != self.current_image_path and os.path.exists(path)
+                    and os.path.exists(self.annotation_manager.get_annotation_path(path))):
+                return path
+        return None
+    
+    def start_propagation(self):
+        """Prépare en arrière-plan les propositions de l'image courante et les points de la suivante."""
+        target_path = self.current_image_path
+        source_path = self.find_propagation_source()
+        self.proposals.pop(target_path, None)
+        if source_path is not None:
+            self.background.submit(
+                self.compute_proposals, source_path, target_path, self.image_size,
+                callback=lambda proposals: self.on_proposals_ready(target_path, proposals)
             )
+        # Extraire dès maintenant les points d'intérêt de l'image suivante
+        if self.current_image_index < len(self.image_files) - 1:
+            self.background.submit(self.propagator.features, self.image_files[self.current_image_index + 1])
+    
+    def compute_proposals(self, source_path, target_path, target_size):
+        """Projette les annotations de l'image source dans l'image cible (hors du thread de l'interface)."""
+        annotations = self.annotation_manager.load_annotations(source_path)
+        return self.propagator.propagate(source_path, target_path, annotations, target_size)
+    
+    def on_proposals_ready(self, image_path, proposals):
+        """Conserve les propositions calculées et les signale si l'image est toujours affichée."""
+        self.proposals[image_path] = proposals
+        if image_path == self.current_image_path and proposals:
+            self.statusBar().showMessage(f"{len(proposals)} polygones propagés disponibles (r)", 5000)
+    
+    def apply_proposals(self):
+        """Ajoute à l'image courante les polygones propagés depuis l'image voisine."""
+        if self.original_image is None:
+            return
+        proposals = self.proposals.get(self.current_image_path)
+        if proposals is None:
+            self.statusBar().showMessage("Propagation en cours ou aucune image voisine annotée", 3000)
+            return
+        if not proposals:
+            self.statusBar().showMessage("Aucune correspondance fiable avec l'image voisine", 3000)
+            return
+        
+        # Remplacer les propositions précédentes
+        self.current_annotations = [
+            polygon for polygon in self.current_annotations
+            if not polygon.name.startswith("prop_")
+        ]
+        for i, (class_type, points) in enumerate(proposals):
+            polygon = Polygon(f"prop_{class_type}_{i + 1}", class_type)
+            for x, y in points:
+                polygon.add_point(x, y)
+            self.current_annotations.append(polygon)
+        logger.info("%d polygones propagés ajoutés", len(proposals))
+        self.update_image_display()
+    
+    def record_predictions(self, image_path, predictions):
+        """Met à jour le score d'incertitude de l'image avec la dernière prédiction."""
+        if predictions is not None and image_path:
+            self.scheduler.update(image_path, predictions)
+    
+    def promote_scheduled_image(self):
+        """Place à l'index courant l'image restante la plus incertaine (si elle a un score)."""
+        if not self.prioritize_checkbox.isChecked():
+            return
+        
+        def accept(image_path):
+            if image_path in self.visited_images:
+                return False
+            return (self.dataset_scanner is None
+                    or self.dataset_scanner.get_status(image_path) != STATUS_DONE)
+        
+        image_path = self.scheduler.next_image(accept)
+        if image_path is None:
+            return
+        index = self.image_files.index(image_path)
+        if index > self.current_image_index:
+            self.image_files.insert(self.current_image_index, self.image_files.pop(index))
+    
+    def set_image_status(self, image_path, status):
+        """Enregistre le statut d'annotation d'une image dans le manifeste."""
+        if self.dataset_scanner is not None and image_path:
+            self.dataset_scanner.set_status(image_path, status)
+            self.filmstrip.viewport().update()
+    
+    def get_image_status(self, image_path):
+        """Statut d'annotation d'une image (pastille du bandeau de vignettes)."""
+        if self.dataset_scanner is None:
+            return STATUS_UNTOUCHED
+        return self.dataset_scanner.get_status(image_path)
     
     def show_current_image(self):
         """Affiche l'image courante avec les annotations."""
         if 0 <= self.current_image_index < len(self.image_files):
-            print(f"Affichage de l'image {self.current_image_index + 1}/{len(self.image_files)}")
-            self.current_image_path = self.image_files[self.current_image_index]
-            print(f"Chemin de l'image : {self.current_image_path}")
-            
-            self.original_image = self.image_processor.load_image(self.current_image_path)
-            if self.original_image is None:
-                print(f"Erreur : Impossible de charger l'image {self.current_image_path}")
+            if not self.claim_current_image():
                 return
-                
-            print(f"Image chargée avec succès : {self.original_image.shape}")
-            
-            # Charger les annotations existantes
-            self.current_annotations = []
-            annotations = self.annotation_manager.load_annotations(self.current_image_path)
-            for class_type, points in annotations:
-                polygon = Polygon(f"{class_type}_{len(self.current_annotations) + 1}", class_type)
-                for x, y in points:
-                    polygon.add_point(x, y)
-                self.current_annotations.append(polygon)
-            
-            # Exécuter la détection si l'assistance IA est activée
-            if self.ai_assist_button.isChecked():
-                print("Détection IA en cours...")
-                detections, labels = self.image_processor.run_detection(self.current_image_path)
-                if detections is not None and labels is not None:
-                    print(f"Détection réussie : {len(detections.xyxy)} objets trouvés")
-                    # Créer des polygones à partir des détections
-                    for i, (box, confidence) in enumerate(zip(detections.xyxy, detections.confidence)):
-                        # Par défaut, toutes les détections sont des prises
-                        polygon = Polygon(f"ia_hold_{i+1}", "hold")
-                        # Convertir la boîte englobante en points de polygone
-                        x1, y1, x2, y2 = box
-                        # Créer un rectangle avec les 4 coins
-                        polygon.add_point(x1, y1)  # Haut gauche
-                        polygon.add_point(x2, y1)  # Haut droite
-                        polygon.add_point(x2, y2)  # Bas droite
-                        polygon.add_point(x1, y2)  # Bas gauche
-                        self.current_annotations.append(polygon)
-                        print(f"Polygone IA créé : {polygon.name} (hold) avec {len(polygon.points)} points")
-                else:
-                    print("Aucune détection trouvée")
-            
-            self.update_image_display()
-            print("Image affichée avec succès")
+            self.current_image_path = self.image_files[self.current_image_index]
+            self.visited_images.add(self.current_image_path)
+            if self.image_source is not None:
+                self.fetch_current_image()
+            else:
+                self.display_current_image()
         else:
-            print(f"Index d'image invalide : {self.current_image_index} (total: {len(self.image_files)})")
+            logger.warning("Index d'image invalide : %d (total: %d)",
+                           self.current_image_index, len(self.image_files))
+    
+    def fetch_current_image(self):
+        """Télécharge l'image courante en arrière-plan ; l'affichage se termine à son arrivée."""
+        image_path = self.current_image_path
+        self.fetch_generation += 1
+        generation = self.fetch_generation
+        # Pas d'édition tant que l'image n'est pas là : rien ne doit être sauvegardé sous son nom
+        self.original_image = None
+        self.current_annotations = []
+        self.cancel_detection()
+        self.statusBar().showMessage(f"Téléchargement de {os.path.basename(image_path)}...")
+        self.background.submit(
+            self.image_source.fetch, image_path, pin=True,
+            callback=lambda _: self.on_image_fetched(generation, image_path),
+            error_callback=lambda error: self.on_image_fetch_failed(generation, image_path, error)
+        )
+        next_index = self.current_image_index + 1
+        neighbours = self.image_files[next_index:next_index + PREFETCH_COUNT]
+        self.image_source.prefetch(neighbours)
+        # Images voisines lues en arrière-plan (décodage d'avance, propagation) : pas d'éviction
+        previous = self.image_files[max(self.current_image_index - 1, 0):self.current_image_index]
+        self.image_source.hold("neighbours", previous + neighbours)
+    
+    def on_image_fetched(self, generation, image_path):
+        """Termine l'affichage si l'image téléchargée est toujours l'image courante."""
+        if generation != self.fetch_generation or image_path != self.current_image_path:
+            logger.debug("Téléchargement périmé ignoré : %s", image_path)
+            return
+        self.statusBar().clearMessage()
+        self.display_current_image()
+    
+    def on_image_fetch_failed(self, generation, image_path, error):
+        logger.error("Impossible de télécharger l'image %s : %s", image_path, error)
+        if generation == self.fetch_generation:
+            self.statusBar().showMessage(f"Impossible de télécharger l'image : {error}", 5000)
+    
+    def display_current_image(self):
+        """Charge et affiche l'image courante (présente localement) avec ses annotations."""
+        logger.info("Affichage de l'image %d/%d : %s", self.current_image_index + 1,
+                    len(self.image_files), self.current_image_path)
+        
+        if self.decode_pool is not None and self.decode_pool.is_ready(self.current_image_path):
+            # Déjà décodée à l'avance : directement en pleine résolution
+            reduced = None
+        else:
+            reduced = self.image_processor.load_image_reduced(self.current_image_path)
+        if reduced is not None:
+            # Premier affichage à résolution réduite, la pleine résolution suit en arrière-plan
+            image, self.display_scale, self.image_size = reduced
+            self.load_full_image()
+        else:
+            image = self.image_processor.load_image(self.current_image_path)
+            if image is None:
+                logger.error("Impossible de charger l'image %s", self.current_image_path)
+                return
+            self.display_scale = 1.0
+            self.image_size = (image.shape[1], image.shape[0])
+        # Conversion unique au format d'affichage (BGR 8 bits, 3 canaux)
+        self.original_image = self.image_processor.to_bgr(image)
+        
+        # Charger les annotations existantes
+        self.current_annotations = []
+        annotations = self.annotation_manager.load_annotations(self.current_image_path)
+        for class_type, points in annotations:
+            polygon = Polygon(f"{class_type}_{len(self.current_annotations) + 1}", class_type)
+            for x, y in points:
+                polygon.add_point(x, y)
+            self.current_annotations.append(polygon)
+        
+        # Exécuter la détection si l'assistance IA est activée
+        self.cancel_detection()
+        if self.ai_assist_button.isChecked():
+            predictions = self.prediction_cache.get(self.current_image_path)
+            if predictions is not None:
+                self.apply_predictions(predictions, render=False)
+            else:
+                # Les polygones IA s'ajouteront à l'arrivée du résultat
+                self.request_detection()
+        
+        self.update_image_display()
+        self.flag_duplicates()
+        self.start_propagation()
+        self.start_edge_map()
+        self.region_selection = None
+        self.background.submit(self.superpixels.get_or_compute, self.current_image_path)
+        self.filmstrip.show_images(self.image_files, self.current_image_index)
+        if self.decode_pool is not None:
+            next_index = self.current_image_index + 1
+            self.decode_pool.prefetch(self.image_files[next_index:next_index + DECODE_PREFETCH_COUNT])
+    
+    def claim_current_image(self):
+        """Prend le bail de l'image courante, ou avance jusqu'à la prochaine image libre (file partagée)."""
+        if self.work_queue is None:
+            return True
+        count = len(self.image_files)
+        for offset in range(count):
+            index = (self.current_image_index + offset) % count
+            image_path = self.image_files[index]
+            available = self.image_source is not None or os.path.exists(image_path)
+            try:
+                leased = available and self.work_queue.lease(image_path)
+            except sqlite3.Error as e:
+                logger.error("File partagée indisponible : %s", e)
+                self.statusBar().showMessage(f"File partagée indisponible ({e}) : réessayez", 5000)
+                return False
+            if leased:
+                if offset:
+                    self.statusBar().showMessage(
+                        f"{offset} image(s) prise(s) par d'autres annotateurs ignorée(s)", 5000
+                    )
+                if self.leased_image is not None and self.leased_image != image_path:
+                    try:
+                        self.work_queue.release(self.leased_image)
+                    except sqlite3.Error as e:
+                        # Le bail de l'ancienne image expirera de lui-même
+                        logger.warning("Impossible de rendre %s à la file partagée : %s", self.leased_image, e)
+                self.leased_image = image_path
+                self.current_image_index = index
+                return True
+        QMessageBox.information(
+            self, "File partagée",
+            "Toutes les images restantes sont en cours chez d'autres annotateurs"
+        )
+        return False
+    
+    def send_heartbeat(self):
+        """Prolonge en arrière-plan le bail de l'image affichée."""
+        if self.work_queue is not None and self.leased_image is not None:
+            self.background.submit(self.work_queue.heartbeat, callback=self.on_heartbeat)
+    
+    def on_heartbeat(self, held):
+        if not held and self.leased_image is not None:
+            logger.warning("Bail perdu sur %s", self.leased_image)
+            self.statusBar().showMessage("Bail expiré : l'image a pu être reprise par un autre annotateur", 5000)
+    
+    def load_full_image(self):
+        """Décode l'image courante en pleine résolution hors du thread de l'interface."""
+        image_path = self.current_image_path
+        
+        def decode():
+            image = self.image_processor.load_image(image_path)
+            return None if image is None else self.image_processor.to_bgr(image)
+        
+        self.background.submit(decode, callback=lambda image: self.on_full_image_ready(image_path, image))
+    
+    def on_full_image_ready(self, image_path, image):
+        """Remplace l'image réduite par la pleine résolution si l'image est toujours affichée."""
+        if image is None or image_path != self.current_image_path or self.display_scale == 1.0:
+            return
+        self.original_image = image
+        self.display_scale = 1.0
+        self.update_image_display()
     
     def show_next_image(self):
         """Affiche l'image suivante."""
         if self.current_image_index < len(self.image_files) - 1:
             # Sauvegarder les annotations actuelles si nécessaire
-            if self.current_annotations:
+            if self.annotations_to_save():
                 self.annotation_manager.save_annotations(
                     self.current_image_path,
-                    self.current_annotations,
+                    self.annotations_to_save(),
                     self.labels
                 )
+                # Image validée : la reprise se fera après elle
+                self.set_image_status(self.current_image_path, STATUS_DONE)
             self.current_image_index += 1
+            self.promote_scheduled_image()
+            self.skip_redundant_images()
+            self.skip_reviewed_images()
             self.current_annotations = []  # Réinitialiser les annotations
             self.current_polygon = None
             self.selected_point = None
@@ -583,7 +1460,7 @@ class MainWindow(QMainWindow):
         """Affiche l'image précédente."""
         if self.current_image_index > 0:
             # Sauvegarder les annotations actuelles si nécessaire
-            if self.current_annotations:
+            if self.annotations_to_save():
                 self.save_annotations()
             self.current_image_index -= 1
             self.current_annotations = []  # Réinitialiser les annotations
@@ -593,12 +1470,14 @@ class MainWindow(QMainWindow):
     
     def save_annotations(self):
         """Sauvegarde les annotations actuelles."""
-        if self.current_image_path:
+        # Image encore en téléchargement : ne pas écraser ses annotations par une liste vide
+        if self.current_image_path and self.original_image is not None:
             self.annotation_manager.save_annotations(
                 self.current_image_path,
-                self.current_annotations,
+                self.annotations_to_save(),
                 self.labels
             )
+            self.set_image_status(self.current_image_path, STATUS_IN_PROGRESS)
             QMessageBox.information(
                 self, "Succès",
                 "Les annotations ont été sauvegardées"
@@ -606,95 +1485,44 @@ class MainWindow(QMainWindow):
     
     def toggle_ai_assist(self):
         """Active ou désactive l'assistance IA."""
-        print("\n=== Début de toggle_ai_assist ===")
         if self.ai_assist_button.isChecked():
-            try:
-                print("Activation de l'assistance IA...")
-                self.image_processor.enable_ai_assist()
-                print("ImageProcessor.enable_ai_assist() appelé avec succès")
-                
-                print(f"Exécution de la détection sur l'image : {self.current_image_path}")
-                detections, labels = self.image_processor.run_detection(self.current_image_path)
-                print(f"Type de retour de run_detection : {type(detections)}")
-                
-                if detections is not None and labels is not None:
-                    print(f"Détection réussie : {len(detections.xyxy)} objets trouvés")
-                    
-                    # Supprimer les polygones existants créés par l'IA
-                    print("Suppression des polygones IA existants...")
-                    self.current_annotations = [
-                        polygon for polygon in self.current_annotations
-                        if not polygon.name.startswith("ia_")
-                    ]
-                    print(f"Nombre de polygones après suppression : {len(self.current_annotations)}")
-                    
-                    # Créer des polygones à partir des détections
-                    print("Création des nouveaux polygones IA...")
-                    for i, (box, confidence) in enumerate(zip(detections.xyxy, detections.confidence)):
-                        print(f"\nTraitement de la détection {i+1}/{len(detections.xyxy)}")
-                        print(f"Boîte englobante : {box}")
-                        print(f"Confiance : {confidence}")
-                        
-                        # Créer un polygone à partir de la boîte englobante
-                        polygon = Polygon(f"ia_hold_{i+1}", "hold")
-                        print(f"Polygone créé : {polygon.name}")
-                        
-                        # Extraire les coordonnées de la boîte englobante
-                        x1, y1, x2, y2 = box
-                        center_x = (x1 + x2) / 2
-                        center_y = (y1 + y2) / 2
-                        width = x2 - x1
-                        height = y2 - y1
-                        
-                        # Ajouter 8 points pour créer un octogone
-                        # Points sur les côtés
-                        polygon.add_point(x1, center_y - height/4)  # Gauche haut
-                        polygon.add_point(center_x - width/4, y1)   # Haut gauche
-                        polygon.add_point(center_x + width/4, y1)   # Haut droite
-                        polygon.add_point(x2, center_y - height/4)  # Droite haut
-                        polygon.add_point(x2, center_y + height/4)  # Droite bas
-                        polygon.add_point(center_x + width/4, y2)   # Bas droite
-                        polygon.add_point(center_x - width/4, y2)   # Bas gauche
-                        polygon.add_point(x1, center_y + height/4)  # Gauche bas
-                        
-                        self.current_annotations.append(polygon)
-                        print(f"Polygone IA ajouté aux annotations : {polygon.name} avec {len(polygon.points)} points")
-                    
-                    print(f"\nNombre total de polygones après ajout : {len(self.current_annotations)}")
-                    self.update_image_display()
-                    print("Affichage mis à jour")
-                    
-                    QMessageBox.information(
-                        self, "Détection terminée",
-                        f"{len(detections.xyxy)} objets détectés"
-                    )
-                else:
-                    print("Aucune détection trouvée")
-            except Exception as e:
-                print(f"ERREUR lors de l'activation de l'assistance IA : {str(e)}")
-                print(f"Type de l'erreur : {type(e)}")
-                import traceback
-                print(f"Traceback complet :\n{traceback.format_exc()}")
-                QMessageBox.critical(
-                    self, "Erreur",
-                    f"Erreur lors de l'activation de l'assistance IA : {str(e)}"
-                )
-                self.ai_assist_button.setChecked(False)
+            # Le modèle est normalement déjà préchargé ; sinon il s'initialise hors du thread de l'interface
+            self.detection_tasks.submit(
+                self.image_processor.enable_ai_assist,
+                callback=lambda _: self.on_ai_assist_enabled(),
+                error_callback=self.on_ai_assist_failed
+            )
         else:
-            print("Désactivation de l'assistance IA...")
+            logger.info("Désactivation de l'assistance IA")
+            self.cancel_detection()
             self.image_processor.disable_ai_assist()
             # Supprimer les polygones créés par l'IA
             self.current_annotations = [
                 polygon for polygon in self.current_annotations
                 if not polygon.name.startswith("ia_")
             ]
-            print(f"Nombre de polygones après désactivation : {len(self.current_annotations)}")
             self.update_image_display()
-        print("=== Fin de toggle_ai_assist ===\n")
+    
+    def on_ai_assist_enabled(self):
+        """Lance la détection de l'image courante une fois l'assistance IA prête."""
+        if not self.ai_assist_button.isChecked():
+            # Désactivée entre-temps
+            self.image_processor.disable_ai_assist()
+        elif self.current_image_path:
+            # Comme avant le passage en arrière-plan : octogones à l'activation de l'assistance
+            self.request_detection(notify=True, octagon=True)
+    
+    def on_ai_assist_failed(self, error):
+        logger.error("Erreur lors de l'activation de l'assistance IA", exc_info=error)
+        QMessageBox.critical(
+            self, "Erreur",
+            f"Erreur lors de l'activation de l'assistance IA : {str(error)}"
+        )
+        self.ai_assist_button.setChecked(False)
     
     def select_polygon(self, polygon):
         """Sélectionne un polygone."""
-        print(f"Sélection du polygone {polygon.name}")
+        logger.debug("Sélection du polygone %s (%d points)", polygon.name, len(polygon.points))
         
         # Désélectionner tous les autres polygones
         for p in self.current_annotations:
@@ -709,9 +1537,6 @@ class MainWindow(QMainWindow):
         self.current_polygon = polygon
         self.delete_polygon_button.setEnabled(True)
         self.duplicate_polygon_button.setEnabled(True)
-        
-        print(f"Polygone sélectionné : {polygon.name}")
-        print(f"Nombre de points : {len(polygon.points)}")
         self.update_image_display()
     
     def select_point(self, polygon, point_index):
@@ -730,14 +1555,9 @@ class MainWindow(QMainWindow):
     
     def add_midpoints_to_polygon(self):
         """Ajoute des points au milieu de chaque ligne du polygone sélectionné."""
-        print("Appel de la méthode add_midpoints_to_polygon")
         if self.selected_polygon is None:
-            print("Aucun polygone sélectionné")
             return
         
-        print(f"Tentative d'ajout de points au milieu des lignes du polygone {self.selected_polygon.name}")
-        print(f"Nombre de points actuels : {len(self.selected_polygon.points)}")
-        
         # Créer une liste pour stocker les nouveaux points avec leurs indices d'insertion
         new_points = []
         
@@ -750,45 +1570,60 @@ class MainWindow(QMainWindow):
             # Calculer le point milieu
             mid_x = (current_point.x + next_point.x) / 2
             mid_y = (current_point.y + next_point.y) / 2
-            
-            print(f"Point milieu {i} calculé entre ({current_point.x}, {current_point.y}) et ({next_point.x}, {next_point.y}) : ({mid_x}, {mid_y})")
             new_points.append((i + 1, Point(mid_x, mid_y)))
         
-        print(f"Nombre de points milieux calculés : {len(new_points)}")
-        
         # Insérer les nouveaux points après chaque point existant
         # On parcourt la liste en sens inverse pour ne pas perturber les indices
         for insert_index, point in reversed(new_points):
-            print(f"Insertion du point milieu à l'index {insert_index}")
             self.selected_polygon.points.insert(insert_index, point)
         
-        print(f"Nombre de points après ajout : {len(self.selected_polygon.points)}")
+        logger.debug("Polygone %s : %d points après ajout des milieux",
+                     self.selected_polygon.name, len(self.selected_polygon.points))
         
         # Mettre à jour l'affichage
         self.update_image_display()
     
     def finish_annotation(self):
         """Termine l'annotation de l'image courante en la déplaçant vers le dossier des images annotées."""
-        if not self.current_image_path:
+        if not self.current_image_path or self.original_image is None:
             return
             
         # Sauvegarder les annotations actuelles
         self.save_annotations()
         
         # Déplacer l'image
-        image_name = os.path.basename(self.current_image_path)
+        # Même nom à plat que le fichier d'annotations : pas d'écrasement entre homonymes de dossiers différents
+        extension = os.path.splitext(self.current_image_path)[1]
+        image_name = self.annotation_manager.get_sample_name(self.current_image_path) + extension
         new_image_path = os.path.join("data/annotations/images", image_name)
         
         try:
-            os.rename(self.current_image_path, new_image_path)
-            print(f"Image déplacée avec succès : {new_image_path}")
+            if self.work_queue is not None:
+                # Validation atomique : un seul annotateur peut terminer l'image
+                if not self.work_queue.complete(self.current_image_path, new_image_path):
+                    QMessageBox.warning(
+                        self, "File partagée",
+                        "Cette image a déjà été terminée ou reprise par un autre annotateur"
+                    )
+                    return
+                self.leased_image = None
+            else:
+                move_file(self.current_image_path, new_image_path)
+            logger.info("Image déplacée avec succès : %s", new_image_path)
+            if self.image_source is not None:
+                # L'image a quitté le miroir local : elle ne compte plus dans le cache
+                self.image_source.forget(self.current_image_path)
+            
+            self.set_image_status(self.current_image_path, STATUS_DONE)
+            self.scheduler.discard(self.current_image_path)
+            self.last_finished_image = os.path.abspath(new_image_path)
             
             # Mettre à jour la liste des images
             self.image_files.remove(self.current_image_path)
             
-            # Passer à l'image suivante
+            # Passer à l'image suivante, qui occupe désormais le même index
             if self.image_files:
-                self.current_image_index = 0
+                self.current_image_index = min(self.current_image_index, len(self.image_files) - 1)
                 self.show_current_image()
             else:
                 QMessageBox.information(
@@ -796,6 +1631,10 @@ class MainWindow(QMainWindow):
                     "Toutes les images ont été annotées !"
                 )
                 self.close()
+        except sqlite3.Error as e:
+            # Base partagée verrouillée trop longtemps par un autre poste : l'image reste en attente
+            logger.error("File partagée indisponible : %s", e)
+            self.statusBar().showMessage(f"File partagée indisponible ({e}) : image non terminée, réessayez", 5000)
         except Exception as e:
             QMessageBox.critical(
                 self, "Erreur",
@@ -807,7 +1646,7 @@ class MainWindow(QMainWindow):
         if self.selected_polygon:
             old_type = self.selected_polygon.class_type
             self.selected_polygon.class_type = new_type
-            print(f"Type du polygone {self.selected_polygon.name} changé de {old_type} à {new_type}")
+            logger.debug("Type du polygone %s changé de %s à %s", self.selected_polygon.name, old_type, new_type)
             self.update_image_display()
     
     def duplicate_selected_polygon(self):
@@ -829,8 +1668,22 @@ class MainWindow(QMainWindow):
             
         # Ajouter le nouveau polygone aux annotations
         self.current_annotations.append(new_polygon)
-        print(f"Polygone dupliqué : {new_name} avec {len(new_polygon.points)} points")
+        logger.debug("Polygone dupliqué : %s avec %d points", new_name, len(new_polygon.points))
         
         # Sélectionner le nouveau polygone
         self.select_polygon(new_polygon)
-        self.update_image_display() 
\ No newline at end of file
+        self.update_image_display()
+    
+    def closeEvent(self, event):
+        """Rend à la file partagée l'image en cours et termine les envois vers le bucket avant de fermer."""
+        if self.work_queue is not None:
+            try:
+                self.work_queue.release_all()
+            except Exception as e:
+                logger.warning("Impossible de libérer les images de la file partagée : %s", e)
+        if self.image_source is not None:
+            self.image_source.shutdown()
+        if self.decode_pool is not None:
+            self.decode_pool.shutdown()
+        self.scheduler.close()
+        super().closeEvent(event)
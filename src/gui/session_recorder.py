@@ -0,0 +1,104 @@
+import json
+import logging
+import os
+import time
+from typing import List, Tuple
+
+from PyQt6.QtCore import QEvent, QObject, QPoint, QPointF, Qt
+from PyQt6.QtGui import QMouseEvent, QWheelEvent
+
+logger = logging.getLogger(__name__)
+
+SESSION_VERSION = 1
+
+MOUSE_EVENTS = {
+    QEvent.Type.MouseButtonPress: "press",
+    QEvent.Type.MouseButtonRelease: "release",
+    QEvent.Type.MouseMove: "move",
+}
+MOUSE_TYPES = {name: event_type for event_type, name in MOUSE_EVENTS.items()}
+
+
+class SessionRecorder(QObject):
+    """Enregistre les interactions reçues par la zone d'image, pour les rejouer hors écran.
+
+    Souris et molette sont capturées sur le viewport de l'ImageViewer, les raccourcis par
+    leur signal, les redimensionnements sur la fenêtre. Chaque événement est écrit sur une
+    ligne JSON avec son instant relatif au début de l'enregistrement ; la première ligne
+    décrit la fenêtre et l'image affichée au départ.
+    """
+
+    def __init__(self, window, path: str):
+        super().__init__(window)
+        self.window = window
+        self.viewport = window.image_viewer.viewport()
+        self.file = open(path, 'w', buffering=1 << 16)
+        self.start = time.perf_counter()
+        self._write({
+            "version": SESSION_VERSION,
+            "window": [window.width(), window.height()],
+            "image": os.path.basename(window.current_image_path or ""),
+            "recorded": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        })
+        self.viewport.installEventFilter(self)
+        window.installEventFilter(self)
+        for key, shortcut in window.shortcuts.items():
+            shortcut.activated.connect(lambda key=key: self._record({"type": "shortcut", "key": key}))
+        logger.info("Enregistrement de la session dans %s", path)
+
+    def _write(self, record: dict):
+        if self.file is not None:
+            self.file.write(json.dumps(record) + "\n")
+
+    def _record(self, record: dict):
+        self._write({"t": round(time.perf_counter() - self.start, 4), **record})
+
+    def eventFilter(self, obj, event):
+        event_type = event.type()
+        if obj is self.viewport and event_type in MOUSE_EVENTS:
+            pos = event.position()
+            self._record({
+                "type": MOUSE_EVENTS[event_type], "x": pos.x(), "y": pos.y(),
+                "button": event.button().value, "buttons": event.buttons().value,
+                "modifiers": event.modifiers().value,
+            })
+        elif obj is self.viewport and event_type == QEvent.Type.Wheel:
+            pos = event.position()
+            self._record({
+                "type": "wheel", "x": pos.x(), "y": pos.y(),
+                "dx": event.angleDelta().x(), "dy": event.angleDelta().y(),
+                "buttons": event.buttons().value, "modifiers": event.modifiers().value,
+            })
+        elif obj is self.window and event_type == QEvent.Type.Resize:
+            self._record({"type": "resize", "w": event.size().width(), "h": event.size().height()})
+        return False
+
+    def close(self):
+        """Termine l'enregistrement et ferme le fichier."""
+        if self.file is None:
+            return
+        self.viewport.removeEventFilter(self)
+        self.window.removeEventFilter(self)
+        self.file.close()
+        self.file = None
+
+
+def load_session(path: str) -> Tuple[dict, List[dict]]:
+    """Lit un enregistrement : (en-tête, événements dans l'ordre)."""
+    with open(path, 'r') as f:
+        lines = [json.loads(line) for line in f if line.strip()]
+    if not lines or lines[0].get("version") != SESSION_VERSION:
+        raise ValueError(f"Enregistrement de session invalide : {path}")
+    return lines[0], lines[1:]
+
+
+def build_event(record: dict):
+    """Recrée l'événement Qt (souris ou molette) d'une ligne d'enregistrement."""
+    pos = QPointF(record["x"], record["y"])
+    buttons = Qt.MouseButton(record["buttons"])
+    modifiers = Qt.KeyboardModifier(record["modifiers"])
+    if record["type"] == "wheel":
+        return QWheelEvent(pos, pos, QPoint(), QPoint(record["dx"], record["dy"]), buttons, modifiers,
+                           Qt.ScrollPhase.NoScrollPhase, False)
+    return QMouseEvent(MOUSE_TYPES[record["type"]], pos, pos, Qt.MouseButton(record["button"]), buttons,
+                       modifiers)
@@ -2,28 +2,34 @@ import sys
 import os
 from PyQt6.QtWidgets import QApplication
 from src.gui.main_window import MainWindow
+from src.gui.session_recorder import SessionRecorder
+from src.utils.logger import setup_logging
+from src.utils.perf import recorder
 from config import TO_ANNOTATE_DIR
 
 def main(args):
+    logger = setup_logging(args.debug)
+    if args.perf_log:
+        recorder.set_export_path(args.perf_log)
+    
     app = QApplication(sys.argv)
+    app.aboutToQuit.connect(recorder.close)
     window = MainWindow()
     
     # Configuration selon les arguments
     if args.test_dir:
         if os.path.exists(args.test_dir):
-            window.image_files = [
-                os.path.join(args.test_dir, f) for f in os.listdir(args.test_dir)
-                if f.lower().endswith(('.png', '.jpg', '.jpeg'))
-            ]
-            if window.image_files:
-                window.current_image_index = 0
-                window.show_current_image()
+            window.load_images(args.test_dir)
         else:
-            print(f"Le répertoire de test {args.test_dir} n'existe pas")
+            logger.error("Le répertoire de test %s n'existe pas", args.test_dir)
     
     if args.no_ai:
         window.ai_assist_button.setChecked(False)
     
+    if args.record_session:
+        session = SessionRecorder(window, args.record_session)
+        app.aboutToQuit.connect(session.close)
+    
     window.show()
     sys.exit(app.exec())
 
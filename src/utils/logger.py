@@ -0,0 +1,17 @@
+import logging
+import sys
+
+LOG_FORMAT = "%(asctime)s %(levelname)-7s %(name)s : %(message)s"
+
+
+def setup_logging(debug: bool = False):
+    """Configure la journalisation de l'application (DEBUG avec --debug, INFO sinon)."""
+    logger = logging.getLogger("src")
+    logger.setLevel(logging.DEBUG if debug else logging.INFO)
+    if not logger.handlers:
+        handler = logging.StreamHandler(sys.stderr)
+        handler.setFormatter(logging.Formatter(LOG_FORMAT, datefmt="%H:%M:%S"))
+        logger.addHandler(handler)
+    # Les messages des modules sont traités ici, pas par le logger racine
+    logger.propagate = False
+    return logger
@@ -0,0 +1,92 @@
+import json
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Dict, Optional
+
+STAGES = ("decode", "inference", "postprocess", "render", "save")
+STAGE_LABELS = {
+    "decode": "décodage",
+    "inference": "inférence",
+    "postprocess": "post-traitement",
+    "render": "rendu",
+    "save": "sauvegarde",
+}
+
+
+class PerfRecorder:
+    """Mesure la durée de chaque étape (décodage, inférence, rendu...) par image et par trame.
+
+    Les dernières mesures alimentent le HUD de la barre d'état ; si un fichier d'export
+    est configuré, chaque mesure y est ajoutée sous forme d'une ligne JSON.
+    """
+
+    def __init__(self, history: int = 500):
+        self._lock = threading.Lock()
+        self._history = {stage: deque(maxlen=history) for stage in STAGES}
+        self._last: Dict[str, float] = {}
+        self._export_file = None
+        self.frame = 0
+
+    def set_export_path(self, path: Optional[str]):
+        """Active (ou désactive avec None) l'export JSONL des mesures."""
+        with self._lock:
+            if self._export_file is not None:
+                self._export_file.close()
+            self._export_file = open(path, 'a', buffering=1 << 16) if path else None
+
+    @contextmanager
+    def stage(self, name: str, image: Optional[str] = None):
+        """Chronomètre le bloc encadré et l'enregistre sous l'étape donnée."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, (time.perf_counter() - start) * 1000.0, image)
+
+    def record(self, name: str, duration_ms: float, image: Optional[str] = None):
+        """Enregistre une durée en millisecondes."""
+        with self._lock:
+            if name == "render":
+                self.frame += 1
+            self._last[name] = duration_ms
+            self._history.setdefault(name, deque(maxlen=500)).append(duration_ms)
+            if self._export_file is not None:
+                self._export_file.write(json.dumps({
+                    "ts": time.time(),
+                    "stage": name,
+                    "ms": round(duration_ms, 3),
+                    "image": image,
+                    "frame": self.frame,
+                }) + "\n")
+
+    def last(self) -> Dict[str, float]:
+        """Retourne la dernière durée mesurée pour chaque étape."""
+        with self._lock:
+            return dict(self._last)
+
+    def percentile(self, name: str, q: float) -> Optional[float]:
+        """Retourne le percentile q (0-100) des dernières mesures d'une étape."""
+        with self._lock:
+            values = sorted(self._history.get(name, ()))
+        if not values:
+            return None
+        index = min(len(values) - 1, int(round(q / 100.0 * (len(values) - 1))))
+        return values[index]
+
+    def summary_text(self) -> str:
+        """Résumé court pour le HUD de la barre d'état."""
+        last = self.last()
+        return " | ".join(
+            f"{STAGE_LABELS[stage]} {last[stage]:.0f} ms"
+            for stage in STAGES if stage in last
+        )
+
+    def close(self):
+        """Vide et ferme le fichier d'export."""
+        self.set_export_path(None)
+
+
+# Instance partagée par toute l'application
+recorder = PerfRecorder()
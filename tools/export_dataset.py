@@ -0,0 +1,31 @@
+import argparse
+import sys
+from src.core.dataset_export import FORMATS, DatasetExporter, find_samples
+from src.utils.logger import setup_logging
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='Exporte les images annotées en COCO, YOLO-seg et masques PNG')
+    parser.add_argument('--output', type=str, default='data/export', help='Dossier de sortie')
+    parser.add_argument('--labels-dir', type=str, default='data/annotations/labels', help='Dossier des annotations')
+    parser.add_argument('--images-dir', type=str, nargs='+', default=['data/annotations/images'],
+                        help='Dossiers des images annotées (le premier l\'emporte en cas de doublon)')
+    parser.add_argument('--formats', nargs='+', choices=FORMATS, default=list(FORMATS), help='Formats à produire')
+    parser.add_argument('--split', type=float, nargs=3, default=[0.8, 0.1, 0.1],
+                        metavar=('TRAIN', 'VAL', 'TEST'), help='Proportions des splits train/val/test')
+    parser.add_argument('--workers', type=int, default=None, help='Nombre de processus de rastérisation')
+    parser.add_argument('--debug', action='store_true', help='Active le mode debug')
+    return parser.parse_args()
+
+if __name__ == '__main__':
+    args = parse_args()
+    logger = setup_logging(args.debug)
+
+    try:
+        samples = find_samples(args.labels_dir, args.images_dir)
+        exporter = DatasetExporter(args.output, formats=args.formats, ratios=args.split, workers=args.workers)
+        stats = exporter.export(samples)
+        logger.info("Export terminé dans %s : %d images, %d réexportées, %d retirées, %d erreurs",
+                    args.output, stats["images"], stats["changed"], stats["removed"], stats["errors"])
+    except Exception as e:
+        print(f"Une erreur est survenue : {str(e)}")
+        sys.exit(1)
@@ -0,0 +1,27 @@
+import argparse
+import sys
+from src.core.inference_service import DEFAULT_PORT, InferenceService, RoboflowDetector, serve
+from src.utils.logger import setup_logging
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='Service d\'inférence local partagé par plusieurs postes d\'annotation')
+    parser.add_argument('--host', type=str, default='127.0.0.1', help='Adresse d\'écoute')
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT, help='Port d\'écoute')
+    parser.add_argument('--max-parallel', type=int, default=8, help='Nombre de prédictions simultanées')
+    parser.add_argument('--cache-size', type=int, default=1024, help='Nombre de résultats gardés en cache')
+    parser.add_argument('--debug', action='store_true', help='Active le mode debug')
+    return parser.parse_args()
+
+if __name__ == '__main__':
+    args = parse_args()
+    setup_logging(args.debug)
+    
+    try:
+        detector = RoboflowDetector()
+        service = InferenceService(detector, max_parallel=args.max_parallel, cache_size=args.cache_size)
+        serve(service, args.host, args.port)
+    except KeyboardInterrupt:
+        pass
+    except Exception as e:
+        print(f"Une erreur est survenue : {str(e)}")
+        sys.exit(1)
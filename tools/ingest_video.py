@@ -0,0 +1,32 @@
+import argparse
+import sys
+from src.core.video_ingest import find_videos, ingest_videos
+from src.utils.logger import setup_logging
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='Extrait des vidéos les trames à annoter (sans quasi-doublons)')
+    parser.add_argument('inputs', nargs='+', help='Fichiers vidéo ou dossiers à parcourir')
+    parser.add_argument('--output', type=str, default='data/to_annotate', help='Dossier de sortie des trames')
+    parser.add_argument('--threshold', type=float, default=0.06,
+                        help='Différence minimale (0-1) avec la dernière trame conservée')
+    parser.add_argument('--sample-fps', type=float, default=5.0, help='Trames analysées par seconde de vidéo')
+    parser.add_argument('--quality', type=int, default=95, help='Qualité JPEG des trames écrites')
+    parser.add_argument('--workers', type=int, default=None, help='Nombre de vidéos décodées en parallèle')
+    parser.add_argument('--debug', action='store_true', help='Active le mode debug')
+    return parser.parse_args()
+
+if __name__ == '__main__':
+    args = parse_args()
+    logger = setup_logging(args.debug)
+    
+    try:
+        videos = find_videos(args.inputs)
+        logger.info("%d vidéos à traiter", len(videos))
+        stats = ingest_videos(videos, args.output, workers=args.workers, threshold=args.threshold,
+                              sample_fps=args.sample_fps, jpeg_quality=args.quality)
+        kept = sum(s["frames_kept"] for s in stats)
+        read = sum(s["frames_read"] for s in stats)
+        logger.info("Terminé : %d trames écrites sur %d analysées", kept, read)
+    except Exception as e:
+        print(f"Une erreur est survenue : {str(e)}")
+        sys.exit(1)
@@ -0,0 +1,40 @@
+import argparse
+import sys
+from src.core.dataset_export import find_samples
+from src.core.qa_render import QARenderer
+from src.core.yolo_labels import CLASS_NAMES
+from src.utils.logger import setup_logging
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='Rend les annotations d\'un dossier en images de contrôle et planches contact')
+    parser.add_argument('--output', type=str, default='data/qa', help='Dossier de sortie')
+    parser.add_argument('--labels-dir', type=str, default='data/annotations/labels', help='Dossier des annotations')
+    parser.add_argument('--images-dir', type=str, nargs='+', default=['data/annotations/images', 'data/to_annotate'],
+                        help='Dossiers des images (le premier l\'emporte en cas de doublon)')
+    parser.add_argument('--classes', nargs='+', choices=CLASS_NAMES, default=None,
+                        help='Ne garder que les images contenant ces classes (les comptes filtrés portent sur elles)')
+    parser.add_argument('--min-polygons', type=int, default=0, help='Nombre minimal de polygones par image')
+    parser.add_argument('--max-polygons', type=int, default=None, help='Nombre maximal de polygones par image')
+    parser.add_argument('--max-side', type=int, default=1600, help='Plus grand côté des images de contrôle')
+    parser.add_argument('--grid', type=int, nargs=2, default=[6, 5], metavar=('COLONNES', 'LIGNES'),
+                        help='Disposition des planches contact')
+    parser.add_argument('--workers', type=int, default=None, help='Nombre de processus de rendu')
+    parser.add_argument('--debug', action='store_true', help='Active le mode debug')
+    return parser.parse_args()
+
+if __name__ == '__main__':
+    args = parse_args()
+    logger = setup_logging(args.debug)
+
+    try:
+        samples = find_samples(args.labels_dir, args.images_dir)
+        selected = QARenderer.select(samples, classes=args.classes, min_polygons=args.min_polygons,
+                                     max_polygons=args.max_polygons)
+        logger.info("%d images annotées, %d retenues par les filtres", len(samples), len(selected))
+        renderer = QARenderer(args.output, max_side=args.max_side, grid=args.grid, workers=args.workers)
+        stats = renderer.render(selected)
+        logger.info("Contrôle terminé dans %s : %d images (%d rendues), %d planches, %d erreurs",
+                    args.output, stats["images"], stats["rendered"], stats["sheets"], stats["errors"])
+    except Exception as e:
+        print(f"Une erreur est survenue : {str(e)}")
+        sys.exit(1)
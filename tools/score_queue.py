@@ -0,0 +1,51 @@
+import argparse
+import os
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from src.core.annotation_manager import AnnotationManager
+from src.core.dataset_scanner import DatasetScanner, STATUS_DONE
+from src.core.image_processor import ImageProcessor
+from src.core.queue_scheduler import DEFAULT_SCORES_PATH, UncertaintyScheduler
+from src.utils.logger import setup_logging
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='Calcule en lot les scores d\'incertitude de la file d\'annotation')
+    parser.add_argument('--images-dir', type=str, default='data/to_annotate', help='Dossier des images à annoter')
+    parser.add_argument('--scores', type=str, default=DEFAULT_SCORES_PATH, help='Fichier des scores')
+    parser.add_argument('--workers', type=int, default=4, help='Nombre de prédictions simultanées')
+    parser.add_argument('--rescore', action='store_true', help='Recalcule aussi les images déjà notées')
+    parser.add_argument('--debug', action='store_true', help='Active le mode debug')
+    return parser.parse_args()
+
+def main(args):
+    logger = setup_logging(args.debug)
+    annotation_manager = AnnotationManager()
+    annotation_manager.images_root = os.path.abspath(args.images_dir)
+    scanner = DatasetScanner(args.images_dir, annotation_manager.get_annotation_path)
+    scheduler = UncertaintyScheduler(args.scores)
+    image_files = [
+        path for path in scanner.scan()
+        if scanner.get_status(path) != STATUS_DONE and (args.rescore or path not in scheduler.scores)
+    ]
+    logger.info("%d images à noter", len(image_files))
+    
+    processor = ImageProcessor()
+    processor.enable_ai_assist()
+    
+    def predict(image_path):
+        result = processor.model.predict(image_path, confidence=40, overlap=30)
+        return image_path, result if isinstance(result, dict) else result.json()
+    
+    with ThreadPoolExecutor(max_workers=args.workers) as pool:
+        for done, (image_path, result) in enumerate(pool.map(predict, image_files), start=1):
+            score = scheduler.update(image_path, result['predictions'])
+            logger.info("[%d/%d] %s : %.2f", done, len(image_files), image_path, score)
+    scheduler.close()
+
+if __name__ == '__main__':
+    args = parse_args()
+    try:
+        main(args)
+    except Exception as e:
+        print(f"Une erreur est survenue : {str(e)}")
+        sys.exit(1)